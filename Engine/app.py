@@ -4,39 +4,198 @@ app.py
 Flask REST API for CreditTwin credit decision engine
 """
 
+import math
 import sys
-from flask import Flask, request, jsonify
-from flask_cors import CORS
 import sqlite3
+import orjson
+from flask import Flask, request
+from flask_cors import CORS
 import os
-from twin_search import find_twins
-from vector_store import get_collection_info
-from config import COLLECTION_NAME
+import pandas as pd
+from twin_search import find_twins, find_twins_batch, precheck_application, TWIN_TOP_K
+from vector_store import get_collection_info, search_similar
+from embeddings import cached_application_vector, create_application_vector, create_application_vectors
+from caching import CentroidCache, LRUCache, QueryCache
+from db_pool import get_conn, get_pool, ensure_indexes
+from validation import REQUIRED_FIELDS, ValidationError, validate_application
+from config import (
+    DB_PATH,
+    COLLECTION_NAME,
+    VECTOR_SIZE,
+    QUERY_CACHE_SIZE,
+    QUERY_CACHE_TTL,
+    QUERY_CACHE_THRESHOLD,
+    CENTROID_CACHE_SIZE,
+    CENTROID_CACHE_THRESHOLD,
+    DECISION_SCOPE_FICO_STEP,
+    DECISION_SCOPE_DTI_STEP,
+    DECISION_SCOPE_INCOME_RATIO,
+    STATS_CACHE_TTL,
+    HEALTH_CACHE_TTL,
+    WARMUP_ON_IMPORT,
+    GOOGLE_API_KEY
+)
 
-# Force UTF-8 for stdout/stderr to avoid UnicodeEncodeError with emojis on Windows
-if hasattr(sys.stdout, 'reconfigure'):
-    sys.stdout.reconfigure(encoding='utf-8')
-if hasattr(sys.stderr, 'reconfigure'):
-    sys.stderr.reconfigure(encoding='utf-8')
+# Force UTF-8 for stdout/stderr to avoid UnicodeEncodeError with emojis on Windows.
+# Only needed there, and only once per process: streams already in UTF-8
+# (e.g. reconfigured by an earlier import) are left alone.
+if sys.platform == "win32":
+    for stream in (sys.stdout, sys.stderr):
+        if hasattr(stream, 'reconfigure') and (stream.encoding or '').lower() != 'utf-8':
+            stream.reconfigure(encoding='utf-8')
 
 app = Flask(__name__)
 CORS(app)
 
-# Use absolute path relative to this script to find the DB
-BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-DB_PATH = os.path.join(BASE_DIR, "db", "credit.db")
+# orjson options for every response body
+JSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def ojsonify(obj, status=200):
+    """
+    Build a JSON response with orjson (drop-in for flask.jsonify)
+    
+    Args:
+        obj: JSON-serializable object (numpy values allowed)
+        status: HTTP status code
+    
+    Returns:
+        Flask Response with application/json mimetype
+    """
+    return app.response_class(
+        orjson.dumps(obj, option=JSON_OPTIONS),
+        status=status,
+        mimetype="application/json"
+    )
+
+
+# Semantic cache: repeat/near-repeat applications skip the twin search
+QUERY_CACHE = QueryCache(
+    maxsize=QUERY_CACHE_SIZE,
+    ttl=QUERY_CACHE_TTL,
+    threshold=QUERY_CACHE_THRESHOLD
+)
+
+# Cluster-level cache: applications close to a known centroid reuse its decision
+CENTROID_CACHE = CentroidCache(
+    maxsize=CENTROID_CACHE_SIZE,
+    ttl=QUERY_CACHE_TTL,
+    threshold=CENTROID_CACHE_THRESHOLD
+)
+
+# Dashboard aggregates change only when the database is rebuilt
+STATS_CACHE = LRUCache(maxsize=1, ttl=STATS_CACHE_TTL)
+
+# Load balancers poll /api/health; probe Qdrant at most once per TTL
+HEALTH_CACHE = LRUCache(maxsize=1, ttl=HEALTH_CACHE_TTL)
+
+
+
+def ensure_read_indexes():
+    """
+    Add the API read-path indexes to a database built without them
+    
+    data_loader creates them with the other indexes; this covers older
+    databases. Runs once per server process after any fork (gunicorn's
+    post_worker_init, or the dev server start). Failures such as a missing
+    applications table are reported, not raised (/api/health shows them),
+    and the connection used is closed again.
+    """
+    if not os.path.exists(DB_PATH):
+        return
+    try:
+        ensure_indexes()
+    except sqlite3.Error as e:
+        print(f"⚠️ Could not create read-path indexes: {e}")
+    finally:
+        get_pool().close_all()
+
+
+def warmup():
+    """
+    Prime the hot paths so the first request runs at steady-state speed
+    
+    1. Vector encoders (compiles the numba kernel when installed)
+    2. SQLite page cache for the applications table
+    3. Qdrant collection (loads segments with one dummy search)
+    
+    Uses search_similar rather than find_twins so no LLM call is made and
+    no synthetic decision enters the caches. Failures are reported, not raised.
+    """
+    dummy = {field: 0 for field in REQUIRED_FIELDS}
+    vector = create_application_vector(dummy, vector_size=VECTOR_SIZE)
+    create_application_vectors(pd.DataFrame([dummy]), vector_size=VECTOR_SIZE)
+    
+    if not os.path.exists(DB_PATH):
+        return
+    
+    try:
+        with get_conn() as conn:
+            conn.execute("SELECT COUNT(*) FROM applications").fetchone()
+            conn.execute("SELECT * FROM applications LIMIT 10000").fetchall()
+    except Exception as e:
+        print(f"⚠️ Warmup: SQLite priming failed: {e}")
+    
+    try:
+        search_similar(vector=vector, top_k=TWIN_TOP_K)
+    except Exception as e:
+        print(f"⚠️ Warmup: Qdrant priming failed (initializing?): {e}")
+
+
+if WARMUP_ON_IMPORT:
+    warmup()
+
+
+def read_json_body():
+    """Decode the request body with orjson (None if it is not valid JSON)."""
+    try:
+        return orjson.loads(request.get_data())
+    except orjson.JSONDecodeError:
+        return None
+
+
+def decision_scope(new_app):
+    """
+    Exact-match cache scope of a (prechecked) application
+    
+    The requested amount, because find_twins filters twins by amount range
+    and echoes it in the decision, plus FICO, DTI and income buckets: the
+    features are not normalized, so cosine alone lets applicants with very
+    different FICO scores share a decision.
+    """
+    return (
+        new_app.get("requested_amount"),
+        new_app["fico_snapshot"] // DECISION_SCOPE_FICO_STEP,
+        new_app["dti_snapshot"] // DECISION_SCOPE_DTI_STEP,
+        math.log(new_app["annual_income_snapshot"]) // math.log(DECISION_SCOPE_INCOME_RATIO),
+    )
+
+
+def cached_decision(vector, scope):
+    """Return a decision from the query or centroid cache, or None."""
+    decision = QUERY_CACHE.lookup(vector, scope=scope)
+    if decision is None:
+        decision = CENTROID_CACHE.lookup(vector, scope=scope)
+    return decision
+
+
+def cache_decision(vector, decision, scope):
+    """Store a freshly computed decision in both caches."""
+    QUERY_CACHE.insert(vector, decision, scope=scope)
+    CENTROID_CACHE.insert(vector, decision, scope=scope)
 
 
 @app.route("/", methods=["GET"])
 def home():
     """Home page with endpoint list"""
-    return jsonify({
+    return ojsonify({
         "service": "CreditTwin API",
         "version": "1.0.0",
         "description": "Credit decision engine based on financial twin matching",
         "endpoints": {
             "GET /": "API information",
             "POST /api/evaluate": "Evaluate a credit application",
+            "POST /api/evaluate/batch": "Evaluate a list of credit applications",
             "GET /api/clients/<applicant_id>/history": "Get client application history",
             "GET /api/stats": "Get database statistics",
             "GET /api/health": "Health check"
@@ -44,36 +203,55 @@ def home():
     })
 
 
+def health_probes():
+    """
+    Database and Qdrant probes for /api/health, cached for HEALTH_CACHE_TTL
+    
+    Returns:
+        Tuple (db_exists, collection_exists, vectors_count)
+    """
+    probes = HEALTH_CACHE.get("probes")
+    if probes is not None:
+        return probes
+    
+    # Check database
+    db_exists = os.path.exists(DB_PATH)
+    
+    # Check Qdrant connection using vector_store module
+    try:
+        collection_info = get_collection_info()
+        collection_exists = collection_info["exists"]
+        vectors_count = collection_info["vectors_count"]
+    except Exception:
+        collection_exists = False
+        vectors_count = 0
+    
+    probes = (db_exists, collection_exists, vectors_count)
+    HEALTH_CACHE.set("probes", probes)
+    return probes
+
+
 @app.route("/api/health", methods=["GET"])
 def health_check():
     """Health check endpoint"""
     try:
-        # Check database
-        db_exists = os.path.exists(DB_PATH)
-        
-        # Check Qdrant connection using vector_store module
-        try:
-            collection_info = get_collection_info()
-            collection_exists = collection_info["exists"]
-            vectors_count = collection_info["vectors_count"]
-        except Exception:
-            collection_exists = False
-            vectors_count = 0
+        db_exists, collection_exists, vectors_count = health_probes()
         
         # Check Gemini LLM
-        from config import GOOGLE_API_KEY
         llm_status = "configured" if GOOGLE_API_KEY else "not_configured"
         
         if db_exists:
-            return jsonify({
+            return ojsonify({
                 "status": "healthy",
                 "database": "connected",
                 "vector_store": "connected" if collection_exists else "initializing",
                 "llm": llm_status,
-                "vectors_count": vectors_count
+                "vectors_count": vectors_count,
+                "query_cache": QUERY_CACHE.stats(),
+                "centroid_cache": CENTROID_CACHE.stats()
             }), 200
         else:
-            return jsonify({
+            return ojsonify({
                 "status": "unhealthy",
                 "database": "missing",
                 "vector_store": "connected" if collection_exists else "disconnected",
@@ -81,7 +259,7 @@ def health_check():
             }), 503
             
     except Exception as e:
-        return jsonify({
+        return ojsonify({
             "status": "unhealthy",
             "error": str(e)
         }), 503
@@ -106,32 +284,113 @@ def evaluate_application():
     """
     
     try:
-        new_app = request.json
+        # Validate required fields and coerce feature types
+        try:
+            new_app = validate_application(read_json_body())
+        except ValidationError as e:
+            return ojsonify(e.to_dict()), 400
+        
+        # Incomplete applications are answered without a search and never
+        # cached: their vector embeds defaults for the missing features
+        incomplete = precheck_application(new_app)
+        if incomplete is not None:
+            return ojsonify(incomplete), 200
+        
+        # Serve repeat/near-repeat applications from the semantic cache,
+        # within the same amount and FICO/DTI/income buckets
+        vector = cached_application_vector(new_app, vector_size=VECTOR_SIZE)
+        scope = decision_scope(new_app)
+        
+        decision = cached_decision(vector, scope)
+        if decision is None:
+            # Find twins and make decision
+            decision = find_twins(new_app, vector=vector)
+            cache_decision(vector, decision, scope)
         
-        # Validate required fields
-        required = [
-            "requested_amount",
-            "annual_income_snapshot",
-            "dti_snapshot",
-            "fico_snapshot"
-        ]
+        return ojsonify(decision), 200
         
-        missing = [field for field in required if field not in new_app]
+    except Exception as e:
+        return ojsonify({
+            "error": "Internal server error",
+            "details": str(e)
+        }), 500
+
+
+@app.route("/api/evaluate/batch", methods=["POST"])
+def evaluate_batch():
+    """
+    Evaluate several credit applications in one call
+    
+    Body (JSON):
+    {
+        "applications": [{...}, {...}]
+    }
+    
+    Cached applications are answered inline; the rest are searched in a
+    single batched Qdrant query.
+    
+    Returns:
+        One decision (or validation error) per application, in input order
+    """
+    
+    try:
+        body = read_json_body()
+        applications = body.get("applications") if isinstance(body, dict) else None
         
-        if missing:
-            return jsonify({
-                "error": "Missing required fields",
-                "missing_fields": missing,
-                "required_fields": required
+        if not isinstance(applications, list) or not applications:
+            return ojsonify({
+                "error": "Body must contain a non-empty 'applications' list"
             }), 400
         
-        # Find twins and make decision
-        decision = find_twins(new_app)
+        results = [None] * len(applications)
+        valid = []
         
-        return jsonify(decision), 200
+        # Validate required fields and coerce feature types per application;
+        # incomplete ones get their precheck decision, uncached (see evaluate_application)
+        for i, new_app in enumerate(applications):
+            try:
+                applications[i] = validate_application(new_app)
+            except ValidationError as e:
+                results[i] = e.to_dict()
+                continue
+            incomplete = precheck_application(applications[i])
+            if incomplete is not None:
+                results[i] = incomplete
+            else:
+                valid.append(i)
+        
+        # Vectorize all valid applications at once
+        vectors = []
+        if valid:
+            batch_df = pd.DataFrame([applications[i] for i in valid])
+            vectors = list(create_application_vectors(batch_df, vector_size=VECTOR_SIZE))
+        
+        # Split into cache hits (served inline) and misses (searched together)
+        misses = []
+        for i, vector in zip(valid, vectors):
+            decision = cached_decision(vector, decision_scope(applications[i]))
+            if decision is None:
+                misses.append((i, vector))
+            else:
+                results[i] = decision
+        
+        if misses:
+            decisions = find_twins_batch(
+                [applications[i] for i, _ in misses],
+                vectors=[vector for _, vector in misses]
+            )
+            for (i, vector), decision in zip(misses, decisions):
+                cache_decision(vector, decision, decision_scope(applications[i]))
+                results[i] = decision
+        
+        return ojsonify({
+            "results": results,
+            "total": len(results),
+            "cache_hits": len(valid) - len(misses)
+        }), 200
         
     except Exception as e:
-        return jsonify({
+        return ojsonify({
             "error": "Internal server error",
             "details": str(e)
         }), 500
@@ -150,40 +409,63 @@ def get_client_history(applicant_id):
     """
     
     try:
-        conn = sqlite3.connect(DB_PATH)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        # Get client profile
-        cursor.execute("SELECT * FROM clients WHERE applicant_id = ?", (applicant_id,))
-        client = cursor.fetchone()
-        
-        if not client:
-            return jsonify({"error": "Client not found"}), 404
-        
-        # Get all applications
-        cursor.execute("""
-            SELECT * FROM applications
-            WHERE applicant_id = ?
-            ORDER BY application_date DESC
-        """, (applicant_id,))
-        
-        applications = [dict(row) for row in cursor.fetchall()]
-        conn.close()
+        with get_conn() as conn:
+            cursor = conn.cursor()
+            # Plain tuples: rows are zipped with the hoisted column names below
+            cursor.row_factory = None
+            
+            # Client profile and all applications in one round-trip
+            cursor.execute("""
+                SELECT c.*, a.*
+                FROM clients c
+                LEFT JOIN applications a ON a.applicant_id = c.applicant_id
+                WHERE c.applicant_id = ?
+                ORDER BY a.application_date DESC
+            """, (applicant_id,))
+            rows = cursor.fetchall()
+            
+            if not rows:
+                return ojsonify({"error": "Client not found"}), 404
+            
+            # Split each row into its clients.* and applications.* columns
+            names = [column[0] for column in cursor.description]
+            split = client_column_count(cursor)
+            client_names, app_names = names[:split], names[split:]
+            
+            # zip() stops after the client columns
+            client = dict(zip(client_names, rows[0]))
+            
+            # A client without applications yields one all-NULL LEFT JOIN row
+            applications = [] if rows[0][split] is None else [
+                dict(zip(app_names, row[split:]))
+                for row in rows
+            ]
         
-        return jsonify({
-            "client": dict(client),
+        return ojsonify({
+            "client": client,
             "applications": applications,
             "total_applications": len(applications)
         }), 200
         
     except Exception as e:
-        return jsonify({
+        return ojsonify({
             "error": "Internal server error",
             "details": str(e)
         }), 500
 
 
+_CLIENT_COLUMNS = None
+
+
+def client_column_count(cursor):
+    """Number of columns in the clients table (read once from the schema)."""
+    global _CLIENT_COLUMNS
+    if _CLIENT_COLUMNS is None:
+        cursor.execute("SELECT * FROM clients LIMIT 0")
+        _CLIENT_COLUMNS = len(cursor.description)
+    return _CLIENT_COLUMNS
+
+
 @app.route("/api/stats", methods=["GET"])
 def get_stats():
     """
@@ -194,58 +476,71 @@ def get_stats():
     """
     
     try:
-        conn = sqlite3.connect(DB_PATH)
+        stats = STATS_CACHE.get("stats")
+        if stats is None:
+            stats = compute_stats()
+            STATS_CACHE.set("stats", stats)
+        
+        return ojsonify(stats), 200
+        
+    except Exception as e:
+        return ojsonify({
+            "error": "Internal server error",
+            "details": str(e)
+        }), 500
+
+
+def compute_stats():
+    """
+    Aggregate /api/stats figures with one pass over applications
+    
+    Returns:
+        Dict with client/application totals, outcome distribution and averages
+    """
+    
+    with get_conn() as conn:
         cursor = conn.cursor()
         
         # Total clients
         cursor.execute("SELECT COUNT(*) FROM clients")
         total_clients = cursor.fetchone()[0]
         
-        # Total applications
-        cursor.execute("SELECT COUNT(*) FROM applications")
-        total_applications = cursor.fetchone()[0]
-        
-        # Outcome distribution
+        # Per-outcome counts and sums; totals and averages are rebuilt below
         cursor.execute("""
-            SELECT outcome_category, COUNT(*) as count
+            SELECT outcome_category,
+                   COUNT(*),
+                   SUM(requested_amount), COUNT(requested_amount),
+                   SUM(fico_snapshot), COUNT(fico_snapshot)
             FROM applications
             GROUP BY outcome_category
         """)
-        outcomes = {row[0]: row[1] for row in cursor.fetchall()}
-        
-        # Average requested amount
-        cursor.execute("SELECT AVG(requested_amount) FROM applications")
-        avg_amount = cursor.fetchone()[0]
-        
-        # Average FICO
-        cursor.execute("SELECT AVG(fico_snapshot) FROM applications")
-        avg_fico = cursor.fetchone()[0]
-        
-        conn.close()
-        
-        return jsonify({
-            "total_clients": total_clients,
-            "total_applications": total_applications,
-            "outcome_distribution": outcomes,
-            "average_requested_amount": round(avg_amount, 2) if avg_amount else None,
-            "average_fico_score": round(avg_fico, 2) if avg_fico else None
-        }), 200
-        
-    except Exception as e:
-        return jsonify({
-            "error": "Internal server error",
-            "details": str(e)
-        }), 500
+        rows = cursor.fetchall()
+    
+    outcomes = {row[0]: row[1] for row in rows}
+    total_applications = sum(row[1] for row in rows)
+    
+    amount_count = sum(row[3] for row in rows)
+    fico_count = sum(row[5] for row in rows)
+    avg_amount = sum(row[2] or 0 for row in rows) / amount_count if amount_count else None
+    avg_fico = sum(row[4] or 0 for row in rows) / fico_count if fico_count else None
+    
+    return {
+        "total_clients": total_clients,
+        "total_applications": total_applications,
+        "outcome_distribution": outcomes,
+        "average_requested_amount": round(avg_amount, 2) if avg_amount else None,
+        "average_fico_score": round(avg_fico, 2) if avg_fico else None
+    }
 
 
 @app.errorhandler(404)
 def not_found(error):
-    return jsonify({"error": "Endpoint not found"}), 404
+    return ojsonify({"error": "Endpoint not found"}), 404
 
 
 @app.errorhandler(500)
 def internal_error(error):
-    return jsonify({"error": "Internal server error"}), 500
+    return ojsonify({"error": "Internal server error"}), 500
 
 
 if __name__ == "__main__":
@@ -258,7 +553,12 @@ if __name__ == "__main__":
     print(f"   GET  /              - API information")
     print(f"   GET  /api/health    - Health check")
     print(f"   POST /api/evaluate  - Evaluate credit application")
+    print(f"   POST /api/evaluate/batch - Evaluate a list of applications")
     print(f"   GET  /api/stats     - Database statistics")
+    print(f"\n⚠️  Development server only. In production run (from Engine/):")
+    print(f"   gunicorn -c gunicorn_conf.py app:app")
     print(f"\n💡 Press CTRL+C to stop\n")
     
+    # Kept for local/Windows use, where gunicorn is unavailable
+    ensure_read_indexes()
     app.run(debug=False, host="0.0.0.0", port=5000)
\ No newline at end of file
@@ -9,11 +9,14 @@ This script orchestrates the vector store creation by:
 3. Upserting to Qdrant
 """
 
-import json
+import mmap
 import os
 import sys
+import orjson
+import pandas as pd
 from config import VECTOR_SIZE
-from embeddings import create_application_vector
+from embeddings import create_application_vectors
+from kernels import OTHER_OUTCOME, OUTCOME_CODES
 from vector_store import (
     create_collection_if_not_exists,
     batch_upsert_vectors,
@@ -28,6 +31,74 @@ if hasattr(sys.stderr, 'reconfigure'):
     sys.stderr.reconfigure(encoding='utf-8')
 
 
+# Payload specification, in stored key order: (payload key, expression template).
+# {col} is replaced by the quoted source column; `app` is the raw application dict.
+AS_IS = "app[{col}]"
+FLOAT_OR_NONE = "float(v) if (v := app[{col}]) else None"
+
+PAYLOAD_SPEC = [
+    # Identifiers
+    ("application_id", AS_IS, "application_id"),
+    ("applicant_id", AS_IS, "applicant_id"),
+    ("application_date", AS_IS, "application_date"),
+    
+    # Loan parameters
+    ("requested_amount", FLOAT_OR_NONE, "requested_amount"),
+    ("loan_purpose", AS_IS, "loan_purpose"),
+    ("term", AS_IS, "term"),
+    ("grade", AS_IS, "grade"),
+    
+    # Financial snapshot
+    ("annual_income", FLOAT_OR_NONE, "annual_income_snapshot"),
+    ("dti", FLOAT_OR_NONE, "dti_snapshot"),
+    ("fico", FLOAT_OR_NONE, "fico_snapshot"),
+    
+    # Client history
+    ("nb_previous_loans", "int(v) if (v := app[{col}]) is not None else 0", "nb_previous_loans"),
+    ("credit_history_length", FLOAT_OR_NONE, "credit_history_length_snapshot"),
+    
+    # Ratios
+    ("payment_to_income", FLOAT_OR_NONE, "payment_to_income_ratio"),
+    ("loan_to_income", FLOAT_OR_NONE, "loan_to_income_ratio"),
+    
+    # Outcome (what we predict)
+    ("outcome", AS_IS, "outcome_category"),
+    ("loan_status", AS_IS, "loan_status"),
+    ("outcome_code", "OUTCOME_CODES.get(app[{col}], OTHER_OUTCOME)", "outcome_category"),
+    
+    # Advanced Insights
+    ("is_fraud_suspect", "bool(app.get({col}, 0))", "is_fraud_suspect"),
+    ("is_comeback_story", "bool(app.get({col}, 0))", "is_comeback_story"),
+]
+
+
+def _compile_payload_builder(spec):
+    """
+    Generate a specialized payload function from the spec
+    
+    The result is a single dict display with every field lookup and cast
+    inlined, so building a payload costs no per-field loop or dispatch.
+    
+    Args:
+        spec: List of (payload key, expression template, source column)
+    
+    Returns:
+        Function mapping a raw application dict to its Qdrant payload
+    """
+    fields = ",\n        ".join(
+        f"{key!r}: " + template.format(col=repr(column))
+        for key, template, column in spec
+    )
+    source = f"def build_payload(app):\n    return {{\n        {fields},\n    }}\n"
+    
+    namespace = {"OUTCOME_CODES": OUTCOME_CODES, "OTHER_OUTCOME": OTHER_OUTCOME}
+    exec(compile(source, "<payload_builder>", "exec"), namespace)
+    return namespace["build_payload"]
+
+
+build_payload = _compile_payload_builder(PAYLOAD_SPEC)
+
+
 def build_qdrant_vectors(reset_collection: bool = True):
     """
     Load loan_requests.json and create the Qdrant collection
@@ -35,7 +106,7 @@ def build_qdrant_vectors(reset_collection: bool = True):
     Steps:
     1. Load JSON of applications with known outcomes
     2. Create/reset Qdrant collection
-    3. Vectorize each application
+    3. Vectorize all applications in one batch
     4. Upload in batches to Qdrant
     
     Args:
@@ -52,8 +123,10 @@ def build_qdrant_vectors(reset_collection: bool = True):
             f"{json_path} not found. Run Engine/data_loader.py first."
         )
     
-    with open(json_path, "r") as f:
-        applications = json.load(f)
+    # Parse straight from the memory-mapped file (no intermediate str copy)
+    with open(json_path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            applications = orjson.loads(memoryview(mapped))
     
     print(f"   Found {len(applications):,} applications")
     
@@ -72,55 +145,14 @@ def build_qdrant_vectors(reset_collection: bool = True):
     
     # Prepare points data
     print("🔢 Vectorizing applications...")
-    points_data = []
-    
-    for idx, app in enumerate(applications):
-        # Create vector using embeddings module
-        vector = create_application_vector(app, vector_size=VECTOR_SIZE)
-        
-        # Prepare payload
-        payload = {
-            # Identifiers
-            "application_id": app["application_id"],
-            "applicant_id": app["applicant_id"],
-            "application_date": app["application_date"],
-            
-            # Loan parameters
-            "requested_amount": float(app["requested_amount"]) if app["requested_amount"] else None,
-            "loan_purpose": app["loan_purpose"],
-            "term": app["term"],
-            "grade": app["grade"],
-            
-            # Financial snapshot
-            "annual_income": float(app["annual_income_snapshot"]) if app["annual_income_snapshot"] else None,
-            "dti": float(app["dti_snapshot"]) if app["dti_snapshot"] else None,
-            "fico": float(app["fico_snapshot"]) if app["fico_snapshot"] else None,
-            
-            # Client history
-            "nb_previous_loans": int(app["nb_previous_loans"]) if app["nb_previous_loans"] is not None else 0,
-            "credit_history_length": float(app["credit_history_length_snapshot"]) if app["credit_history_length_snapshot"] else None,
-            
-            # Ratios
-            "payment_to_income": float(app["payment_to_income_ratio"]) if app["payment_to_income_ratio"] else None,
-            "loan_to_income": float(app["loan_to_income_ratio"]) if app["loan_to_income_ratio"] else None,
-            
-            # Outcome (what we predict)
-            "outcome": app["outcome_category"],
-            "loan_status": app["loan_status"],
-            "was_successful": app["outcome_category"] == "success",
-            "defaulted": app["outcome_category"] == "default",
-            "had_late_payments": app["outcome_category"] == "late_payments",
-            
-            # Advanced Insights
-            "is_fraud_suspect": bool(app.get("is_fraud_suspect", 0)),
-            "is_comeback_story": bool(app.get("is_comeback_story", 0)),
-        }
-        
-        points_data.append((idx, vector, payload))
+    df = pd.DataFrame(applications)
+    vectors = create_application_vectors(df, vector_size=VECTOR_SIZE)
+    payloads = [build_payload(app) for app in applications]
+    points_data = list(zip(range(len(df)), vectors, payloads))
     
     # Upload in batches using vector_store module
-    print("📤 Uploading to Qdrant (batch_size=1000)...")
-    total_uploaded = batch_upsert_vectors(points_data, batch_size=1000)
+    print("📤 Uploading to Qdrant (batch_size=1000, 4 workers)...")
+    total_uploaded = batch_upsert_vectors(points_data, batch_size=1000, parallel=4)
     
     # Verify
     info = get_collection_info()
@@ -0,0 +1,335 @@
+"""
+caching.py
+----------
+In-process caches used on the API hot path.
+
+This module provides:
+- LRUCache: a bounded, thread-safe key/value cache with per-entry TTL
+- QueryCache: a similarity-aware cache keyed on application vectors, so
+  repeat and near-repeat applications skip the vector search entirely
+- CentroidCache: decisions cached per cluster of similar applications,
+  with centroids that drift toward their hits and merge when they meet
+
+Note: This module does NOT decide what gets cached (handled by app.py).
+"""
+
+import threading
+import time
+from collections import OrderedDict, deque
+from itertools import islice
+from typing import Any, Dict, Hashable, Optional
+
+import numpy as np
+
+
+class LRUCache:
+    """
+    Bounded least-recently-used cache with an optional time-to-live.
+
+    Args:
+        maxsize: Maximum number of entries kept in memory
+        ttl: Entry lifetime in seconds (None = never expires)
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.RLock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for key, or default on miss/expiry."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            value, timestamp = entry
+            if self.ttl is not None and time.monotonic() - timestamp > self.ttl:
+                del self._data[key]
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Insert or refresh an entry, evicting the least recently used one."""
+        with self._lock:
+            self._data[key] = (value, time.monotonic())
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop every entry (counters are kept)."""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and current size."""
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+class QueryCache:
+    """
+    Semantic cache for credit decisions.
+
+    Entries are stored as (normalized_vector, decision) in a deque per scope,
+    with one (timestamp, scope) deque giving the global insertion order. A
+    lookup L2-normalizes the query vector, computes cosine similarity against
+    the scan_size most recent entries of its scope only and returns the
+    cached decision when the best match is above the similarity threshold.
+
+    Entries expire in insertion order, so expiry and the maxsize bound both
+    evict from the oldest end and stop at the first entry that stays; a hit
+    does not reorder anything.
+
+    Args:
+        maxsize: Maximum number of cached decisions
+        ttl: Entry lifetime in seconds
+        threshold: Minimum cosine similarity for a hit (0-1)
+        scan_size: Number of most recent entries compared per lookup
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        ttl: float = 300,
+        threshold: float = 0.9999,
+        scan_size: int = 256
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.threshold = threshold
+        self.scan_size = scan_size
+        self.hits = 0
+        self.misses = 0
+        self._order: "deque[tuple]" = deque()
+        self._by_scope: Dict[Hashable, deque] = {}
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def _normalize(vector) -> np.ndarray:
+        v = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(v)
+        return v / norm if norm > 0 else v
+
+    def _evict_oldest(self) -> None:
+        # The oldest entry overall is also the oldest of its scope
+        _, scope = self._order.popleft()
+        entries = self._by_scope[scope]
+        entries.popleft()
+        if not entries:
+            del self._by_scope[scope]
+
+    def _evict_expired(self, now: float) -> None:
+        while self._order and now - self._order[0][0] > self.ttl:
+            self._evict_oldest()
+
+    def lookup(self, vector, scope: Hashable = None) -> Optional[Dict[str, Any]]:
+        """
+        Return a cached decision for a (near-)identical vector, if any.
+
+        Args:
+            vector: Application vector (list or np.ndarray)
+            scope: Optional key that must match exactly (e.g. requested amount)
+
+        Returns:
+            The cached decision dict, or None on miss
+        """
+        q = self._normalize(vector)
+
+        with self._lock:
+            self._evict_expired(time.monotonic())
+
+            entries = self._by_scope.get(scope)
+            if entries:
+                candidates = list(islice(reversed(entries), self.scan_size))
+                matrix = np.stack([vector for vector, _ in candidates])
+                similarities = matrix @ q
+                best = int(np.argmax(similarities))
+
+                if similarities[best] >= self.threshold:
+                    self.hits += 1
+                    return candidates[best][1]
+
+            self.misses += 1
+            return None
+
+    def insert(self, vector, decision: Dict[str, Any], scope: Hashable = None) -> None:
+        """Cache a decision for the given vector."""
+        q = self._normalize(vector)
+
+        with self._lock:
+            self._order.append((time.monotonic(), scope))
+            self._by_scope.setdefault(scope, deque()).append((q, decision))
+            while len(self._order) > self.maxsize:
+                self._evict_oldest()
+
+    def clear(self) -> None:
+        """Drop every cached decision (counters are kept)."""
+        with self._lock:
+            self._order.clear()
+            self._by_scope.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and current size."""
+        with self._lock:
+            return {
+                "size": len(self._order),
+                "hits": self.hits,
+                "misses": self.misses,
+                "threshold": self.threshold,
+            }
+
+
+class CentroidCache:
+    """
+    Cluster-level cache of credit decisions.
+    
+    Each entry is a unit-norm centroid with the decision computed for the
+    application that created it. A query within `threshold` cosine of a
+    centroid of the same scope returns that decision; the centroid then
+    moves toward the query (running mean over its hits) and is merged into
+    any other centroid it comes within `threshold` of.
+    
+    Centroids live in one preallocated matrix, so a lookup is a single
+    matrix-vector product. When full, expired or least-hit slots are reused.
+    
+    Args:
+        maxsize: Maximum number of centroids
+        ttl: Centroid lifetime in seconds
+        threshold: Minimum cosine similarity for a hit (0-1)
+    """
+    
+    def __init__(self, maxsize: int = 10000, ttl: float = 300, threshold: float = 0.995):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.threshold = threshold
+        self.hits = 0
+        self.misses = 0
+        self._matrix: Optional[np.ndarray] = None
+        self._scope_keys = np.zeros(maxsize, dtype=np.int64)
+        self._counts = np.zeros(maxsize, dtype=np.int64)
+        self._timestamps = np.zeros(maxsize, dtype=np.float64)
+        self._valid = np.zeros(maxsize, dtype=bool)
+        self._scopes: list = [None] * maxsize
+        self._decisions: list = [None] * maxsize
+        self._lock = threading.RLock()
+    
+    def _live(self, scope: Hashable, now: float) -> np.ndarray:
+        # Mask of unexpired centroids in the given scope (hash pre-filter + exact check later)
+        return (
+            self._valid
+            & (self._scope_keys == hash(scope))
+            & (now - self._timestamps <= self.ttl)
+        )
+    
+    def _best(self, q: np.ndarray, mask: np.ndarray, scope: Hashable):
+        # Index and similarity of the closest centroid under mask, or (None, -1)
+        candidates = np.flatnonzero(mask)
+        candidates = [i for i in candidates if self._scopes[i] == scope]
+        if not candidates:
+            return None, -1.0
+        similarities = self._matrix[candidates] @ q
+        best = int(np.argmax(similarities))
+        return candidates[best], float(similarities[best])
+    
+    def _merge_neighbours(self, index: int, scope: Hashable, now: float) -> None:
+        mask = self._live(scope, now)
+        mask[index] = False
+        other, similarity = self._best(self._matrix[index], mask, scope)
+        if other is None or similarity < self.threshold:
+            return
+        
+        # Keep the decision and slot of the more popular centroid
+        keep, drop = (index, other) if self._counts[index] >= self._counts[other] else (other, index)
+        total = self._counts[keep] + self._counts[drop]
+        merged = self._matrix[keep] * self._counts[keep] + self._matrix[drop] * self._counts[drop]
+        self._matrix[keep] = QueryCache._normalize(merged)
+        self._counts[keep] = total
+        self._valid[drop] = False
+        self._decisions[drop] = None
+    
+    def lookup(self, vector, scope: Hashable = None) -> Optional[Dict[str, Any]]:
+        """
+        Return the decision of the nearest centroid, if close enough.
+        
+        Args:
+            vector: Application vector (list or np.ndarray)
+            scope: Optional key that must match exactly (e.g. requested amount)
+        
+        Returns:
+            The cached decision dict, or None on miss
+        """
+        q = QueryCache._normalize(vector)
+        
+        with self._lock:
+            if self._matrix is None:
+                self.misses += 1
+                return None
+            
+            now = time.monotonic()
+            index, similarity = self._best(q, self._live(scope, now), scope)
+            if index is None or similarity < self.threshold:
+                self.misses += 1
+                return None
+            
+            # Running mean of the unit vectors assigned to this centroid
+            count = self._counts[index]
+            self._matrix[index] = QueryCache._normalize(self._matrix[index] * count + q)
+            self._counts[index] = count + 1
+            decision = self._decisions[index]
+            self._merge_neighbours(index, scope, now)
+            
+            self.hits += 1
+            return decision
+    
+    def insert(self, vector, decision: Dict[str, Any], scope: Hashable = None) -> None:
+        """Start a new centroid at vector with the given decision."""
+        q = QueryCache._normalize(vector)
+        
+        with self._lock:
+            if self._matrix is None:
+                self._matrix = np.zeros((self.maxsize, q.shape[0]), dtype=np.float32)
+            
+            now = time.monotonic()
+            free = np.flatnonzero(~self._valid | (now - self._timestamps > self.ttl))
+            index = int(free[0]) if free.size else int(np.argmin(self._counts))
+            
+            self._matrix[index] = q
+            self._scope_keys[index] = hash(scope)
+            self._scopes[index] = scope
+            self._counts[index] = 1
+            self._timestamps[index] = now
+            self._valid[index] = True
+            self._decisions[index] = decision
+    
+    def clear(self) -> None:
+        """Drop every centroid (counters are kept)."""
+        with self._lock:
+            self._valid[:] = False
+            self._decisions = [None] * self.maxsize
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and current size."""
+        with self._lock:
+            return {
+                "size": int(self._valid.sum()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "threshold": self.threshold,
+            }
@@ -1,13 +1,9 @@
-from qdrant_client import QdrantClient
-import os
+from config import get_qdrant_client, COLLECTION_NAME
 
-# Find project root
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-QDRANT_STORAGE_PATH = os.path.join(BASE_DIR, "..", "db", "qdrant_storage")
-
-client = QdrantClient(path=QDRANT_STORAGE_PATH)
+# Reuse the shared client: a second local-mode client would hit the storage lock
+client = get_qdrant_client()
 try:
-    collection_info = client.get_collection(collection_name="loan_applications")
+    collection_info = client.get_collection(collection_name=COLLECTION_NAME)
     print(f"Vectors found: {collection_info.points_count}")
 except Exception as e:
     print(f"Error: {e}")
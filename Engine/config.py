@@ -7,8 +7,9 @@ Centralizes all configuration parameters for easy management and testing.
 """
 
 import os
+import threading
 from dotenv import load_dotenv
-from qdrant_client import QdrantClient
+from qdrant_client import AsyncQdrantClient, QdrantClient
 from qdrant_client.models import Distance
 
 # Load environment variables from .env file
@@ -17,23 +18,165 @@ load_dotenv()
 # Find project root
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
+# SQLite database built by data_loader.py
+DB_PATH = os.path.join(BASE_DIR, "db", "credit.db")
+
+# One connection pool per process; size it to the threads serving requests
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 4))
+
 # Qdrant configuration: Use local storage by default for portability
 # This allows the project to run without Docker!
 QDRANT_STORAGE_PATH = os.path.join(BASE_DIR, "db", "qdrant_storage")
 
-# Initialize Qdrant client
-# If you want to use Docker, change this to: QdrantClient(host="localhost", port=6333)
-QDRANT_CLIENT = QdrantClient(path=QDRANT_STORAGE_PATH)
+# To use a Qdrant server (e.g. Docker) instead, set QDRANT_URL=http://localhost:6333
+QDRANT_URL = os.getenv("QDRANT_URL")
+
+# gRPC ships float32 query vectors without a per-element Python conversion
+# and multiplexes bulk loads better than REST; opt-in because the server must
+# expose its gRPC port too. REST is used whenever QDRANT_PREFER_GRPC is off
+QDRANT_PREFER_GRPC = os.getenv("QDRANT_PREFER_GRPC", "0") == "1"
+QDRANT_GRPC_PORT = int(os.getenv("QDRANT_GRPC_PORT", 6334))
+
+# Connections kept per client, i.e. requests it can have in flight at once
+QDRANT_POOL_SIZE = int(os.getenv("QDRANT_POOL_SIZE", 16))
+QDRANT_TIMEOUT = int(os.getenv("QDRANT_TIMEOUT", 60))
+
+# Local mode is an embedded store without internal locking: writes must be serialized
+QDRANT_IS_LOCAL = not QDRANT_URL
+
+_qdrant_client = None
+_qdrant_client_lock = threading.Lock()
+
+
+def get_qdrant_client() -> QdrantClient:
+    """
+    Return the process-wide Qdrant client, creating it on first use.
+    
+    Creation is lazy because local mode takes an exclusive lock on
+    QDRANT_STORAGE_PATH: importing config must not open the storage, and
+    forked server workers must each open their own client.
+    """
+    global _qdrant_client
+    if _qdrant_client is None:
+        with _qdrant_client_lock:
+            if _qdrant_client is None:
+                if QDRANT_IS_LOCAL:
+                    _qdrant_client = QdrantClient(path=QDRANT_STORAGE_PATH)
+                else:
+                    _qdrant_client = QdrantClient(
+                        url=QDRANT_URL,
+                        grpc_port=QDRANT_GRPC_PORT,
+                        prefer_grpc=QDRANT_PREFER_GRPC,
+                        pool_size=QDRANT_POOL_SIZE,
+                        timeout=QDRANT_TIMEOUT
+                    )
+    return _qdrant_client
+
+
+_async_qdrant_client = None
+
+
+def create_async_qdrant_client() -> AsyncQdrantClient:
+    """
+    Create a new async Qdrant client for a remote server.
+    
+    Local mode has no async counterpart: a second client cannot open the
+    storage held by get_qdrant_client (see vector_store.asearch_similar).
+    """
+    if QDRANT_IS_LOCAL:
+        raise RuntimeError("Async Qdrant client requires QDRANT_URL (local mode is sync-only)")
+    return AsyncQdrantClient(
+        url=QDRANT_URL,
+        grpc_port=QDRANT_GRPC_PORT,
+        prefer_grpc=QDRANT_PREFER_GRPC,
+        pool_size=QDRANT_POOL_SIZE,
+        timeout=QDRANT_TIMEOUT
+    )
+
+
+def get_async_qdrant_client() -> AsyncQdrantClient:
+    """
+    Return the process-wide async Qdrant client, creating it on first use.
+    
+    The client belongs to the event loop that first uses it; code that
+    runs its own short-lived loop should create_async_qdrant_client instead.
+    """
+    global _async_qdrant_client
+    if _async_qdrant_client is None:
+        with _qdrant_client_lock:
+            if _async_qdrant_client is None:
+                _async_qdrant_client = create_async_qdrant_client()
+    return _async_qdrant_client
+
 
 # Collection configuration
 COLLECTION_NAME = "loan_applications"
 VECTOR_SIZE = 50
 DISTANCE_METRIC = Distance.COSINE
 
+# vector_store re-checks that the collection exists at most this often (seconds)
+COLLECTION_EXISTS_TTL = float(os.getenv("COLLECTION_EXISTS_TTL", 5))
+
+# Int8 scalar quantization of stored vectors; top-k candidates are rescored
+# with the original float32 vectors (oversampling = candidates per result)
+QUANTIZATION_QUANTILE = 0.99
+QUANTIZATION_OVERSAMPLING = 2.0
+
+# HNSW candidate list size per search (higher = better recall, slower);
+# filtered searches rely on it to find enough matching neighbors
+HNSW_EF = int(os.getenv("HNSW_EF", 128))
+
+# Points built by vector_store skip pydantic validation (inputs are checked
+# up front); set QDRANT_VALIDATE_POINTS=1 if a qdrant-client upgrade needs it
+VALIDATE_POINTS = os.getenv("QDRANT_VALIDATE_POINTS", "0") == "1"
+
 # Optional: Batch processing settings
 DEFAULT_BATCH_SIZE = 100
 DEFAULT_TOP_K = 5
 
+# Semantic query cache in front of find_twins (see caching.QueryCache)
+QUERY_CACHE_SIZE = int(os.getenv("QUERY_CACHE_SIZE", 1024))
+QUERY_CACHE_TTL = float(os.getenv("QUERY_CACHE_TTL", 300))
+QUERY_CACHE_THRESHOLD = float(os.getenv("QUERY_CACHE_THRESHOLD", 0.9999))
+
+# Exact-match cache in front of vector_store.search_similar (same vector, top_k and filters)
+SEARCH_CACHE_SIZE = int(os.getenv("SEARCH_CACHE_SIZE", 1024))
+SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", 300))
+
+# Memoized application vectors for repeat submissions (see embeddings.cached_application_vector)
+VECTOR_CACHE_SIZE = int(os.getenv("VECTOR_CACHE_SIZE", 4096))
+
+# Cluster-level decision cache behind the query cache (see caching.CentroidCache).
+# All feature vectors are non-negative, so unrelated profiles routinely exceed
+# 0.9 cosine; the threshold must stay tight for cached decisions to be valid.
+CENTROID_CACHE_SIZE = int(os.getenv("CENTROID_CACHE_SIZE", 10000))
+CENTROID_CACHE_THRESHOLD = float(os.getenv("CENTROID_CACHE_THRESHOLD", 0.995))
+
+# Cached decisions are only shared within the same requested amount and
+# these FICO / DTI / income buckets (see app.decision_scope); income buckets
+# are geometric, each DECISION_SCOPE_INCOME_RATIO times the previous one
+DECISION_SCOPE_FICO_STEP = float(os.getenv("DECISION_SCOPE_FICO_STEP", 10))
+DECISION_SCOPE_DTI_STEP = float(os.getenv("DECISION_SCOPE_DTI_STEP", 1.0))
+DECISION_SCOPE_INCOME_RATIO = float(os.getenv("DECISION_SCOPE_INCOME_RATIO", 1.05))
+
+# /api/stats aggregates are recomputed at most once per TTL (seconds)
+STATS_CACHE_TTL = float(os.getenv("STATS_CACHE_TTL", 30))
+
+# /api/health database/Qdrant probes are cached for this long (seconds)
+HEALTH_CACHE_TTL = float(os.getenv("HEALTH_CACHE_TTL", 2))
+
+# Prime encoders, SQLite and Qdrant when app.py is imported (CREDIT_WARMUP=0 disables)
+WARMUP_ON_IMPORT = os.getenv("CREDIT_WARMUP", "1") == "1"
+
 # LLM Configuration
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
-GEMINI_MODEL = "gemini-1.5-flash"
\ No newline at end of file
+GEMINI_MODEL = "gemini-1.5-flash"
+
+# Gemini explanations run on a thread pool alongside the rest of the pipeline;
+# a decision waits at most this long (seconds) before keeping its template text
+LLM_POOL_WORKERS = int(os.getenv("LLM_POOL_WORKERS", 8))
+LLM_EXPLANATION_TIMEOUT = float(os.getenv("LLM_EXPLANATION_TIMEOUT", 3.0))
+
+# Gemini explanations are memoized per rendered prompt (see llm_explanation)
+EXPLANATION_CACHE_SIZE = int(os.getenv("EXPLANATION_CACHE_SIZE", 4096))
+EXPLANATION_CACHE_TTL = float(os.getenv("EXPLANATION_CACHE_TTL", 3600))
\ No newline at end of file
@@ -0,0 +1,153 @@
+"""
+db_pool.py
+----------
+Process-wide pool of long-lived SQLite connections for the API layer.
+
+Reusing connections avoids a connect()/close() per request and keeps
+SQLite's page cache hot across requests.
+
+Note: This module does NOT create or populate the database
+(handled by data_loader.py).
+"""
+
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from config import DB_PATH, DB_POOL_SIZE
+
+# Applied to every new connection
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-64000",
+    "PRAGMA temp_store=MEMORY",
+)
+
+# Read-path indexes the API relies on. data_loader builds them with the
+# database; app.ensure_read_indexes adds them to older databases
+API_INDEXES = (
+    # Covers the /api/stats GROUP BY so it never touches the table rows
+    "CREATE INDEX IF NOT EXISTS idx_apps_outcome "
+    "ON applications(outcome_category, requested_amount, fico_snapshot)",
+    # Serves the client-history join and its ORDER BY as an index walk
+    "CREATE INDEX IF NOT EXISTS idx_apps_applicant_date "
+    "ON applications(applicant_id, application_date DESC)",
+)
+
+
+class SQLiteConnectionPool:
+    """
+    Bounded pool of sqlite3 connections shared by all request threads.
+
+    Connections are opened lazily (up to `size`) and handed out through
+    `connection()`. When every connection is busy, callers block until one
+    is returned or `timeout` expires.
+
+    Args:
+        db_path: Path to the SQLite database file
+        size: Maximum number of open connections
+        timeout: Seconds to wait for a free connection
+    """
+
+    def __init__(self, db_path: str, size: int = 4, timeout: float = 30.0):
+        self.db_path = db_path
+        self.size = size
+        self.timeout = timeout
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue(maxsize=size)
+        self._opened = 0
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.db_path,
+            check_same_thread=False,
+            isolation_level=None
+        )
+        conn.row_factory = sqlite3.Row
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def _acquire(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if self._opened < self.size:
+                self._opened += 1
+                try:
+                    return self._connect()
+                except Exception:
+                    self._opened -= 1
+                    raise
+
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise TimeoutError(
+                f"No SQLite connection available after {self.timeout}s "
+                f"(pool size={self.size})"
+            )
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a connection for the duration of the `with` block."""
+        conn = self._acquire()
+        try:
+            yield conn
+        finally:
+            self._idle.put(conn)
+
+    def close_all(self) -> None:
+        """Close every idle connection and reset the pool."""
+        with self._lock:
+            while True:
+                try:
+                    self._idle.get_nowait().close()
+                except queue.Empty:
+                    break
+            self._opened = 0
+
+
+_pool: Optional[SQLiteConnectionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> SQLiteConnectionPool:
+    """
+    Return the process-wide pool, creating it on first use.
+
+    Creation is lazy so that forked server workers each open their own
+    connections instead of inheriting the parent's.
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = SQLiteConnectionPool(DB_PATH, size=DB_POOL_SIZE)
+    return _pool
+
+
+@contextmanager
+def get_conn() -> Iterator[sqlite3.Connection]:
+    """
+    Borrow a pooled connection to the CreditTwin database.
+
+    Example:
+        >>> with get_conn() as conn:
+        ...     conn.execute("SELECT COUNT(*) FROM clients").fetchone()[0]
+    """
+    with get_pool().connection() as conn:
+        yield conn
+
+
+def ensure_indexes() -> None:
+    """Create the API read-path indexes if the database lacks them."""
+    with get_conn() as conn:
+        for statement in API_INDEXES:
+            conn.execute(statement)
@@ -7,9 +7,62 @@ This module handles the transformation of loan application data into vectors.
 Separated from vector_store.py to maintain clean architecture.
 """
 
+import threading
 import numpy as np
+import pandas as pd
 from typing import Dict, List, Any
 
+from caching import LRUCache
+from kernels import NUMBA_AVAILABLE, njit
+
+try:
+    from config import VECTOR_CACHE_SIZE
+except ImportError:
+    VECTOR_CACHE_SIZE = 4096
+
+# Grade -> score mapping shared by the scalar and batched encoders
+GRADE_SCORES = {
+    "A": 1.0,
+    "B": 0.85,
+    "C": 0.70,
+    "D": 0.55,
+    "E": 0.40,
+    "F": 0.25,
+    "G": 0.10
+}
+
+# Ratio features: (column, divisor), each capped at 1.0
+RATIO_FEATURES = [
+    ("dti_snapshot", 100),
+    ("payment_to_income_ratio", 1),
+    ("loan_to_income_ratio", 1),
+    ("revolving_utilization_snapshot", 100),
+]
+
+# Client history and negative signals: (column, divisor), capped at 1.0
+COUNT_FEATURES = [
+    ("credit_history_length_snapshot", 50),
+    ("nb_previous_loans", 10),
+    ("open_accounts", 30),
+    ("total_accounts", 50),
+    ("delinquencies_2y", 10),
+    ("inquiries_6m", 10),
+    ("public_records", 5),
+]
+
+# One-hot categories, in vector order
+TERMS = [" 36 months", " 60 months"]
+PURPOSES = ["debt_consolidation", "credit_card", "home_improvement", "other", "major_purchase"]
+
+# Every application field the encoders read, in a fixed order
+VECTOR_FIELDS = (
+    ("requested_amount", "annual_income_snapshot")
+    + tuple(name for name, _ in RATIO_FEATURES)
+    + ("fico_snapshot",)
+    + tuple(name for name, _ in COUNT_FEATURES)
+    + ("term", "grade", "loan_purpose")
+)
+
 
 def encode_grade(grade: str) -> float:
     """
@@ -24,19 +77,97 @@ def encode_grade(grade: str) -> float:
     if not grade:
         return 0.5
     
-    grades = {
-        "A": 1.0,
-        "B": 0.85,
-        "C": 0.70,
-        "D": 0.55,
-        "E": 0.40,
-        "F": 0.25,
-        "G": 0.10
-    }
-    return grades.get(grade.strip(), 0.5)
+    return GRADE_SCORES.get(grade.strip(), 0.5)
+
+
+# Fixed-position features written by the vector kernel (rest is zero padding)
+N_FEATURES = 2 + len(RATIO_FEATURES) + 1 + len(COUNT_FEATURES) + len(TERMS) + 1 + len(PURPOSES)
+
+# Divisors of the capped numeric features, in vector order after the amounts
+_RATIO_DIVISORS = np.array([divisor for _, divisor in RATIO_FEATURES], dtype=np.float64)
+_COUNT_DIVISORS = np.array([divisor for _, divisor in COUNT_FEATURES], dtype=np.float64)
+_N_TERMS = len(TERMS)
+
+# Grade lookup table for the batched encoder: category code -> score, with
+# the trailing entry (code -1, unknown grade) holding the 0.5 default
+_GRADES = list(GRADE_SCORES)
+_GRADE_LUT = np.array(list(GRADE_SCORES.values()) + [0.5], dtype=np.float64)
+
+
+@njit(cache=True, fastmath=True)
+def _fill_vector(amounts, ratios, fico, counts, term_index, grade_score, purpose_index, out):
+    """
+    Write the application features into a preallocated float32 buffer
+    
+    Args:
+        amounts: [requested_amount, annual_income] (float64)
+        ratios: Raw ratio features, same order as RATIO_FEATURES (float64)
+        fico: FICO score (650 when unknown)
+        counts: Raw history/negative-signal features, same order as COUNT_FEATURES
+        term_index: Position in TERMS, or -1
+        grade_score: Output of encode_grade
+        purpose_index: Position in PURPOSES, or -1
+        out: float32 buffer of at least N_FEATURES entries
+    """
+    out[:] = 0.0
+    pos = 0
+    
+    # Amounts (log-normalized)
+    for i in range(amounts.shape[0]):
+        out[pos] = np.log1p(amounts[i]) / 15
+        pos += 1
+    
+    # Financial ratios (capped at 1.0)
+    for i in range(ratios.shape[0]):
+        out[pos] = min(ratios[i] / _RATIO_DIVISORS[i], 1.0)
+        pos += 1
+    
+    # Credit score
+    out[pos] = fico / 850
+    pos += 1
+    
+    # Client history and negative signals (capped at 1.0)
+    for i in range(counts.shape[0]):
+        out[pos] = min(counts[i] / _COUNT_DIVISORS[i], 1.0)
+        pos += 1
+    
+    # Term (one-hot)
+    if term_index >= 0:
+        out[pos + term_index] = 1.0
+    pos += _N_TERMS
+    
+    # Grade
+    out[pos] = grade_score
+    pos += 1
+    
+    # Purpose (one-hot, top 5)
+    if purpose_index >= 0:
+        out[pos + purpose_index] = 1.0
+
+
+# Per-thread scratch buffers for _fill_vector, keyed by length
+_TLS = threading.local()
+
+
+def _get_buf(size: int) -> np.ndarray:
+    """Return this thread's reusable float32 buffer of the given length."""
+    buffers = getattr(_TLS, "buffers", None)
+    if buffers is None:
+        buffers = _TLS.buffers = {}
+    buf = buffers.get(size)
+    if buf is None:
+        buf = buffers[size] = np.empty(size, dtype=np.float32)
+    return buf
+
 
+def _category_index(values: List[str], value: Any) -> int:
+    try:
+        return values.index(value)
+    except ValueError:
+        return -1
 
-def create_application_vector(application: Dict[str, Any], vector_size: int = 50) -> List[float]:
+
+def create_application_vector(application: Dict[str, Any], vector_size: int = 50) -> np.ndarray:
     """
     Create a normalized vector from a loan application
     
@@ -45,58 +176,160 @@ def create_application_vector(application: Dict[str, Any], vector_size: int = 50
     - Min-max normalization for ratios
     - One-hot encoding for categories
     
+    Fields are extracted here and the arithmetic runs in _fill_vector,
+    which is JIT-compiled when numba is installed.
+    
     Args:
         application: Dict containing application features
         vector_size: Target vector dimension (default: 50)
     
     Returns:
-        List of normalized floats between 0 and 1
+        float32 array of normalized values between 0 and 1
     """
     
-    # Continuous features (normalized)
-    vector = [
-        # Amounts (log-normalized)
-        np.log1p(application.get("requested_amount") or 0) / 15,
-        np.log1p(application.get("annual_income_snapshot") or 0) / 15,
-        
-        # Financial ratios (capped at 1.0)
-        min((application.get("dti_snapshot") or 0) / 100, 1),
-        min((application.get("payment_to_income_ratio") or 0), 1),
-        min((application.get("loan_to_income_ratio") or 0), 1),
-        min((application.get("revolving_utilization_snapshot") or 0) / 100, 1),
-        
-        # Credit score
-        (application.get("fico_snapshot") or 650) / 850,
-        
-        # Client history
-        min((application.get("credit_history_length_snapshot") or 0) / 50, 1),
-        min((application.get("nb_previous_loans") or 0) / 10, 1),
-        min((application.get("open_accounts") or 0) / 30, 1),
-        min((application.get("total_accounts") or 0) / 50, 1),
-        
-        # Negative signals
-        min((application.get("delinquencies_2y") or 0) / 10, 1),
-        min((application.get("inquiries_6m") or 0) / 10, 1),
-        min((application.get("public_records") or 0) / 5, 1),
-        
-        # Categorical features (one-hot encoding)
-        # Term
-        1.0 if application.get("term") == " 36 months" else 0.0,
-        1.0 if application.get("term") == " 60 months" else 0.0,
-        
-        # Grade
-        encode_grade(application.get("grade")),
-        
-        # Purpose (top 5)
-        1.0 if application.get("loan_purpose") == "debt_consolidation" else 0.0,
-        1.0 if application.get("loan_purpose") == "credit_card" else 0.0,
-        1.0 if application.get("loan_purpose") == "home_improvement" else 0.0,
-        1.0 if application.get("loan_purpose") == "other" else 0.0,
-        1.0 if application.get("loan_purpose") == "major_purchase" else 0.0,
-    ]
-    
-    # Pad to vector_size
-    while len(vector) < vector_size:
-        vector.append(0.0)
-    
-    return vector[:vector_size]
\ No newline at end of file
+    get = application.get
+    
+    amounts = np.array([
+        get("requested_amount") or 0,
+        get("annual_income_snapshot") or 0,
+    ], dtype=np.float64)
+    ratios = np.array([get(name) or 0 for name, _ in RATIO_FEATURES], dtype=np.float64)
+    counts = np.array([get(name) or 0 for name, _ in COUNT_FEATURES], dtype=np.float64)
+    
+    out = _get_buf(max(vector_size, N_FEATURES))
+    _fill_vector(
+        amounts,
+        ratios,
+        float(get("fico_snapshot") or 650),
+        counts,
+        _category_index(TERMS, get("term")),
+        encode_grade(get("grade")),
+        _category_index(PURPOSES, get("loan_purpose")),
+        out
+    )
+    
+    # The buffer is reused by the next call on this thread: hand out a copy
+    return out[:vector_size].copy()
+
+
+# Vectors of recently seen applications, keyed by their VECTOR_FIELDS values
+_VECTOR_CACHE = LRUCache(maxsize=VECTOR_CACHE_SIZE)
+
+
+def cached_application_vector(application: Dict[str, Any], vector_size: int = 50) -> np.ndarray:
+    """
+    Memoized create_application_vector for repeat submissions
+    
+    The key holds only the fields the encoder reads, so re-submitted or
+    re-scored applications hit even when unrelated fields differ.
+    
+    Args:
+        application: Dict containing application features
+        vector_size: Target vector dimension (default: 50)
+    
+    Returns:
+        Read-only float32 array of normalized values between 0 and 1
+        (shared between callers; copy it before modifying)
+    """
+    get = application.get
+    key = (vector_size,) + tuple(get(name) for name in VECTOR_FIELDS)
+    
+    try:
+        vector = _VECTOR_CACHE.get(key)
+    except TypeError:
+        # Unhashable field values: encode without caching
+        return create_application_vector(application, vector_size)
+    
+    if vector is None:
+        vector = create_application_vector(application, vector_size)
+        vector.flags.writeable = False
+        _VECTOR_CACHE.set(key, vector)
+    return vector
+
+
+def create_application_vectors(df: pd.DataFrame, vector_size: int = 50) -> np.ndarray:
+    """
+    Batched version of create_application_vector for a whole DataFrame
+    
+    Produces the same features, in the same order, as the per-row encoder
+    using column-wise NumPy operations instead of a Python loop.
+    
+    Args:
+        df: One application per row (same keys as create_application_vector)
+        vector_size: Target vector dimension (default: 50)
+    
+    Returns:
+        float32 array of shape (len(df), vector_size)
+    
+    Example:
+        >>> df = pd.DataFrame(json.load(open("loan_requests.json")))
+        >>> vectors = create_application_vectors(df, vector_size=50)
+        >>> vectors.shape
+        (859, 50)
+    """
+    
+    n = len(df)
+    rows = np.arange(n)
+    
+    def numeric(column: str, default: float = 0.0) -> np.ndarray:
+        # Mirrors `application.get(column) or default`: missing, null and 0
+        if column not in df:
+            return np.full(n, default)
+        values = pd.to_numeric(df[column], errors="coerce").to_numpy(np.float64)
+        return np.where(np.isnan(values) | (values == 0), default, values)
+    
+    def codes(column: str, categories: List[str]) -> np.ndarray:
+        # Position of each value in `categories`, -1 when absent/unknown
+        if column not in df:
+            return np.full(n, -1, dtype=np.int8)
+        return pd.Categorical(df[column].astype(object), categories=categories).codes
+    
+    def one_hot(pos: int, column: str, categories: List[str]) -> None:
+        index = codes(column, categories)
+        known = index >= 0
+        out[rows[known], pos + index[known]] = 1.0
+    
+    # Fill a preallocated buffer column by column, in kernel order
+    out = np.zeros((n, max(vector_size, N_FEATURES)), dtype=np.float32)
+    
+    # Amounts (log-normalized)
+    out[:, 0] = np.log1p(numeric("requested_amount")) / 15
+    out[:, 1] = np.log1p(numeric("annual_income_snapshot")) / 15
+    pos = 2
+    
+    # Financial ratios (capped at 1.0)
+    for name, divisor in RATIO_FEATURES:
+        out[:, pos] = np.minimum(numeric(name) / divisor, 1)
+        pos += 1
+    
+    # Credit score
+    out[:, pos] = numeric("fico_snapshot", 650) / 850
+    pos += 1
+    
+    # Client history and negative signals (capped at 1.0)
+    for name, divisor in COUNT_FEATURES:
+        out[:, pos] = np.minimum(numeric(name) / divisor, 1)
+        pos += 1
+    
+    # Term (one-hot)
+    one_hot(pos, "term", TERMS)
+    pos += _N_TERMS
+    
+    # Grade (category codes into a score LUT; code -1 picks the 0.5 default)
+    if "grade" in df:
+        grade = df["grade"].astype(object).where(df["grade"].notna(), "").astype(str).str.strip()
+        out[:, pos] = _GRADE_LUT[pd.Categorical(grade, categories=_GRADES).codes]
+    else:
+        out[:, pos] = 0.5
+    pos += 1
+    
+    # Purpose (one-hot, top 5)
+    one_hot(pos, "loan_purpose", PURPOSES)
+    
+    # Truncate to vector_size (zero padding is already in place)
+    return out[:, :vector_size]
+
+
+# Compile the kernel once at import instead of on the first API request
+if NUMBA_AVAILABLE:
+    create_application_vector({})
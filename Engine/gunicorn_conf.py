@@ -0,0 +1,58 @@
+"""
+gunicorn_conf.py
+----------------
+Production server settings for the CreditTwin API.
+
+Usage (from the Engine/ directory):
+    gunicorn -c gunicorn_conf.py app:app
+
+Qdrant's local mode keeps an exclusive file lock on db/qdrant_storage, so
+only one process may open it. Without QDRANT_URL the API therefore runs as
+a single threaded worker; with a remote Qdrant server it scales out to
+several threaded workers.
+
+Workers are gthread, not gevent, in both modes: Qdrant over gRPC
+(QDRANT_PREFER_GRPC) and Gemini both use grpcio, and neither grpcio nor
+sqlite3 yields to gevent, so one call would block every request of the
+worker.
+"""
+
+import multiprocessing
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:5000")
+
+# Warm up in each worker after fork, not in the preloaded master (which
+# would otherwise open Qdrant before forking)
+_WARMUP = os.getenv("CREDIT_WARMUP", "1") == "1"
+os.environ["CREDIT_WARMUP"] = "0"
+
+# Load the app once in the master and share it with workers. Importing app
+# opens neither Qdrant nor SQLite (clients and the pool are created on first
+# use), so each worker opens its own after the fork.
+preload_app = True
+keepalive = 5
+timeout = 120
+
+if os.getenv("QDRANT_URL"):
+    # Remote Qdrant: one worker per core (+1), I/O-bound requests overlap on threads
+    workers = int(os.getenv("GUNICORN_WORKERS", multiprocessing.cpu_count() + 1))
+    worker_class = "gthread"
+    threads = int(os.getenv("GUNICORN_THREADS", 8))
+else:
+    # Local Qdrant: one process holds the storage lock, threads share it
+    workers = 1
+    worker_class = "gthread"
+    threads = int(os.getenv("GUNICORN_THREADS", 4))
+
+
+def post_worker_init(worker):
+    from app import ensure_read_indexes
+    ensure_read_indexes()
+    if _WARMUP:
+        from app import warmup
+        warmup()
@@ -0,0 +1,116 @@
+"""
+kernels.py
+----------
+Numeric kernels shared by the encoders, the twin analysis and the vector store.
+
+Kernels are JIT-compiled with numba when it is installed; without it,
+`njit` is a no-op and callers use the equivalent NumPy expressions.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit when numba is not installed."""
+        if args and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+
+# Twin outcomes as small integer codes (stored in the payload as outcome_code)
+OUTCOMES = ("success", "default", "late_payments", "rejected")
+OUTCOME_CODES = {outcome: code for code, outcome in enumerate(OUTCOMES)}
+OTHER_OUTCOME = len(OUTCOMES)
+
+
+@njit(cache=True)
+def _tally_jit(codes, scores, n_codes):
+    counts = np.zeros(n_codes, dtype=np.int64)
+    total = 0.0
+    best = -np.inf
+    for i in range(codes.shape[0]):
+        counts[codes[i]] += 1
+        score = scores[i]
+        total += score
+        if score > best:
+            best = score
+    return counts, total / codes.shape[0], best
+
+
+def tally_outcomes(codes, scores):
+    """
+    Count outcome codes and summarize similarity scores in one pass
+
+    Args:
+        codes: int64 array of outcome codes (see OUTCOME_CODES), non-empty
+        scores: float64 array of similarity scores, aligned with codes
+
+    Returns:
+        (counts per code including OTHER_OUTCOME, mean score, max score)
+    """
+    if NUMBA_AVAILABLE:
+        counts, mean, best = _tally_jit(codes, scores, OTHER_OUTCOME + 1)
+        return counts, float(mean), float(best)
+    counts = np.bincount(codes, minlength=OTHER_OUTCOME + 1)
+    return counts, float(scores.mean()), float(scores.max())
+
+
+@njit(cache=True, fastmath=True)
+def _dot_rows_jit(X, q):
+    out = np.empty(X.shape[0], dtype=np.float32)
+    for i in range(X.shape[0]):
+        total = np.float32(0.0)
+        for j in range(X.shape[1]):
+            total += X[i, j] * q[j]
+        out[i] = total
+    return out
+
+
+def cosine_scores(X, q):
+    """
+    Cosine similarity of every row of X with q
+
+    Args:
+        X: (n, d) candidate vectors
+        q: (d,) query vector
+
+    Returns:
+        float32 array of n similarities (0 for zero vectors)
+    """
+    X = np.ascontiguousarray(X, dtype=np.float32)
+    q = np.ascontiguousarray(q, dtype=np.float32)
+    row_norms = np.linalg.norm(X, axis=1)
+    row_norms[row_norms == 0] = 1.0
+    q_norm = float(np.linalg.norm(q)) or 1.0
+    X = X / row_norms[:, None]
+    q = q / np.float32(q_norm)
+    if NUMBA_AVAILABLE:
+        return _dot_rows_jit(X, q)
+    return X @ q
+
+
+def rescore(results, vectors, q):
+    """
+    Replace result scores with exact float32 cosine similarity and re-rank
+
+    Args:
+        results: {"payload", "score"} dicts, aligned with vectors
+        vectors: (n, d) stored vectors of the results
+        q: Query vector
+
+    Returns:
+        New list of result dicts, best first (ties keep their input order)
+    """
+    if not results:
+        return []
+    scores = cosine_scores(vectors, q)
+    order = np.argsort(-scores, kind="stable")
+    return [
+        {"payload": results[i]["payload"], "score": float(scores[i])}
+        for i in order.tolist()
+    ]
@@ -4,53 +4,42 @@ llm_explanation.py
 Module for generating human-friendly credit decision explanations using Google Gemini.
 """
 
+import asyncio
 import google.generativeai as genai
-from config import GOOGLE_API_KEY, GEMINI_MODEL
+from caching import LRUCache
+from config import GOOGLE_API_KEY, GEMINI_MODEL, EXPLANATION_CACHE_SIZE, EXPLANATION_CACHE_TTL
 import logging
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Configure Gemini
+# Configure Gemini once; the model client is shared by every call
+_MODEL = None
 if GOOGLE_API_KEY:
     genai.configure(api_key=GOOGLE_API_KEY)
+    _MODEL = genai.GenerativeModel(GEMINI_MODEL)
 else:
     logger.warning("GOOGLE_API_KEY not found in environment. LLM explanations will be disabled.")
 
-def get_llm_explanation(decision_data, applicant_info):
-    """
-    Generate a human-friendly explanation for a credit decision using Google Gemini.
-    
-    Args:
-        decision_data: The decision dictionary (decision, confidence, reason, analysis, etc.)
-        applicant_info: The original application data
-        
-    Returns:
-        A string containing the AI-generated explanation or None if LLM is unavailable.
-    """
-    if not GOOGLE_API_KEY:
-        return None
 
-    try:
-        model = genai.GenerativeModel(GEMINI_MODEL)
-        
-        # Prepare context for the prompt
-        prompt = f"""
+# Prompt with one %s placeholder per applicant/decision field, filled with
+# PROMPT_TEMPLATE % prompt_fields(...) (literal percent signs are doubled)
+PROMPT_TEMPLATE = """
         You are a helpful and empathetic financial advisor at 'CreditTwin', a premium financial intelligence platform.
         Your task is to explain a credit decision to a customer based on 'Financial Twin Matching' (comparing them to similar historical cases).
 
         DECISION DETAILS:
-        - Decision: {decision_data.get('decision')}
-        - Confidence: {decision_data.get('confidence', 0)*100:.1f}%
-        - Core Reason: {decision_data.get('reason')}
-        - Success Rate among similar profiles: {decision_data.get('analysis', {}).get('success_rate', 0)*100:.1f}%
+        - Decision: %s
+        - Confidence: %s%%
+        - Core Reason: %s
+        - Success Rate among similar profiles: %s%%
         
         APPLICANT PROFILE:
-        - Requested Amount: ${applicant_info.get('requested_amount', 0):,}
-        - FICO Score: {applicant_info.get('fico_snapshot')}
-        - Debt-to-Income (DTI): {applicant_info.get('dti_snapshot', 0):.1f}%
-        - Monthly Income: ${applicant_info.get('annual_income_snapshot', 0)/12:,.0f}
+        - Requested Amount: $%s
+        - FICO Score: %s
+        - Debt-to-Income (DTI): %s%%
+        - Monthly Income: $%s
 
         GUIDELINES:
         1. Be transparent but supportive.
@@ -63,9 +52,118 @@ def get_llm_explanation(decision_data, applicant_info):
         Write the explanation for the customer:
         """
 
-        response = model.generate_content(prompt)
-        return response.text.strip()
+# Explanations already generated, keyed by prompt_fields()
+EXPLANATION_CACHE = LRUCache(maxsize=EXPLANATION_CACHE_SIZE, ttl=EXPLANATION_CACHE_TTL)
+
+
+def prompt_fields(decision_data, applicant_info):
+    """
+    Format the values shown in the prompt, in PROMPT_TEMPLATE order.
+    
+    The prompt depends on nothing else, so the tuple doubles as the key
+    of EXPLANATION_CACHE.
+    
+    Args:
+        decision_data: The decision dictionary (decision, confidence, reason, analysis, etc.)
+        applicant_info: The original application data
+        
+    Returns:
+        Tuple of formatted strings
+    """
+    decision_get = decision_data.get
+    applicant_get = applicant_info.get
+    return (
+        str(decision_get('decision')),
+        format(decision_get('confidence', 0) * 100, ".1f"),
+        str(decision_get('reason')),
+        format((decision_get('analysis') or {}).get('success_rate', 0) * 100, ".1f"),
+        format(applicant_get('requested_amount', 0), ","),
+        str(applicant_get('fico_snapshot')),
+        format(applicant_get('dti_snapshot', 0), ".1f"),
+        format(applicant_get('annual_income_snapshot', 0) / 12, ",.0f"),
+    )
+
+
+def build_prompt(decision_data, applicant_info):
+    """
+    Build the Gemini prompt for a credit decision.
+    
+    Args:
+        decision_data: The decision dictionary (decision, confidence, reason, analysis, etc.)
+        applicant_info: The original application data
+        
+    Returns:
+        The prompt string
+    """
+    return PROMPT_TEMPLATE % prompt_fields(decision_data, applicant_info)
+
+
+def llm_available():
+    """Return True when Gemini is configured and explanations can be generated."""
+    return _MODEL is not None
+
+
+def get_llm_explanation(decision_data, applicant_info):
+    """
+    Generate a human-friendly explanation for a credit decision using Google Gemini.
+    
+    Args:
+        decision_data: The decision dictionary (decision, confidence, reason, analysis, etc.)
+        applicant_info: The original application data
+        
+    Returns:
+        A string containing the AI-generated explanation or None if LLM is unavailable.
+    """
+    if _MODEL is None:
+        return None
+
+    try:
+        fields = prompt_fields(decision_data, applicant_info)
+        explanation = EXPLANATION_CACHE.get(fields)
+        if explanation is None:
+            response = _MODEL.generate_content(PROMPT_TEMPLATE % fields)
+            explanation = response.text.strip()
+            EXPLANATION_CACHE.set(fields, explanation)
+        return explanation
+
+    except Exception as e:
+        logger.error(f"Error generating LLM explanation: {e}")
+        return None
+
+
+async def get_llm_explanation_async(decision_data, applicant_info):
+    """
+    Async variant of get_llm_explanation (same arguments and return value).
+    
+    Awaiting several of these concurrently overlaps the Gemini round-trips.
+    """
+    if _MODEL is None:
+        return None
+
+    try:
+        fields = prompt_fields(decision_data, applicant_info)
+        explanation = EXPLANATION_CACHE.get(fields)
+        if explanation is None:
+            response = await _MODEL.generate_content_async(PROMPT_TEMPLATE % fields)
+            explanation = response.text.strip()
+            EXPLANATION_CACHE.set(fields, explanation)
+        return explanation
 
     except Exception as e:
         logger.error(f"Error generating LLM explanation: {e}")
         return None
+
+
+async def get_llm_explanations_async(requests):
+    """
+    Generate explanations for several decisions concurrently.
+    
+    Args:
+        requests: Iterable of (decision_data, applicant_info) pairs
+        
+    Returns:
+        List of explanations (or None), in the same order as `requests`
+    """
+    return await asyncio.gather(
+        *(get_llm_explanation_async(decision, applicant) for decision, applicant in requests)
+    )
@@ -1,5 +1,9 @@
-import pandas as pd
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from itertools import accumulate, islice, repeat
+import math
 import os
+import random
 import sys
 
 # Force UTF-8 for stdout/stderr to avoid UnicodeEncodeError with emojis on Windows
@@ -13,35 +17,122 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 LARGE_REJECTED = os.path.join(BASE_DIR, "data", "rejected_2007_to_2018Q4.csv")
 SAMPLED_REJECTED = os.path.join(BASE_DIR, "data", "rejected_lite.csv")
 
-def sample_rejected_data(n=150000):
+def reservoir_sample(lines, n, rng):
+    """
+    Uniformly sample n items from an iterable in one pass (Algorithm L)
+    
+    Instead of drawing a random number per item, the gap to the next
+    replacement is drawn directly and skipped with islice, so the cost
+    is O(n * log(N / n)) random draws for N items.
+    """
+    it = iter(lines)
+    reservoir = list(islice(it, n))
+    if len(reservoir) < n:
+        return reservoir
+    
+    w = math.exp(math.log(1.0 - rng.random()) / n)
+    while True:
+        skip = math.floor(math.log(1.0 - rng.random()) / math.log(1.0 - w))
+        item = next(islice(it, skip, skip + 1), None)
+        if item is None:
+            return reservoir
+        reservoir[rng.randrange(n)] = item
+        w *= math.exp(math.log(1.0 - rng.random()) / n)
+
+
+def _range_lines(f, start, end):
+    """
+    Yield the lines of a binary file that start within [start, end)
+    
+    A line straddling `start` belongs to the previous range, so K ranges
+    split the file into disjoint sets of whole lines.
+    """
+    if start > 0:
+        f.seek(start - 1)
+        f.readline()
+    pos = f.tell()
+    while pos < end:
+        line = f.readline()
+        if not line:
+            break
+        pos += len(line)
+        yield line
+
+
+def _sample_range(path, start, end, n, seed):
+    """
+    Worker: reservoir-sample one byte range of the CSV
+    
+    Returns:
+        (number of rows in the range, up to n sampled raw lines)
+    """
+    rng = random.Random(seed)
+    rows = 0
+    
+    def counted(lines):
+        nonlocal rows
+        for line in lines:
+            rows += 1
+            yield line
+    
+    with open(path, "rb") as f:
+        sampled = reservoir_sample(counted(_range_lines(f, start, end)), n, rng)
+    return rows, sampled
+
+
+def merge_samples(parts, n, rng):
+    """
+    Combine per-range reservoirs into one uniform sample of n rows
+    
+    n positions are drawn without replacement over all rows; the number
+    landing in each range is how many rows that range contributes, taken
+    as a random subset of its (already uniform) reservoir.
+    """
+    counts = [rows for rows, _ in parts]
+    bounds = list(accumulate(counts))
+    total = bounds[-1] if bounds else 0
+    
+    quotas = [0] * len(parts)
+    for position in rng.sample(range(total), min(n, total)):
+        quotas[bisect_right(bounds, position)] += 1
+    
+    merged = []
+    for (_, sampled), quota in zip(parts, quotas):
+        merged.extend(rng.sample(sampled, quota))
+    return merged
+
+
+def sample_rejected_data(n=150000, seed=0, workers=None):
     print(f"🔍 Sampling {n} rows from {LARGE_REJECTED}...")
     
     if not os.path.exists(LARGE_REJECTED):
         print(f"❌ File not found: {LARGE_REJECTED}")
         return
 
-    # Using chunksize to be memory efficient
-    chunks = pd.read_csv(LARGE_REJECTED, chunksize=50000, low_memory=False)
+    with open(LARGE_REJECTED, "rb") as f:
+        header = f.readline()
     
-    sampled_chunks = []
-    total_rows = 0
+    # Split the body into byte ranges, each sampled by its own process.
+    # Rows are streamed as raw lines: rows that are not kept are never parsed
+    workers = workers or os.cpu_count() or 1
+    start, size = len(header), os.path.getsize(LARGE_REJECTED)
+    bounds = [start + (size - start) * i // workers for i in range(workers + 1)]
     
-    for chunk in chunks:
-        # We take a fraction of each chunk to get a distributed sample
-        # Total rows in the large file is roughly 27M. 
-        # 150k / 27M = 0.0055
-        sample_size = min(len(chunk), int(n / 540) + 1) # Estimated fraction
-        sampled_chunks.append(chunk.sample(min(len(chunk), sample_size)))
-        total_rows += len(sampled_chunks[-1])
-        if total_rows >= n:
-            break
-            
-    df_sampled = pd.concat(sampled_chunks).head(n)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        parts = list(pool.map(
+            _sample_range,
+            repeat(LARGE_REJECTED), bounds[:-1], bounds[1:], repeat(n),
+            [seed + i + 1 for i in range(workers)]
+        ))
+    sampled = merge_samples(parts, n, random.Random(seed))
     
-    print(f"✅ Successfully sampled {len(df_sampled)} rows.")
+    print(f"✅ Successfully sampled {len(sampled)} rows.")
     
-    # Save to CSV
-    df_sampled.to_csv(SAMPLED_REJECTED, index=False)
+    # Save to CSV (rows are copied verbatim, only the last may lack a newline)
+    with open(SAMPLED_REJECTED, "wb") as f:
+        f.write(header)
+        for line in sampled:
+            f.write(line if line.endswith(b"\n") else line + b"\n")
     print(f"💾 Saved to: {SAMPLED_REJECTED}")
 
 if __name__ == "__main__":
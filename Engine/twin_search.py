@@ -5,24 +5,115 @@ Search for "financial twins" in history and make decisions
 based on their actual outcomes.
 """
 
+import asyncio
+import logging
 import sys
-from embeddings import create_application_vector
-from vector_store import search_similar
-from config import VECTOR_SIZE
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import List, Optional
+import pandas as pd
+from embeddings import cached_application_vector, create_application_vectors
+from kernels import OTHER_OUTCOME, OUTCOME_CODES, tally_outcomes
+from vector_store import asearch_similar, search_similar, search_similar_batch
+from config import (
+    VECTOR_SIZE,
+    LLM_POOL_WORKERS,
+    LLM_EXPLANATION_TIMEOUT
+)
 import numpy as np
-from datetime import datetime
-from llm_explanation import get_llm_explanation
+from llm_explanation import get_llm_explanation, llm_available
+
+logger = logging.getLogger(__name__)
 
 # Performance: We'll pre-calculate some "Roadmap" thresholds
 SUCCESS_THRESH = 0.85
 LATE_RISK_THRESH = 0.15
 FRAUD_SIMILARITY_LIMIT = 0.999 # Very high similarity to multiple historical IDs is suspicious
+TWIN_TOP_K = 100 # Twins retrieved per application
+TOP_TWINS_SHOWN = 5 # Best twins listed in the analysis
+
+# Features without which no meaningful twin match exists (amounts must also be > 0)
+PRECHECK_FIELDS = ("fico_snapshot", "dti_snapshot", "annual_income_snapshot", "requested_amount")
+PRECHECK_POSITIVE_FIELDS = ("annual_income_snapshot", "requested_amount")
+
+# LLM explanations are generated here while decisions are assembled (see finalize_explanation)
+_LLM_POOL = ThreadPoolExecutor(max_workers=LLM_POOL_WORKERS, thread_name_prefix="llm")
+_EXPLANATION_FUTURE = "_explanation_future"
+
+# Slotted dataclasses need Python 3.10+; older interpreters get a plain dataclass
+_DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(**_DATACLASS_SLOTS)
+class Decision:
+    """
+    Outcome of a twin search, one shape for every decision label
+    
+    The pipeline fills it in step by step; asdict() turns it into the
+    JSON-ready dict returned by find_twins. Fields a label does not use
+    stay None (or empty), so callers never need to probe for keys.
+    """
+    decision: str
+    confidence: float
+    reason: str
+    conditions: List[str] = field(default_factory=list)
+    recommended_amount: Optional[float] = None
+    analysis: Optional[dict] = None
+    roadmap: Optional[dict] = None
+    alternative_offer: Optional[dict] = None
+    nudge: Optional[dict] = None
+    explanation: Optional[str] = None
+    is_fraud_suspect: bool = False
+    twins_found: Optional[int] = None
+    action: Optional[str] = None
 
-# Force UTF-8 for stdout/stderr to avoid UnicodeEncodeError with emojis on Windows
-if hasattr(sys.stdout, 'reconfigure'):
-    sys.stdout.reconfigure(encoding='utf-8')
-if hasattr(sys.stderr, 'reconfigure'):
-    sys.stderr.reconfigure(encoding='utf-8')
+
+# Force UTF-8 for stdout/stderr to avoid UnicodeEncodeError with emojis on Windows.
+# Only needed there, and only once per process: streams already in UTF-8
+# (e.g. reconfigured by an earlier import) are left alone.
+if sys.platform == "win32":
+    for stream in (sys.stdout, sys.stderr):
+        if hasattr(stream, 'reconfigure') and (stream.encoding or '').lower() != 'utf-8':
+            stream.reconfigure(encoding='utf-8')
+
+
+# Template explanation per decision label, filled with the twin statistics
+FRIENDLY_TEMPLATES = {
+    "APPROVED": (
+        "Your application shows a very strong alignment with successful historical cases. "
+        "With a {success_rate:.0f}% success rate among your 'financial twins,' we have high "
+        "confidence in this approval."
+    ),
+    "APPROVED_WITH_CONDITIONS": (
+        "We've approved your request with tailored conditions to ensure your success. "
+        "Applicants with your profile have a solid {success_rate:.0f}% success rate, "
+        "though we've identified moderate risks that require slight adjustments to the loan terms. "
+        "This approach helps balance your current needs with long-term financial safety."
+    ),
+    "REJECTED": (
+        "After comparing your application to thousands of 'financial twins,' we cannot approve your request today. "
+        "The historical data for similar profiles indicates a higher risk of repayment challenges. "
+        "We recommend focusing on your debt-to-income ratio or credit score to improve your profile for future requests."
+    ),
+    "ANOMALY_DETECTED": (
+        "Your unique financial request has been flagged for prioritized manual review by our experts. "
+        "Because we found very few similar historical cases, we want to ensure a human specialist "
+        "personally evaluates your situation rather than relying on automated matching. "
+        "This ensures you receive a fair and comprehensive assessment."
+    ),
+    "MANUAL_REVIEW": (
+        "The engine has categorized your request for manual underwriting because the outcomes "
+        "of your 'financial twins' were inconsistent. Since {success_rate:.0f}% of similar cases "
+        "succeeded while others faced challenges, a human specialist will now perform a targeted "
+        "final check to ensure we reach the most fair and accurate decision for you."
+    ),
+}
+
+# Appended to APPROVED explanations when some twins were rejected
+APPROVED_REJECTED_SUFFIX = " Only {rejected_count} out of {total_twins} similar matches were previously rejected."
+
+DEFAULT_EXPLANATION = "Your application is being analyzed using our financial twin matching engine to ensure a fair and data-driven decision."
 
 
 def generate_friendly_explanation(decision_data):
@@ -36,51 +127,145 @@ def generate_friendly_explanation(decision_data):
         A short, supportive, and clear explanation string.
     """
     decision = decision_data.get("decision", "UNKNOWN")
-    confidence = decision_data.get("confidence", 0) * 100
-    analysis = decision_data.get("analysis", {})
+    template = FRIENDLY_TEMPLATES.get(decision)
+    if template is None:
+        return DEFAULT_EXPLANATION
+    
+    analysis = decision_data.get("analysis") or {}
     success_rate = analysis.get("success_rate", 0) * 100
+    msg = template.format(success_rate=success_rate)
+    
     rejected_count = analysis.get("rejected_count", 0)
+    if decision == "APPROVED" and rejected_count > 0:
+        msg += APPROVED_REJECTED_SUFFIX.format(
+            rejected_count=rejected_count, total_twins=analysis["total_twins"]
+        )
+    return msg
+
+
+def request_explanation(decision, new_application):
+    """
+    Set the template explanation and start the LLM one in the background
     
-    # Decisions derived from twin matching
-    if decision == "APPROVED":
-        msg = (f"Your application shows a very strong alignment with successful historical cases. "
-                f"With a {success_rate:.0f}% success rate among your 'financial twins,' we have high "
-                f"confidence in this approval.")
-        if rejected_count > 0:
-            msg += f" Only {rejected_count} out of {analysis['total_twins']} similar matches were previously rejected."
-        return msg
-    
-    elif decision == "APPROVED_WITH_CONDITIONS":
-        return (f"We've approved your request with tailored conditions to ensure your success. "
-                f"Applicants with your profile have a solid {success_rate:.0f}% success rate, "
-                f"though we've identified moderate risks that require slight adjustments to the loan terms. "
-                f"This approach helps balance your current needs with long-term financial safety.")
-        
-    elif decision == "REJECTED":
-        return (f"After comparing your application to thousands of 'financial twins,' we cannot approve your request today. "
-                f"The historical data for similar profiles indicates a higher risk of repayment challenges. "
-                f"We recommend focusing on your debt-to-income ratio or credit score to improve your profile for future requests.")
-        
-    elif decision == "ANOMALY_DETECTED":
-        return (f"Your unique financial request has been flagged for prioritized manual review by our experts. "
-                f"Because we found very few similar historical cases, we want to ensure a human specialist "
-                f"personally evaluates your situation rather than relying on automated matching. "
-                f"This ensures you receive a fair and comprehensive assessment.")
-        
-    elif decision == "MANUAL_REVIEW":
-        return (f"The engine has categorized your request for manual underwriting because the outcomes "
-                f"of your 'financial twins' were inconsistent. Since {success_rate:.0f}% of similar cases "
-                f"succeeded while others faced challenges, a human specialist will now perform a targeted "
-                f"final check to ensure we reach the most fair and accurate decision for you.")
-        
-    return "Your application is being analyzed using our financial twin matching engine to ensure a fair and data-driven decision."
+    The LLM call works on a snapshot of the decision; finalize_explanation
+    swaps its answer in if it arrives in time. A late answer still lands in
+    llm_explanation.EXPLANATION_CACHE for the next identical prompt.
+    
+    Args:
+        decision: Decision dict (completed, apart from the explanation)
+        new_application: Dict with the new application features
+    """
+    decision["explanation"] = generate_friendly_explanation(decision)
+    if llm_available():
+        decision[_EXPLANATION_FUTURE] = _LLM_POOL.submit(
+            get_llm_explanation, dict(decision), new_application
+        )
+
+
+def finalize_explanation(decision, timeout=LLM_EXPLANATION_TIMEOUT):
+    """
+    Wait (up to timeout seconds) for a pending LLM explanation
+    
+    Args:
+        decision: Decision dict from decide_from_twins
+        timeout: Maximum wait in seconds
+    
+    Returns:
+        The same decision dict, with the LLM explanation when available
+    """
+    future = decision.pop(_EXPLANATION_FUTURE, None)
+    if future is not None:
+        try:
+            explanation = future.result(timeout=max(timeout, 0))
+        except Exception:
+            # Timed out or failed: keep the template explanation
+            explanation = None
+        if explanation:
+            decision["explanation"] = explanation
+    return decision
+
+
+async def afinalize_explanation(decision, timeout=LLM_EXPLANATION_TIMEOUT):
+    """
+    Async counterpart of finalize_explanation: awaits instead of blocking
+    
+    A timed-out LLM call is left running (shielded) so its answer still
+    reaches the explanation caches.
+    """
+    future = decision.pop(_EXPLANATION_FUTURE, None)
+    if future is not None:
+        try:
+            explanation = await asyncio.wait_for(
+                asyncio.shield(asyncio.wrap_future(future)), timeout=max(timeout, 0)
+            )
+        except Exception:
+            # Timed out or failed: keep the template explanation
+            explanation = None
+        if explanation:
+            decision["explanation"] = explanation
+    return decision
+
+
+def precheck_application(new_application):
+    """
+    Short-circuit applications that are too incomplete to be matched
+    
+    Such applications would end up in manual review anyway; answering
+    here skips the embedding, the Qdrant query and the LLM call.
+    
+    Args:
+        new_application: Dict with the new application features
+    
+    Returns:
+        ANOMALY_DETECTED decision dict, or None if the application can be searched
+    """
+    invalid = [
+        field for field in PRECHECK_FIELDS
+        if new_application.get(field) is None
+        or (field in PRECHECK_POSITIVE_FIELDS and new_application[field] <= 0)
+    ]
+    if not invalid:
+        return None
+    
+    result = asdict(Decision(
+        decision="ANOMALY_DETECTED",
+        confidence=0.0,
+        reason=f"Missing or invalid required features: {', '.join(invalid)}",
+        twins_found=0,
+        action="MANUAL_REVIEW_REQUIRED"
+    ))
+    result["explanation"] = generate_friendly_explanation(result)
+    return result
+
+
+def twin_filters(new_application):
+    """
+    Qdrant filters for an application's twin search
+    
+    Twins are restricted to requested amounts within ±30% of the new one.
+    
+    Args:
+        new_application: Dict with the new application features
+    
+    Returns:
+        Filter dict for vector_store.search_similar, or None
+    """
+    if new_application.get("requested_amount"):
+        return {
+            "requested_amount": {
+                "$gte": new_application["requested_amount"] * 0.7,
+                "$lte": new_application["requested_amount"] * 1.3
+            }
+        }
+    return None
 
 
-def find_twins(new_application, top_k=100, threshold=0.70):
+def find_twins(new_application, top_k=TWIN_TOP_K, threshold=0.70, vector=None):
     """
     Find similar historical applications (twins) and recommend a decision
     
     Process:
+    0. Precheck required features (incomplete applications stop here)
     1. Vectorize the new application
     2. Search for top_k similar vectors in Qdrant
     3. Detect anomalies (< 10 twins found)
@@ -91,123 +276,257 @@ def find_twins(new_application, top_k=100, threshold=0.70):
         new_application: Dict with the new application features
         top_k: Maximum number of twins to return
         threshold: Minimum similarity threshold (0-1)
+        vector: Optional precomputed application vector (skips step 1)
     
     Returns:
         Dict with decision, confidence, reason, and detailed analysis
     """
     
-    print(f"🔍 Searching for twins (top_k={top_k}, threshold={threshold})...")
+    # 0. Nothing to match on: skip embedding, search and LLM
+    incomplete = precheck_application(new_application)
+    if incomplete is not None:
+        return incomplete
+    
+    logger.debug("Searching for twins (top_k=%d, threshold=%.2f)", top_k, threshold)
     
     # 1. Create vector using embeddings module
-    vector = create_application_vector(new_application, vector_size=VECTOR_SIZE)
+    if vector is None:
+        vector = cached_application_vector(new_application, vector_size=VECTOR_SIZE)
     
     # 2. Search using vector_store module
     # Note: Qdrant's search already filters by score_threshold internally
     # For now, we'll get top_k results and the vector_store will handle filtering
     
     # Optional filters for amount range
-    filters = None
-    if new_application.get("requested_amount"):
-        filters = {
-            "requested_amount": {
-                "$gte": new_application["requested_amount"] * 0.7,
-                "$lte": new_application["requested_amount"] * 1.3
-            }
-        }
+    filters = twin_filters(new_application)
     
     # Search using the new vector_store module
     try:
         results = search_similar(vector=vector, top_k=top_k, filters=filters)
     except Exception as e:
-        print(f"⚠️ Search failed (initializing?): {e}")
+        logger.warning("Search failed (initializing?): %s", e)
+        results = []
+    
+    logger.debug("Found %d similar cases", len(results))
+    
+    return finalize_explanation(decide_from_twins(new_application, results))
+
+
+async def afind_twins(new_application, top_k=TWIN_TOP_K, threshold=0.70, vector=None):
+    """
+    Async counterpart of find_twins for event-loop servers
+    
+    The Qdrant query and the wait for the LLM explanation are awaited;
+    encoding and the decision rules are cheap and run inline.
+    
+    Args and Returns: see find_twins
+    """
+    incomplete = precheck_application(new_application)
+    if incomplete is not None:
+        return incomplete
+    
+    logger.debug("Searching for twins (top_k=%d, threshold=%.2f)", top_k, threshold)
+    
+    if vector is None:
+        vector = cached_application_vector(new_application, vector_size=VECTOR_SIZE)
+    
+    try:
+        results = await asearch_similar(vector=vector, top_k=top_k, filters=twin_filters(new_application))
+    except Exception as e:
+        logger.warning("Search failed (initializing?): %s", e)
         results = []
     
-    print(f"   Found {len(results)} similar cases")
+    logger.debug("Found %d similar cases", len(results))
+    
+    return await afinalize_explanation(decide_from_twins(new_application, results))
+
+
+def find_twins_batch(applications, top_k=TWIN_TOP_K, vectors=None):
+    """
+    find_twins for several applications with a single batched Qdrant query
+    
+    Args:
+        applications: List of new application dicts
+        top_k: Maximum number of twins per application
+        vectors: Optional precomputed vectors, one per application
+    
+    Returns:
+        List of decision dicts, in the same order as `applications`
+    """
+    # Incomplete applications are answered without a search
+    decisions = [precheck_application(application) for application in applications]
+    pending = [i for i, decision in enumerate(decisions) if decision is None]
+    if not pending:
+        return decisions
+    
+    searched = [applications[i] for i in pending]
+    if vectors is None:
+        searched_vectors = list(create_application_vectors(pd.DataFrame(searched), vector_size=VECTOR_SIZE))
+    else:
+        searched_vectors = [vectors[i] for i in pending]
+    
+    try:
+        twins = search_similar_batch(
+            searched_vectors,
+            top_k=top_k,
+            filters=[twin_filters(application) for application in searched]
+        )
+    except Exception as e:
+        logger.warning("Batch search failed (initializing?): %s", e)
+        twins = [[] for _ in searched]
+    
+    for i, application, found in zip(pending, searched, twins):
+        decisions[i] = decide_from_twins(application, found)
+    
+    # The LLM calls of the whole batch run concurrently; wait for them
+    # against one shared deadline
+    deadline = time.monotonic() + LLM_EXPLANATION_TIMEOUT
+    return [finalize_explanation(decision, deadline - time.monotonic()) for decision in decisions]
+
+
+def decide_from_twins(new_application, results):
+    """
+    Turn the twins found for an application into a decision (steps 3-9 of find_twins)
+    
+    Args:
+        new_application: Dict with the new application features
+        results: Search results (dicts with 'score' and 'payload'), best first
+    
+    Returns:
+        Dict with decision, confidence, reason, and detailed analysis. The
+        LLM explanation may still be pending: pass it to finalize_explanation.
+    """
+    
+    # Repeated historical applications would count twice in every statistic
+    results = unique_twins(results)
     
     # 3. Anomaly detection
     if len(results) < 10:
-        result = {
-            "decision": "ANOMALY_DETECTED",
-            "reason": f"Only {len(results)} similar cases found (minimum 10 required)",
-            "twins_found": len(results),
-            "action": "MANUAL_REVIEW_REQUIRED",
-            "confidence": 0.0
-        }
-        result["explanation"] = get_llm_explanation(result, new_application) or generate_friendly_explanation(result)
+        result = asdict(Decision(
+            decision="ANOMALY_DETECTED",
+            confidence=0.0,
+            reason=f"Only {len(results)} similar cases found (minimum 10 required)",
+            twins_found=len(results),
+            action="MANUAL_REVIEW_REQUIRED"
+        ))
+        request_explanation(result, new_application)
         return result
     
+    # Unpack the search results once; everything below reads these
+    payloads = [r["payload"] for r in results]
+    scores = [r["score"] for r in results]
+    
     # 4. Analyze twins
-    analysis = analyze_twins(results)
+    analysis = analyze_twins(payloads, scores)
+    
+    # Per-twin signals for steps 5-7, extracted in a single pass (one row per twin)
+    signals = np.array([
+        (
+            p.get("is_fraud_suspect", 0),
+            p.get("is_comeback_story", 0),
+            p["outcome"] == "success",
+            p["requested_amount"] or 0,
+        )
+        for p in payloads
+    ], dtype=np.float64)
+    is_fraud, is_comeback, is_success, amounts = signals.T
     
     # 5. Advanced Check: Identity Anomaly (Fraud)
-    fraud_flags = [r["payload"].get("is_fraud_suspect", 0) for r in results[:20]]
-    if sum(fraud_flags) >= 5 or analysis["avg_similarity"] > FRAUD_SIMILARITY_LIMIT:
-        decision = {
-            "decision": "REJECTED",
-            "confidence": 1.0,
-            "reason": "IDENTITY_ANOMALY: Our system detected patterns unusually similar to known high-risk applications.",
-            "is_fraud_suspect": True,
-            "analysis": analysis
-        }
-        decision["explanation"] = get_llm_explanation(decision, new_application) or generate_friendly_explanation(decision)
-        return decision
+    # (the mean can only exceed the limit if the best twin does)
+    near_duplicates = (
+        analysis["max_similarity"] > FRAUD_SIMILARITY_LIMIT
+        and analysis["avg_similarity"] > FRAUD_SIMILARITY_LIMIT
+    )
+    if np.count_nonzero(is_fraud[:20]) >= 5 or near_duplicates:
+        result = asdict(Decision(
+            decision="REJECTED",
+            confidence=1.0,
+            reason="IDENTITY_ANOMALY: Our system detected patterns unusually similar to known high-risk applications.",
+            is_fraud_suspect=True,
+            analysis=analysis
+        ))
+        request_explanation(result, new_application)
+        return result
 
     # 6. Make decision
     decision = make_decision(analysis, new_application)
     
     # 7. Feature: Path to Success (for REJECTED)
-    if decision["decision"] == "REJECTED":
-        comebacks = [r for r in results if r["payload"].get("is_comeback_story", 0)]
-        if comebacks:
-            best_comeback = comebacks[0]["payload"]
-            decision["roadmap"] = {
+    if decision.decision == "REJECTED":
+        comebacks = np.flatnonzero(is_comeback)
+        if comebacks.size:
+            best_comeback = payloads[comebacks[0]]
+            decision.roadmap = {
                 "target_fico": best_comeback.get("fico", 700),
                 "target_dti": round(best_comeback.get("dti", 20.0), 1),
                 "message": f"We found profiles identical to yours that were successful after improving their FICO to {int(best_comeback.get('fico', 0))}+ and lowering DTI to {best_comeback.get('dti')}%."
             }
         
         # Feature: Product Up-Selling (Safer Loan Amount)
-        successful_twins = [r for r in results if r["payload"]["outcome"] == "success"]
-        if successful_twins:
-            avg_safe_amount = sum(r["payload"]["requested_amount"] or 0 for r in successful_twins) / len(successful_twins)
+        if is_success.any():
+            avg_safe_amount = float(amounts[is_success.astype(bool)].mean())
             if avg_safe_amount < new_application.get("requested_amount", 0) * 0.8:
-                decision["alternative_offer"] = {
+                decision.alternative_offer = {
                     "type": "SAFER_AMOUNT",
                     "amount": round(avg_safe_amount, -2),
                     "message": f"While your current request is high, your financial twins were highly successful with loans around ${int(avg_safe_amount):,}."
                 }
     
     # 8. Feature: Smart Nudges (for APPROVED or APPROVED_WITH_CONDITIONS)
-    if "APPROVED" in decision["decision"]:
+    if "APPROVED" in decision.decision:
         # Predict next likely needs based on seniority
         if new_application.get("nb_previous_loans", 0) == 0:
-            decision["nudge"] = {
+            decision.nudge = {
                 "title": "Build Your Legacy",
                 "message": "80% of clients who started with this loan successfully upgraded to our Home Improvement line within 18 months."
             }
 
-    # 9. Generate human-friendly explanation
-    template_explanation = generate_friendly_explanation(decision)
+    # 9. Generate human-friendly explanation (template now, LLM in the background)
+    result = asdict(decision)
+    request_explanation(result, new_application)
+    
+    return result
+
+
+def unique_twins(results):
+    """
+    Drop repeated historical applications from search results
     
-    # Try to get LLM explanation, fallback to template
-    llm_explanation = get_llm_explanation(decision, new_application)
-    decision["explanation"] = llm_explanation if llm_explanation else template_explanation
+    The same application can be stored under several point IDs (e.g. after
+    re-embedding); only its best-ranked hit is kept. Results without an
+    application_id are never considered duplicates.
     
-    return decision
+    Args:
+        results: Search results (dicts with 'score' and 'payload'), best first
+    
+    Returns:
+        The results with one hit per application_id, order preserved
+    """
+    seen = set()
+    unique = []
+    for r in results:
+        app_id = r["payload"].get("application_id")
+        if app_id is not None:
+            if app_id in seen:
+                continue
+            seen.add(app_id)
+        unique.append(r)
+    return unique
 
 
-def analyze_twins(results):
+def analyze_twins(payloads, scores):
     """
     Analyze the outcomes of found twins
     
     Args:
-        results: List of dicts with 'score' and 'payload'
+        payloads: Payload dicts of the twins (any order)
+        scores: Similarity scores, aligned with payloads
     
     Returns:
         Dict with statistics and top twins
     """
     
-    total = len(results)
+    total = len(payloads)
     
     if total == 0:
         return {
@@ -219,29 +538,37 @@ def analyze_twins(results):
             "default_rate": 0.0,
             "late_rate": 0.0,
             "avg_similarity": 0.0,
+            "max_similarity": 0.0,
             "top_twins": []
         }
     
-    # Count outcomes
-    success = sum(1 for r in results if r["payload"]["outcome"] == "success")
-    default = sum(1 for r in results if r["payload"]["outcome"] == "default")
-    late = sum(1 for r in results if r["payload"]["outcome"] == "late_payments")
-    rejected = sum(1 for r in results if r["payload"]["outcome"] == "rejected")
-    
-    # Average similarity
-    avg_score = sum(r["score"] for r in results) / total
+    # Count outcomes and summarize similarity in one pass over the codes
+    # (payloads indexed before outcome_code existed fall back to the label)
+    codes = np.array([
+        p["outcome_code"] if "outcome_code" in p else OUTCOME_CODES.get(p["outcome"], OTHER_OUTCOME)
+        for p in payloads
+    ], dtype=np.int64)
+    score_arr = np.asarray(scores, dtype=np.float64)
+    counts, avg_score, max_score = tally_outcomes(codes, score_arr)
+    success, default, late, rejected = counts[:OTHER_OUTCOME].tolist()
+    
+    # Top 5 for explanation: select in O(n) rather than relying on the input
+    # order, then sort just those (stable, so ties keep their search order)
+    top = np.arange(total)
+    if total > TOP_TWINS_SHOWN:
+        top = np.sort(np.argpartition(-score_arr, TOP_TWINS_SHOWN - 1)[:TOP_TWINS_SHOWN])
+    top = top[np.argsort(-score_arr[top], kind="stable")].tolist()
     
-    # Top 5 for explanation
     top_twins = []
-    for r in results[:5]:
-        payload = r["payload"]
+    for i in top:
+        get = payloads[i].get
         top_twins.append({
-            "application_id": payload.get("application_id"),
-            "similarity": round(r["score"], 3),
-            "outcome": payload.get("outcome"),
-            "requested_amount": payload.get("requested_amount"),
-            "fico": payload.get("fico"),
-            "dti": payload.get("dti"),
+            "application_id": get("application_id"),
+            "similarity": round(scores[i], 3),
+            "outcome": get("outcome"),
+            "requested_amount": get("requested_amount"),
+            "fico": get("fico"),
+            "dti": get("dti"),
         })
     
     return {
@@ -254,6 +581,7 @@ def analyze_twins(results):
         "default_rate": default / total,
         "late_rate": late / total,
         "avg_similarity": avg_score,
+        "max_similarity": max_score,
         "top_twins": top_twins
     }
 
@@ -273,7 +601,7 @@ def make_decision(analysis, application):
         application: Dict with the original application
     
     Returns:
-        Dict with decision, confidence, reason, conditions
+        Decision with decision, confidence, reason, conditions
     """
     
     success_rate = analysis["success_rate"]
@@ -281,14 +609,14 @@ def make_decision(analysis, application):
     
     # Rule 1: High success rate - Pure Approval (Top 1%)
     if success_rate >= 0.99 and default_rate < 0.05:
-        return {
-            "decision": "APPROVED",
-            "confidence": analysis["avg_similarity"],
-            "reason": f"Exceptional {int(success_rate*100)}% success rate observed among similar financial profiles.",
-            "conditions": [],
-            "recommended_amount": application.get("requested_amount"),
-            "analysis": analysis
-        }
+        return Decision(
+            decision="APPROVED",
+            confidence=analysis["avg_similarity"],
+            reason=f"Exceptional {int(success_rate*100)}% success rate observed among similar financial profiles.",
+            conditions=[],
+            recommended_amount=application.get("requested_amount"),
+            analysis=analysis
+        )
     
     # Rule 2: Good success but some risk - Approval with Conditions (Top 10%)
     elif success_rate >= 0.90 and default_rate < 0.10:
@@ -305,32 +633,32 @@ def make_decision(analysis, application):
         if not conditions:
             conditions.append("Standard conditions with enhanced monitoring")
         
-        return {
-            "decision": "APPROVED_WITH_CONDITIONS",
-            "confidence": analysis["avg_similarity"],
-            "reason": "Solid historical performance with minor risk overhead.",
-            "conditions": conditions,
-            "recommended_amount": recommended_amount,
-            "analysis": analysis
-        }
+        return Decision(
+            decision="APPROVED_WITH_CONDITIONS",
+            confidence=analysis["avg_similarity"],
+            reason="Solid historical performance with minor risk overhead.",
+            conditions=conditions,
+            recommended_amount=recommended_amount,
+            analysis=analysis
+        )
     
     # Rule 3: Moderate Success - Manual Review
     elif success_rate >= 0.85:
-        return {
-            "decision": "MANUAL_REVIEW",
-            "confidence": analysis["avg_similarity"],
-            "reason": f"Success rate is {int(success_rate*100)}%. Performance data is within a neutral range requiring human oversight.",
-            "analysis": analysis
-        }
+        return Decision(
+            decision="MANUAL_REVIEW",
+            confidence=analysis["avg_similarity"],
+            reason=f"Success rate is {int(success_rate*100)}%. Performance data is within a neutral range requiring human oversight.",
+            analysis=analysis
+        )
     
     # Rule 4: Everything else - Rejection (Below 85% success)
     else:
-        return {
-            "decision": "REJECTED",
-            "confidence": analysis["avg_similarity"],
-            "reason": f"Inadequate success likelihood ({int(success_rate*100)}%). Historical comparisons show significant default risk.",
-            "analysis": analysis
-        }
+        return Decision(
+            decision="REJECTED",
+            confidence=analysis["avg_similarity"],
+            reason=f"Inadequate success likelihood ({int(success_rate*100)}%). Historical comparisons show significant default risk.",
+            analysis=analysis
+        )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,132 @@
+"""
+validation.py
+-------------
+Request validation for the CreditTwin API.
+
+Application payloads are checked against a schema compiled once at import:
+required fields must be present, numeric features are coerced to numbers
+(numeric strings are accepted) and categorical features must be strings.
+
+Note: This module does NOT compute features (handled by embeddings.py).
+"""
+
+import math
+from typing import Any, Callable, Dict, List, Tuple
+
+# Fields an application must provide to be evaluated
+REQUIRED_FIELDS = [
+    "requested_amount",
+    "annual_income_snapshot",
+    "dti_snapshot",
+    "fico_snapshot"
+]
+
+# Numeric features read by embeddings.create_application_vector
+NUMERIC_FIELDS = [
+    "requested_amount",
+    "annual_income_snapshot",
+    "dti_snapshot",
+    "payment_to_income_ratio",
+    "loan_to_income_ratio",
+    "revolving_utilization_snapshot",
+    "fico_snapshot",
+    "credit_history_length_snapshot",
+    "nb_previous_loans",
+    "open_accounts",
+    "total_accounts",
+    "delinquencies_2y",
+    "inquiries_6m",
+    "public_records",
+]
+
+# Categorical features (matched as strings)
+CATEGORICAL_FIELDS = ["term", "grade", "loan_purpose"]
+
+
+class ValidationError(ValueError):
+    """Raised when an application payload does not match the schema."""
+    
+    def __init__(self, missing: List[str] = None, invalid: Dict[str, str] = None, message: str = None):
+        self.missing = missing or []
+        self.invalid = invalid or {}
+        self.message = message
+        super().__init__(message or f"missing={self.missing}, invalid={self.invalid}")
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Error body returned by the API."""
+        if self.message:
+            return {"error": self.message}
+        if self.missing:
+            return {
+                "error": "Missing required fields",
+                "missing_fields": self.missing,
+                "required_fields": REQUIRED_FIELDS
+            }
+        return {
+            "error": "Invalid field types",
+            "invalid_fields": self.invalid
+        }
+
+
+def _number(value: Any) -> Any:
+    # Numbers pass through untouched so responses echo them as sent
+    if value is None or isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        number = float(value)
+        if not math.isfinite(number):
+            raise ValueError(f"expected a finite number, got {value!r}")
+        return number
+    raise TypeError("expected a number")
+
+
+def _string(value: Any) -> Any:
+    if value is None or isinstance(value, str):
+        return value
+    raise TypeError("expected a string")
+
+
+# (field, coercer) pairs, built once
+_SCHEMA: Tuple[Tuple[str, Callable[[Any], Any]], ...] = tuple(
+    [(field, _number) for field in NUMERIC_FIELDS]
+    + [(field, _string) for field in CATEGORICAL_FIELDS]
+)
+
+
+def validate_application(payload: Any) -> Dict[str, Any]:
+    """
+    Validate and coerce an application payload
+    
+    Args:
+        payload: Decoded JSON body of one application
+    
+    Returns:
+        A new dict with coerced feature values (unknown keys are kept)
+    
+    Raises:
+        ValidationError: If required fields are missing or values have the wrong type
+    
+    Example:
+        >>> validate_application({"requested_amount": "15000", ...})["requested_amount"]
+        15000.0
+    """
+    if not isinstance(payload, dict):
+        raise ValidationError(message="Application must be a JSON object")
+    
+    missing = [field for field in REQUIRED_FIELDS if field not in payload]
+    if missing:
+        raise ValidationError(missing=missing)
+    
+    application = dict(payload)
+    invalid = {}
+    for field, coerce in _SCHEMA:
+        if field in application:
+            try:
+                application[field] = coerce(application[field])
+            except (TypeError, ValueError) as e:
+                invalid[field] = str(e)
+    
+    if invalid:
+        raise ValidationError(invalid=invalid)
+    
+    return application
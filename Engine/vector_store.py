@@ -14,19 +14,35 @@ Note: This module does NOT handle:
 - Business logic (handled by application modules)
 """
 
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Union
+from contextlib import contextmanager, nullcontext
+import asyncio
 import logging
-from qdrant_client import QdrantClient
+import threading
+import numpy as np
+from qdrant_client import AsyncQdrantClient, QdrantClient
 from qdrant_client.models import Distance, VectorParams, PointStruct, Filter
 from qdrant_client.http import models
+from caching import LRUCache
+from kernels import rescore as rescore_results
 
 # Import Qdrant configuration from config module
 try:
     from config import (
-        QDRANT_CLIENT,
+        get_qdrant_client,
+        get_async_qdrant_client,
+        create_async_qdrant_client,
         COLLECTION_NAME,
         VECTOR_SIZE,
-        DISTANCE_METRIC
+        DISTANCE_METRIC,
+        QDRANT_IS_LOCAL,
+        QUANTIZATION_QUANTILE,
+        QUANTIZATION_OVERSAMPLING,
+        COLLECTION_EXISTS_TTL,
+        SEARCH_CACHE_SIZE,
+        SEARCH_CACHE_TTL,
+        HNSW_EF,
+        VALIDATE_POINTS
     )
 except ImportError:
     # Fallback defaults if config.py doesn't exist
@@ -34,17 +50,166 @@ except ImportError:
     import os
     from qdrant_client import QdrantClient
     
-    QDRANT_CLIENT = QdrantClient(
+    _client = None
+    _async_client = None
+    
+    # Same transport settings as config.py (gRPC when QDRANT_PREFER_GRPC=1)
+    _CLIENT_OPTIONS = dict(
         host=os.getenv("QDRANT_HOST", "localhost"),
-        port=int(os.getenv("QDRANT_PORT", 6333))
+        port=int(os.getenv("QDRANT_PORT", 6333)),
+        grpc_port=int(os.getenv("QDRANT_GRPC_PORT", 6334)),
+        prefer_grpc=os.getenv("QDRANT_PREFER_GRPC", "0") == "1",
+        pool_size=int(os.getenv("QDRANT_POOL_SIZE", 16)),
+        timeout=int(os.getenv("QDRANT_TIMEOUT", 60))
     )
+    
+    def get_qdrant_client() -> QdrantClient:
+        global _client
+        if _client is None:
+            _client = QdrantClient(**_CLIENT_OPTIONS)
+        return _client
+    
+    def create_async_qdrant_client() -> AsyncQdrantClient:
+        return AsyncQdrantClient(**_CLIENT_OPTIONS)
+    
+    def get_async_qdrant_client() -> AsyncQdrantClient:
+        global _async_client
+        if _async_client is None:
+            _async_client = create_async_qdrant_client()
+        return _async_client
+    
     COLLECTION_NAME = "loan_applications"
     VECTOR_SIZE = 50
     DISTANCE_METRIC = Distance.COSINE
+    QDRANT_IS_LOCAL = False
+    QUANTIZATION_QUANTILE = 0.99
+    QUANTIZATION_OVERSAMPLING = 2.0
+    COLLECTION_EXISTS_TTL = 5.0
+    SEARCH_CACHE_SIZE = 1024
+    SEARCH_CACHE_TTL = 300.0
+    HNSW_EF = 128
+    VALIDATE_POINTS = os.getenv("QDRANT_VALIDATE_POINTS", "0") == "1"
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Points and batches are checked by upsert_vector / _split_points before they
+# are built, so pydantic's validation is skipped unless VALIDATE_POINTS is set
+if VALIDATE_POINTS:
+    _make_point = PointStruct
+    _make_batch = models.Batch
+else:
+    _make_point = PointStruct.model_construct
+    _make_batch = models.Batch.model_construct
+
+# Serializes writes against a local-mode client (see config.QDRANT_IS_LOCAL)
+_WRITE_LOCK = threading.Lock() if QDRANT_IS_LOCAL else nullcontext()
+
+# Collection layout, validated once at import (see create_collection_if_not_exists)
+VECTORS_CONFIG = VectorParams(size=VECTOR_SIZE, distance=DISTANCE_METRIC)
+QUANTIZATION_CONFIG = models.ScalarQuantization(
+    scalar=models.ScalarQuantizationConfig(
+        type=models.ScalarType.INT8,
+        quantile=QUANTIZATION_QUANTILE,
+        always_ram=True
+    )
+)
+
+# Searches run on the int8 vectors, then rescore the oversampled candidates
+# (local mode always searches exactly and warns about search params)
+SEARCH_PARAMS = None if QDRANT_IS_LOCAL else models.SearchParams(
+    hnsw_ef=HNSW_EF,
+    exact=False,
+    quantization=models.QuantizationSearchParams(
+        rescore=True,
+        oversampling=QUANTIZATION_OVERSAMPLING
+    )
+)
+
+# Payload fields searches filter on (twin_search.twin_filters uses the amount;
+# the categorical fields serve ad-hoc filters). Indexed so the filter is
+# applied during the HNSW traversal rather than after it.
+# Local mode has no payload indexes
+PAYLOAD_INDEXES = {
+    "requested_amount": models.PayloadSchemaType.FLOAT,
+    "outcome": models.PayloadSchemaType.KEYWORD,
+    "loan_purpose": models.PayloadSchemaType.KEYWORD,
+    "grade": models.PayloadSchemaType.KEYWORD,
+    "term": models.PayloadSchemaType.KEYWORD,
+}
+
+# Results of recent searches, reused only for the exact same query vector,
+# top_k and filters; cleared whenever this module writes points
+SEARCH_CACHE = LRUCache(maxsize=SEARCH_CACHE_SIZE, ttl=SEARCH_CACHE_TTL)
+
+
+def _search_key(
+    vector: np.ndarray, top_k: int, filters: Optional[Dict[str, Any]], rescore: bool = False
+) -> tuple:
+    """
+    Hashable SEARCH_CACHE key: the float32 query bytes, top_k, rescoring and
+    the filters (order-independent).
+    
+    No similarity match: two applicants a hair apart can still differ in
+    one twin, and with it in every statistic derived from the twins.
+    """
+    key = (vector.tobytes(), top_k, rescore)
+    if not filters:
+        return key
+    return key + tuple(sorted(
+        (field, tuple(sorted(value.items())) if isinstance(value, dict) else value)
+        for field, value in filters.items()
+    ))
+
+
+def _hits_to_results(points: List[models.ScoredPoint]) -> List[Dict[str, Any]]:
+    """
+    Convert scored points to the {"payload", "score"} dicts returned by the search functions.
+    
+    A dict display per hit is the cheapest form (about 4x faster than
+    attrgetter + dict(zip(...)) for 100 hits); the payload dicts are shared,
+    not copied.
+    """
+    return [{"payload": hit.payload, "score": hit.score} for hit in points]
+
+
+def _as_query_vector(vector) -> np.ndarray:
+    """
+    Validate a query vector and return it as a contiguous float32 array.
+    
+    Arrays already in that form are passed through without a copy, so the
+    client serializes them directly instead of walking a Python list.
+    
+    Raises:
+        ValueError: If the vector is not one-dimensional with VECTOR_SIZE values
+    """
+    if isinstance(vector, (list, tuple, np.ndarray)):
+        array = np.ascontiguousarray(vector, dtype=np.float32)
+        if array.shape == (VECTOR_SIZE,):
+            return array
+        got = array.shape
+    else:
+        got = type(vector)
+    raise ValueError(f"Vector must be a list or array of {VECTOR_SIZE} floats, got {got}")
+
+# Whether the collection exists, shared by the admin functions below; kept
+# current by create/delete here and re-checked after COLLECTION_EXISTS_TTL
+_EXISTS_CACHE = LRUCache(maxsize=1, ttl=COLLECTION_EXISTS_TTL)
+
+
+def collection_exists() -> bool:
+    """
+    Check whether the collection exists, with one cheap call when not cached.
+    
+    Returns:
+        bool: True if COLLECTION_NAME exists on the Qdrant instance
+    """
+    exists = _EXISTS_CACHE.get(COLLECTION_NAME)
+    if exists is None:
+        exists = get_qdrant_client().collection_exists(COLLECTION_NAME)
+        _EXISTS_CACHE.set(COLLECTION_NAME, exists)
+    return exists
+
 
 def create_collection_if_not_exists() -> bool:
     """
@@ -54,6 +219,10 @@ def create_collection_if_not_exists() -> bool:
     appropriate vector configuration if needed. It's idempotent and safe
     to call multiple times.
     
+    Vectors are stored with int8 scalar quantization kept in RAM; searches
+    rescore candidates against the original vectors (see SEARCH_PARAMS).
+    Filtered payload fields get server-side indexes (see PAYLOAD_INDEXES).
+    
     Returns:
         bool: True if collection was created, False if it already existed
         
@@ -69,21 +238,25 @@ def create_collection_if_not_exists() -> bool:
     """
     try:
         # Check if collection exists
-        collections = QDRANT_CLIENT.get_collections().collections
-        collection_names = [collection.name for collection in collections]
-        
-        if COLLECTION_NAME in collection_names:
+        if collection_exists():
             logger.info(f"Collection '{COLLECTION_NAME}' already exists")
             return False
         
         # Create collection with vector configuration
-        QDRANT_CLIENT.create_collection(
+        get_qdrant_client().create_collection(
             collection_name=COLLECTION_NAME,
-            vectors_config=VectorParams(
-                size=VECTOR_SIZE,
-                distance=DISTANCE_METRIC
-            )
+            vectors_config=VECTORS_CONFIG,
+            quantization_config=QUANTIZATION_CONFIG
         )
+        _EXISTS_CACHE.set(COLLECTION_NAME, True)
+        
+        if not QDRANT_IS_LOCAL:
+            for field_name, field_schema in PAYLOAD_INDEXES.items():
+                get_qdrant_client().create_payload_index(
+                    collection_name=COLLECTION_NAME,
+                    field_name=field_name,
+                    field_schema=field_schema
+                )
         
         logger.info(
             f"Created collection '{COLLECTION_NAME}' "
@@ -106,7 +279,7 @@ def upsert_vector(point_id: int, vector: List[float], payload: Dict[str, Any]) -
     
     Args:
         point_id: Unique identifier for the point (must be non-negative integer)
-        vector: The embedding vector as a list of floats
+        vector: The embedding vector (list of floats or 1-D array)
         payload: Metadata dictionary to store with the vector
         
     Returns:
@@ -130,10 +303,15 @@ def upsert_vector(point_id: int, vector: List[float], payload: Dict[str, Any]) -
     if not isinstance(point_id, int) or point_id < 0:
         raise ValueError(f"point_id must be a non-negative integer, got: {point_id}")
     
-    if not isinstance(vector, list) or len(vector) != VECTOR_SIZE:
+    # Lists and arrays (e.g. create_application_vector's float32 output) alike
+    try:
+        array = np.asarray(vector, dtype=np.float32)
+    except (TypeError, ValueError):
+        array = None
+    if array is None or array.shape != (VECTOR_SIZE,):
         raise ValueError(
-            f"Vector must be a list of {VECTOR_SIZE} floats, "
-            f"got {len(vector) if isinstance(vector, list) else type(vector)}"
+            f"Vector must be a list or array of {VECTOR_SIZE} floats, "
+            f"got {type(vector) if array is None else array.shape}"
         )
     
     if not isinstance(payload, dict):
@@ -141,19 +319,19 @@ def upsert_vector(point_id: int, vector: List[float], payload: Dict[str, Any]) -
     
     try:
         # Create point structure
-        point = PointStruct(
+        point = _make_point(
             id=point_id,
-            vector=vector,
+            vector=array.tolist(),
             payload=payload
         )
         
         # Upsert to Qdrant
-        QDRANT_CLIENT.upsert(
+        get_qdrant_client().upsert(
             collection_name=COLLECTION_NAME,
             points=[point]
         )
+        SEARCH_CACHE.clear()
         
-        logger.debug(f"Upserted point {point_id} to collection '{COLLECTION_NAME}'")
         return True
         
     except Exception as e:
@@ -161,10 +339,50 @@ def upsert_vector(point_id: int, vector: List[float], payload: Dict[str, Any]) -
         raise Exception(f"Failed to upsert point {point_id}: {str(e)}")
 
 
+# Range operators accepted in filter dicts, mapped to models.Range fields
+_RANGE_OPS = {"$gte": "gte", "$lte": "lte", "$gt": "gt", "$lt": "lt"}
+
+
+def _build_filter(filters: Optional[Dict[str, Any]]) -> Optional[models.Filter]:
+    """
+    Convert simple dict filters (see search_similar) to a Qdrant Filter.
+    
+    Raises:
+        ValueError: If a range filter uses an operator other than _RANGE_OPS
+    """
+    if not filters:
+        return None
+    
+    must_conditions = []
+    for field, value in filters.items():
+        if isinstance(value, dict):
+            # Range queries like {"$gte": 1000}. All bounds on a field form
+            # one Range, checked during the HNSW traversal
+            try:
+                bounds = {_RANGE_OPS[operator]: operand for operator, operand in value.items()}
+            except KeyError as e:
+                raise ValueError(
+                    f"Unsupported filter operator {e.args[0]!r} for '{field}' "
+                    f"(expected one of {', '.join(_RANGE_OPS)})"
+                ) from None
+            if bounds:
+                must_conditions.append(
+                    models.FieldCondition(key=field, range=models.Range(**bounds))
+                )
+        else:
+            # Exact match
+            must_conditions.append(
+                models.FieldCondition(key=field, match=models.MatchValue(value=value))
+            )
+    
+    return models.Filter(must=must_conditions) if must_conditions else None
+
+
 def search_similar(
-    vector: List[float],
+    vector: Union[List[float], np.ndarray],
     top_k: int = 5,
-    filters: Optional[Dict[str, Any]] = None
+    filters: Optional[Dict[str, Any]] = None,
+    rescore: bool = False
 ) -> List[Dict[str, Any]]:
     """
     Search for the most similar vectors in the collection.
@@ -173,10 +391,13 @@ def search_similar(
     most similar results. Optionally applies filters to narrow the search space.
     
     Args:
-        vector: The query vector to search for similar items
+        vector: The query vector to search for similar items (list or
+                np.ndarray; float32 arrays are sent without conversion)
         top_k: Number of most similar results to return (default: 5)
         filters: Optional dictionary of filters to apply to the search.
                 Format: {"field_name": "value"} or {"field_name": {"$gte": value}}
+        rescore: Fetch the stored vectors and re-rank the results by exact
+                float32 cosine similarity in-process (kernels.rescore)
                 
     Returns:
         List of payload dictionaries from matching points, ordered by similarity.
@@ -184,7 +405,8 @@ def search_similar(
         Returns empty list if no results found.
         
     Raises:
-        ValueError: If vector dimensions don't match VECTOR_SIZE or top_k is invalid
+        ValueError: If vector dimensions don't match VECTOR_SIZE, top_k is invalid
+                    or a filter uses an unsupported operator
         Exception: If there's an error searching Qdrant
         
     Example:
@@ -201,105 +423,281 @@ def search_similar(
         ... )
     """
     # Validate inputs
-    if not isinstance(vector, list) or len(vector) != VECTOR_SIZE:
-        raise ValueError(
-            f"Vector must be a list of {VECTOR_SIZE} floats, "
-            f"got {len(vector) if isinstance(vector, list) else type(vector)}"
-        )
+    vector = _as_query_vector(vector)
     
     if not isinstance(top_k, int) or top_k < 1:
         raise ValueError(f"top_k must be a positive integer, got: {top_k}")
     
+    # Build Qdrant filter if provided
+    query_filter = _build_filter(filters)
+    
+    # Repeat queries are answered from memory (see SEARCH_CACHE)
+    key = _search_key(vector, top_k, filters, rescore)
+    cached = SEARCH_CACHE.get(key)
+    if cached is not None:
+        return list(cached)
+    
     try:
-        # Build Qdrant filter if provided
-        query_filter = None
-        if filters:
-            # Convert simple dict filters to Qdrant Filter format
-            must_conditions = []
-            
-            for field, value in filters.items():
-                if isinstance(value, dict):
-                    # Handle range queries like {"$gte": 1000}
-                    for operator, operand in value.items():
-                        if operator == "$gte":
-                            must_conditions.append(
-                                models.FieldCondition(
-                                    key=field,
-                                    range=models.Range(gte=operand)
-                                )
-                            )
-                        elif operator == "$lte":
-                            must_conditions.append(
-                                models.FieldCondition(
-                                    key=field,
-                                    range=models.Range(lte=operand)
-                                )
-                            )
-                        elif operator == "$gt":
-                            must_conditions.append(
-                                models.FieldCondition(
-                                    key=field,
-                                    range=models.Range(gt=operand)
-                                )
-                            )
-                        elif operator == "$lt":
-                            must_conditions.append(
-                                models.FieldCondition(
-                                    key=field,
-                                    range=models.Range(lt=operand)
-                                )
-                            )
-                else:
-                    # Handle exact match
-                    must_conditions.append(
-                        models.FieldCondition(
-                            key=field,
-                            match=models.MatchValue(value=value)
-                        )
-                    )
-            
-            if must_conditions:
-                query_filter = models.Filter(must=must_conditions)
-        
         # Perform search using the modern query_points API
-        search_results = QDRANT_CLIENT.query_points(
+        search_results = get_qdrant_client().query_points(
             collection_name=COLLECTION_NAME,
             query=vector,
             limit=top_k,
-            query_filter=query_filter
+            query_filter=query_filter,
+            search_params=SEARCH_PARAMS,
+            with_vectors=rescore
         )
         
         # Extract payloads and scores from results
-        results = [
-            {"payload": hit.payload, "score": hit.score}
-            for hit in search_results.points
-        ]
+        results = _hits_to_results(search_results.points)
+        if rescore:
+            results = rescore_results(
+                results, [hit.vector for hit in search_results.points], vector
+            )
         
-        logger.debug(
-            f"Search returned {len(results)} results out of top_{top_k} requested"
-        )
+        logger.debug("Search returned %d results out of top_%d requested", len(results), top_k)
         
-        return results
+        SEARCH_CACHE.set(key, results)
+        return list(results)
         
     except Exception as e:
         logger.error(f"Error searching similar vectors: {str(e)}")
         raise Exception(f"Failed to search similar vectors: {str(e)}")
 
 
+async def asearch_similar(
+    vector: Union[List[float], np.ndarray],
+    top_k: int = 5,
+    filters: Optional[Dict[str, Any]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Async counterpart of search_similar for callers running an event loop.
+    
+    Against a Qdrant server the query is awaited on the async client, so
+    concurrent requests in one process do not block each other. The local
+    embedded store has no async client (it cannot be opened twice), so
+    there search_similar runs on the loop's default executor instead.
+    
+    Args:
+        vector: The query vector (list or np.ndarray)
+        top_k: Number of most similar results to return (default: 5)
+        filters: Optional filters, same format as search_similar
+        
+    Returns:
+        List of {"payload", "score"} dicts, ordered by similarity
+        
+    Raises:
+        ValueError: If vector dimensions don't match VECTOR_SIZE, top_k is invalid
+                    or a filter uses an unsupported operator
+        Exception: If there's an error searching Qdrant
+    """
+    if QDRANT_IS_LOCAL:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, search_similar, vector, top_k, filters)
+    
+    vector = _as_query_vector(vector)
+    
+    if not isinstance(top_k, int) or top_k < 1:
+        raise ValueError(f"top_k must be a positive integer, got: {top_k}")
+    
+    query_filter = _build_filter(filters)
+    
+    key = _search_key(vector, top_k, filters)
+    cached = SEARCH_CACHE.get(key)
+    if cached is not None:
+        return list(cached)
+    
+    try:
+        search_results = await get_async_qdrant_client().query_points(
+            collection_name=COLLECTION_NAME,
+            query=vector,
+            limit=top_k,
+            query_filter=query_filter,
+            search_params=SEARCH_PARAMS
+        )
+        results = _hits_to_results(search_results.points)
+        SEARCH_CACHE.set(key, results)
+        return list(results)
+        
+    except Exception as e:
+        logger.error(f"Error searching similar vectors: {str(e)}")
+        raise Exception(f"Failed to search similar vectors: {str(e)}")
+
+
+def search_similar_batch(
+    vectors: List[List[float]],
+    top_k: int = 5,
+    filters: Optional[List[Optional[Dict[str, Any]]]] = None
+) -> List[List[Dict[str, Any]]]:
+    """
+    Run several similarity searches in a single Qdrant round-trip.
+    
+    Batched counterpart of search_similar: each query can carry its own
+    filters, and results come back in the same order as the vectors.
+    
+    Args:
+        vectors: Query vectors, each of VECTOR_SIZE floats
+        top_k: Number of most similar results per query (default: 5)
+        filters: Optional list of per-query filter dicts (same format as
+                search_similar), aligned with vectors
+                
+    Returns:
+        List of result lists ({"payload", "score"} dicts), one per vector
+        
+    Raises:
+        ValueError: If a vector has the wrong size, filters are misaligned or
+                    use an unsupported operator, or top_k is invalid
+        Exception: If there's an error searching Qdrant
+        
+    Example:
+        >>> results = search_similar_batch([vector_a, vector_b], top_k=10)
+        >>> len(results)
+        2
+    """
+    if not vectors:
+        return []
+    
+    vectors = [_as_query_vector(vector) for vector in vectors]
+    
+    if filters is not None and len(filters) != len(vectors):
+        raise ValueError(
+            f"Got {len(filters)} filters for {len(vectors)} vectors"
+        )
+    
+    if not isinstance(top_k, int) or top_k < 1:
+        raise ValueError(f"top_k must be a positive integer, got: {top_k}")
+    
+    query_filters = [_build_filter(f) for f in filters] if filters else [None] * len(vectors)
+    
+    try:
+        requests = [
+            models.QueryRequest(
+                query=vector.tolist(),
+                filter=query_filter,
+                limit=top_k,
+                params=SEARCH_PARAMS,
+                with_payload=True
+            )
+            for vector, query_filter in zip(vectors, query_filters)
+        ]
+        
+        responses = get_qdrant_client().query_batch_points(
+            collection_name=COLLECTION_NAME,
+            requests=requests
+        )
+        
+        return [_hits_to_results(response.points) for response in responses]
+        
+    except Exception as e:
+        logger.error(f"Error in batch similarity search: {str(e)}")
+        raise Exception(f"Failed to batch search similar vectors: {str(e)}")
+
+
+def _split_points(
+    points_data: List[tuple[int, List[float], Dict[str, Any]]]
+) -> tuple[List[int], np.ndarray, List[Dict[str, Any]]]:
+    """Validate (point_id, vector, payload) tuples and split them into ids, a vector matrix and payloads."""
+    ids, vectors, payloads = zip(*points_data)
+    
+    # One dtype/min check for the common case; the per-id loop only runs
+    # to report (or, for ids beyond int64, to accept) what that rejected
+    id_array = np.asarray(ids)
+    if id_array.dtype.kind in "iu" and id_array.min() >= 0:
+        ids = id_array.tolist()
+    else:
+        for point_id in ids:
+            if not isinstance(point_id, int) or point_id < 0:
+                raise ValueError(f"Invalid point_id: {point_id}")
+    
+    try:
+        matrix = np.asarray(vectors, dtype=np.float32)
+    except (TypeError, ValueError):
+        matrix = None  # ragged (vectors of different lengths) or non-numeric
+    if matrix is None or matrix.ndim != 2 or matrix.shape[1] != VECTOR_SIZE:
+        wrong_size = next(
+            (
+                (point_id, vector) for point_id, vector in zip(ids, vectors)
+                if np.ndim(vector) != 1 or len(vector) != VECTOR_SIZE
+            ),
+            None
+        )
+        if wrong_size is not None:
+            point_id, vector = wrong_size
+            raise ValueError(
+                f"Point {point_id}: vector shape {np.shape(vector)} "
+                f"doesn't match expected ({VECTOR_SIZE},)"
+            )
+        # Every vector has the right size, so a value failed to convert
+        for point_id, vector in zip(ids, vectors):
+            try:
+                np.asarray(vector, dtype=np.float32)
+            except (TypeError, ValueError):
+                raise ValueError(f"Point {point_id}: vector has non-numeric values") from None
+        raise ValueError(f"Vectors must be lists or arrays of {VECTOR_SIZE} floats")
+    
+    # None converts to NaN rather than failing; neither can be stored
+    finite = np.isfinite(matrix).all(axis=1)
+    if not finite.all():
+        point_id = ids[int(np.argmin(finite))]
+        raise ValueError(f"Point {point_id}: vector has missing or non-finite values")
+    
+    return list(ids), matrix, list(payloads)
+
+
+# Qdrant's default, restored after a bulk load if the collection had none set
+DEFAULT_INDEXING_THRESHOLD = 20000
+_INDEXING_DISABLED = models.OptimizersConfigDiff(indexing_threshold=0)
+
+
+@contextmanager
+def _indexing_paused():
+    """
+    Disable HNSW indexing on the server for the duration of a bulk load.
+    
+    Points are then indexed once, after the load, instead of segment by
+    segment while it runs. The previous threshold is restored even if the
+    load fails. Local mode has no optimizer, so nothing is changed there.
+    """
+    if QDRANT_IS_LOCAL:
+        yield
+        return
+    
+    client = get_qdrant_client()
+    previous = client.get_collection(COLLECTION_NAME).config.optimizer_config.indexing_threshold
+    client.update_collection(
+        collection_name=COLLECTION_NAME,
+        optimizer_config=_INDEXING_DISABLED
+    )
+    try:
+        yield
+    finally:
+        client.update_collection(
+            collection_name=COLLECTION_NAME,
+            optimizer_config=models.OptimizersConfigDiff(
+                indexing_threshold=previous if previous is not None else DEFAULT_INDEXING_THRESHOLD
+            )
+        )
+
+
 def batch_upsert_vectors(
     points_data: List[tuple[int, List[float], Dict[str, Any]]],
-    batch_size: int = 100
+    batch_size: int = 256,
+    parallel: int = 4
 ) -> int:
     """
     Upsert multiple vectors in batches for better performance.
     
-    This is a utility function for bulk operations. It processes the data
-    in batches to avoid overwhelming the server and provides better performance
-    than individual upserts.
+    This is a utility function for bulk operations. Points are validated
+    once, as a single vector matrix, and handed to the client's bulk
+    upload path (upload_collection), which batches them without building a
+    PointStruct per point. Against a Qdrant server `parallel` worker
+    processes upload batches concurrently, with indexing paused until the
+    upload is done (see _indexing_paused); local mode writes in-process.
     
     Args:
         points_data: List of tuples, each containing (point_id, vector, payload)
-        batch_size: Number of points to upsert per batch (default: 100)
+        batch_size: Number of points to upsert per batch (default: 256)
+        parallel: Number of upload processes (default: 4, 1 = sequential)
         
     Returns:
         int: Total number of points successfully upserted
@@ -314,7 +712,7 @@ def batch_upsert_vectors(
         ...     (2, [0.3, 0.4, ...], {"app_id": "A2"}),
         ...     # ... more points
         ... ]
-        >>> count = batch_upsert_vectors(data, batch_size=100)
+        >>> count = batch_upsert_vectors(data, batch_size=256, parallel=4)
         >>> print(f"Upserted {count} points")
     """
     if not points_data:
@@ -322,52 +720,124 @@ def batch_upsert_vectors(
         return 0
     
     try:
-        total_uploaded = 0
-        
-        for i in range(0, len(points_data), batch_size):
-            batch = points_data[i:i + batch_size]
-            
-            # Validate and create PointStruct objects
-            points = []
-            for point_id, vector, payload in batch:
-                if not isinstance(point_id, int) or point_id < 0:
-                    raise ValueError(f"Invalid point_id: {point_id}")
-                
-                if len(vector) != VECTOR_SIZE:
-                    raise ValueError(
-                        f"Point {point_id}: vector size {len(vector)} "
-                        f"doesn't match expected {VECTOR_SIZE}"
-                    )
-                
-                points.append(
-                    PointStruct(
-                        id=point_id,
-                        vector=vector,
-                        payload=payload
-                    )
-                )
-            
-            # Upsert batch
-            QDRANT_CLIENT.upsert(
+        ids, vectors, payloads = _split_points(points_data)
+        
+        with _WRITE_LOCK, _indexing_paused():
+            get_qdrant_client().upload_collection(
                 collection_name=COLLECTION_NAME,
-                points=points
+                vectors=vectors,
+                payload=payloads,
+                ids=ids,
+                batch_size=batch_size,
+                parallel=max(1, parallel),
+                wait=True
             )
-            
-            total_uploaded += len(points)
-            
-            if total_uploaded % 1000 == 0 or total_uploaded == len(points_data):
-                logger.info(
-                    f"Batch upsert progress: {total_uploaded}/{len(points_data)} points"
-                )
+        SEARCH_CACHE.clear()
+        
+        logger.info(f"Successfully upserted {len(ids)} points in total")
+        return len(ids)
         
+    except ValueError:
+        raise
+    except Exception as e:
+        logger.error(f"Error during batch upsert: {str(e)}")
+        raise Exception(f"Failed to batch upsert vectors: {str(e)}")
+
+
+async def batch_upsert_vectors_async(
+    points_data: List[tuple[int, List[float], Dict[str, Any]]],
+    batch_size: int = 32,
+    concurrency: int = 16,
+    client: Optional[AsyncQdrantClient] = None
+) -> int:
+    """
+    Upsert vectors as many small batches in flight at once.
+    
+    Against a Qdrant server, batches are sent as concurrent tasks on the
+    async client, so network round-trips overlap instead of queuing; at
+    most `concurrency` are in flight. Both knobs are worth tuning per
+    deployment (small batches with high concurrency usually win). Local
+    mode has no async client and falls back to batch_upsert_vectors.
+    
+    Args:
+        points_data: List of tuples, each containing (point_id, vector, payload)
+        batch_size: Number of points per upsert request (default: 32)
+        concurrency: Maximum upsert requests in flight (default: 16)
+        client: Async client to use (default: get_async_qdrant_client())
+        
+    Returns:
+        int: Total number of points successfully upserted
+        
+    Raises:
+        ValueError: If any point data is invalid
+        Exception: If there's an error during batch upsert
+    """
+    if QDRANT_IS_LOCAL:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, batch_upsert_vectors, points_data, batch_size, 1)
+    
+    if not points_data:
+        logger.warning("No points provided for batch upsert")
+        return 0
+    
+    client = client or get_async_qdrant_client()
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    
+    async def upsert(start: int) -> int:
+        end = min(start + batch_size, len(ids))
+        async with semaphore:
+            await client.upsert(
+                collection_name=COLLECTION_NAME,
+                points=_make_batch(
+                    ids=ids[start:end],
+                    vectors=vectors[start:end].tolist(),
+                    payloads=payloads[start:end]
+                )
+            )
+        return end - start
+    
+    try:
+        ids, vectors, payloads = _split_points(points_data)
+        counts = await asyncio.gather(
+            *(upsert(start) for start in range(0, len(ids), batch_size))
+        )
+        SEARCH_CACHE.clear()
+        total_uploaded = sum(counts)
         logger.info(f"Successfully upserted {total_uploaded} points in total")
         return total_uploaded
         
+    except ValueError:
+        raise
     except Exception as e:
         logger.error(f"Error during batch upsert: {str(e)}")
         raise Exception(f"Failed to batch upsert vectors: {str(e)}")
 
 
+def batch_upsert_vectors_concurrent(
+    points_data: List[tuple[int, List[float], Dict[str, Any]]],
+    batch_size: int = 32,
+    concurrency: int = 16
+) -> int:
+    """
+    Run batch_upsert_vectors_async from synchronous code.
+    
+    The upload gets its own event loop and a client bound to it, closed
+    when done, and indexing is paused meanwhile (see _indexing_paused).
+    Arguments and return value as for batch_upsert_vectors_async.
+    """
+    async def run() -> int:
+        if QDRANT_IS_LOCAL:
+            return await batch_upsert_vectors_async(points_data, batch_size, concurrency)
+        client = create_async_qdrant_client()
+        try:
+            return await batch_upsert_vectors_async(points_data, batch_size, concurrency, client)
+        finally:
+            await client.close()
+    
+    with _indexing_paused():
+        return asyncio.run(run())
+
+
 def delete_collection() -> bool:
     """
     Delete the entire collection from Qdrant.
@@ -386,14 +856,13 @@ def delete_collection() -> bool:
         True  # Collection was deleted
     """
     try:
-        collections = QDRANT_CLIENT.get_collections().collections
-        collection_names = [collection.name for collection in collections]
-        
-        if COLLECTION_NAME not in collection_names:
+        if not collection_exists():
             logger.info(f"Collection '{COLLECTION_NAME}' does not exist")
             return False
         
-        QDRANT_CLIENT.delete_collection(collection_name=COLLECTION_NAME)
+        get_qdrant_client().delete_collection(collection_name=COLLECTION_NAME)
+        _EXISTS_CACHE.set(COLLECTION_NAME, False)
+        SEARCH_CACHE.clear()
         logger.info(f"Deleted collection '{COLLECTION_NAME}'")
         return True
         
@@ -420,17 +889,14 @@ def get_collection_info() -> Dict[str, Any]:
         >>> print(f"Collection has {info['vectors_count']} vectors")
     """
     try:
-        collections = QDRANT_CLIENT.get_collections().collections
-        collection_names = [collection.name for collection in collections]
-        
-        if COLLECTION_NAME not in collection_names:
+        if not collection_exists():
             return {
                 "exists": False,
                 "vectors_count": 0,
                 "config": None
             }
         
-        collection_info = QDRANT_CLIENT.get_collection(collection_name=COLLECTION_NAME)
+        collection_info = get_qdrant_client().get_collection(collection_name=COLLECTION_NAME)
         
         
         return {
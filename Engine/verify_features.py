@@ -58,7 +58,7 @@ def run_verification():
         result = find_twins(standard_app)
         if result.get("decision"):
             print(f"   ✓ Decision received: {result['decision']}")
-            print(f"   ✓ Twins found: {result.get('analysis', {}).get('total_twins', 0)}")
+            print(f"   ✓ Twins found: {(result.get('analysis') or {}).get('total_twins', 0)}")
             print(f"   ✓ Confidence: {result.get('confidence', 0):.2%}")
         else:
             print(f"   ❌ Unexpected result format: {result}")
@@ -81,7 +81,7 @@ def run_verification():
             print(f"   ✓ Reason: {result['reason']}")
             print(f"   ✓ Action: {result['action']}")
         else:
-            print(f"   ℹ️ Decision: {result['decision']} (Matches: {result.get('twins_found') or result.get('analysis', {}).get('total_twins')})")
+            print(f"   ℹ️ Decision: {result['decision']} (Matches: {result.get('twins_found') or (result.get('analysis') or {}).get('total_twins')})")
             if result.get("decision") != "ANOMALY_DETECTED":
                 print(f"   ⚠️  Anomaly detection was not triggered. This might mean the dataset is very dense or the threshold/parameters were not extreme enough.")
     except Exception as e:
@@ -1,6 +1,9 @@
+import orjson
 import requests
 import json
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 
 # Force UTF-8 for stdout/stderr to avoid UnicodeEncodeError with emojis on Windows
 if hasattr(sys.stdout, 'reconfigure'):
@@ -41,24 +44,49 @@ scenarios = [
     }
 ]
 
+def _prep(scenario):
+    """Return the scenario payload with dti_snapshot filled in when missing"""
+    p = scenario['payload'].copy()
+    if 'dti_snapshot' not in p and p.get('annual_income_snapshot', 0) > 0:
+        monthly_inc = p['annual_income_snapshot'] / 12
+        p['dti_snapshot'] = (p.get('monthly_debt', 0) / monthly_inc) * 100
+    return p
+
+
+# Scenarios are static: serialize each request body once, at import
+_JSON_HEADERS = {"Content-Type": "application/json"}
+for _s in scenarios:
+    _s["_body"] = orjson.dumps(_prep(_s))
+
+
+def _evaluate(session, scenario):
+    """POST one scenario; returns the decision dict or the exception raised"""
+    try:
+        r = session.post(API_URL, data=scenario["_body"], headers=_JSON_HEADERS)
+        r.raise_for_status()
+        return r.json()
+    except Exception as e:
+        return e
+
+
 def run_tests():
     print("=" * 70)
     print("CreditTwin Intelligence Verification".center(70))
     print("=" * 70)
 
-    for s in scenarios:
+    # One pooled connection per worker; scenarios are posted concurrently
+    # and reported in order once all responses are in
+    session = requests.Session()
+    session.mount("http://", HTTPAdapter(pool_connections=16, pool_maxsize=16))
+    with session, ThreadPoolExecutor(max_workers=len(scenarios)) as executor:
+        results = list(executor.map(lambda s: _evaluate(session, s), scenarios))
+
+    for s, res in zip(scenarios, results):
         print(f"\n🚀 Testing: {s['name']}")
+        if isinstance(res, Exception):
+            print(f"   ❌ Error: {res}")
+            continue
         try:
-            # Prepare payload (calc DTI if missing)
-            p = s['payload'].copy()
-            if 'dti_snapshot' not in p and p.get('annual_income_snapshot', 0) > 0:
-                monthly_inc = p['annual_income_snapshot'] / 12
-                p['dti_snapshot'] = (p.get('monthly_debt', 0) / monthly_inc) * 100
-
-            r = requests.post(API_URL, json=p)
-            r.raise_for_status()
-            res = r.json()
-            
             print(f"   Decision: {res.get('decision')}")
             if res.get('analysis'):
                 print(f"   Success Rate: {res['analysis']['success_rate']*100:.1f}%")
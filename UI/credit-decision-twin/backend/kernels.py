@@ -0,0 +1,143 @@
+"""
+Numeric kernels for synthetic data generation and the twin search.
+
+Kernels are JIT-compiled with numba when it is installed; without it,
+`njit` is a no-op and callers use the equivalent NumPy expressions.
+"""
+import numpy as np
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit when numba is not installed."""
+        if args and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+
+@njit("float64(int64, float64, float64, int64, int64)", cache=True, fastmath=True)
+def _score(credit_score, dti, lti, delinquencies, utilization):
+    """Default probability of one synthetic case from its risk factors"""
+    default_prob = 0.1
+
+    if credit_score < 600: default_prob += 0.25
+    elif credit_score < 680: default_prob += 0.1
+
+    if dti > 0.4: default_prob += 0.15
+    if lti > 1.5: default_prob += 0.1
+    if delinquencies > 2: default_prob += 0.2
+    if utilization > 70: default_prob += 0.1
+
+    return default_prob
+
+
+@njit(cache=True, parallel=True)
+def _score_batch(credit_score, dti, lti, delinquencies, utilization):
+    out = np.empty(credit_score.shape[0], dtype=np.float64)
+    for i in prange(credit_score.shape[0]):
+        out[i] = _score(credit_score[i], dti[i], lti[i], delinquencies[i], utilization[i])
+    return out
+
+
+def default_probability(
+    credit_score: np.ndarray,
+    dti: np.ndarray,
+    lti: np.ndarray,
+    delinquencies: np.ndarray,
+    utilization: np.ndarray
+) -> np.ndarray:
+    """
+    Default probability for every row, same rules as _score.
+
+    Integer arrays must be int64 and ratio arrays float64, all of one length.
+    """
+    if NUMBA_AVAILABLE:
+        return _score_batch(credit_score, dti, lti, delinquencies, utilization)
+
+    default_prob = np.full(credit_score.shape[0], 0.1)
+    default_prob += np.where(credit_score < 600, 0.25, np.where(credit_score < 680, 0.1, 0.0))
+    default_prob += np.where(dti > 0.4, 0.15, 0.0)
+    default_prob += np.where(lti > 1.5, 0.1, 0.0)
+    default_prob += np.where(delinquencies > 2, 0.2, 0.0)
+    default_prob += np.where(utilization > 70, 0.1, 0.0)
+    return default_prob
+
+
+@njit(cache=True, fastmath=True, parallel=True)
+def _dot_rows(features, query):
+    out = np.empty(features.shape[0], dtype=np.float32)
+    for i in prange(features.shape[0]):
+        total = np.float32(0.0)
+        for j in range(features.shape[1]):
+            total += features[i, j] * query[j]
+        out[i] = total
+    return out
+
+
+def similarity_scores(features: np.ndarray, query: np.ndarray) -> np.ndarray:
+    """
+    Dot product of every row of features with query (cosine for unit vectors).
+
+    Both must be float32; features (n, d) C-contiguous, query (d,).
+    """
+    if NUMBA_AVAILABLE:
+        return _dot_rows(features, query)
+    return features @ query
+
+
+# No fastmath: each score is then the same float32 operations whatever
+# the number of queries, so a one-query call matches its row of a batch
+@njit(cache=True, parallel=True)
+def _dot_rows_batch(features, queries):
+    out = np.empty((queries.shape[0], features.shape[0]), dtype=np.float32)
+    for i in prange(features.shape[0]):
+        for q in range(queries.shape[0]):
+            total = np.float32(0.0)
+            for j in range(features.shape[1]):
+                total += features[i, j] * queries[q, j]
+            out[q, i] = total
+    return out
+
+
+def similarity_scores_batch(features: np.ndarray, queries: np.ndarray) -> np.ndarray:
+    """
+    Dot products of every row of features with every query, as an (m, n) matrix.
+
+    Both must be float32; features (n, d) C-contiguous, queries (m, d).
+    Row q does not depend on the other queries: without numba the product
+    is one gemm, and a single query is repeated to two rows because NumPy
+    hands one-row products to gemv, which rounds differently.
+    """
+    if NUMBA_AVAILABLE:
+        return _dot_rows_batch(features, queries)
+    if len(queries) == 1:
+        return (np.repeat(queries, 2, axis=0) @ features.T)[:1]
+    return queries @ features.T
+
+
+@njit(cache=True, parallel=True)
+def _dot_rows_u8(codes, query):
+    out = np.empty(codes.shape[0], dtype=np.int32)
+    for i in prange(codes.shape[0]):
+        total = np.int32(0)
+        for j in range(codes.shape[1]):
+            total += np.int32(codes[i, j]) * np.int32(query[j])
+        out[i] = total
+    return out
+
+
+def quantized_scores(codes: np.ndarray, query: np.ndarray) -> np.ndarray:
+    """
+    Integer dot product of every row of codes with query, as int32.
+    
+    Both must be uint8; codes (n, d) C-contiguous, query (d,). Without
+    numba the rows are widened to int32 for the product.
+    """
+    if NUMBA_AVAILABLE:
+        return _dot_rows_u8(codes, query)
+    return codes @ query.astype(np.int32)
@@ -1,13 +1,26 @@
 """
 CreditTwin API - FastAPI Backend
 """
+import asyncio
+import csv
 import io
-from typing import List, Optional
-from fastapi import FastAPI, UploadFile, File, HTTPException
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from fastapi import BackgroundTasks, FastAPI, UploadFile, File, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
 import pandas as pd
 
+# Optional: multithreaded C++ CSV parser for uploads (falls back to pandas)
+try:
+    import pyarrow as pa
+    from pyarrow import csv as pacsv
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
 from models import (
     CreditApplication,
     ColumnMapping,
@@ -19,11 +32,15 @@ from models import (
 )
 from services import (
     process_credit_application,
+    process_credit_applications,
     get_database_stats,
     get_case_count,
     get_sample_cases,
-    get_historical_cases,
+    get_case_store,
+    set_historical_cases,
     clear_historical_cases,
+    take_synthetic_store,
+    prepare_synthetic_store,
     import_dataset,
     PURPOSES
 )
@@ -44,13 +61,151 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Store uploaded file info
+# Uploaded file info; the rows stay on disk in a temp file until imported
 upload_info = {
     "headers": [],
-    "data": [],
+    "path": "",
+    "row_count": 0,
     "filename": ""
 }
 
+# Rows read per chunk when streaming an uploaded CSV into import_dataset
+UPLOAD_CHUNK_ROWS = 10_000
+
+# Reader errors on a malformed staged file, reported as a 400
+UPLOAD_PARSE_ERRORS = (pd.errors.ParserError, pa.ArrowInvalid) if PYARROW_AVAILABLE else (pd.errors.ParserError,)
+
+# File parsing and imports run here, off the event loop; two workers cap how
+# many files are being parsed (and held in memory) at once
+FILE_EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix="file-io")
+
+
+async def run_file_task(func, *args):
+    """Run a blocking parse/import call on FILE_EXECUTOR and await its result"""
+    return await asyncio.get_running_loop().run_in_executor(FILE_EXECUTOR, func, *args)
+
+
+# Rows encoded per chunk of a streamed CSV response
+CSV_CHUNK_ROWS = 1000
+
+
+def iter_csv(chunks: Iterable[List[Dict[str, Any]]], fieldnames: List[str]) -> Iterator[bytes]:
+    """
+    Encode row chunks as CSV, yielding the header and then one block per chunk.
+    
+    Memory stays bounded by one chunk, and the client receives the header
+    before the first rows are encoded. Missing keys are written as empty cells.
+    """
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=fieldnames, extrasaction="ignore", lineterminator="\n")
+    writer.writeheader()
+    yield buf.getvalue().encode()
+    
+    for rows in chunks:
+        buf.seek(0)
+        buf.truncate(0)
+        writer.writerows(rows)
+        yield buf.getvalue().encode()
+
+
+def df_records(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    """
+    Same rows as df.to_dict('records'), built from one tolist() per column.
+    
+    Column-wise conversion boxes values to Python types in bulk instead of
+    cell by cell, which is several times faster on large frames.
+    """
+    headers = df.columns.tolist()
+    columns = [df.iloc[:, i].tolist() for i in range(len(headers))]
+    return [dict(zip(headers, row)) for row in zip(*columns)]
+
+
+def count_csv_rows(path: str) -> int:
+    """Count the data rows of a CSV file without parsing values (blank lines skipped, as pandas does)"""
+    with open(path, newline='', encoding='utf-8', errors='replace') as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        return sum(1 for row in reader if row)
+
+
+def preview_upload(path: str, filename: str) -> Tuple[List[str], int, List[Dict[str, Any]]]:
+    """
+    Read the headers, row count and first five rows of an uploaded file.
+    
+    CSV files are only read as far as the preview needs (pyarrow's first
+    block, or pandas nrows=5) plus a value-free row count; the full parse is
+    left to the import. Excel has no partial reader and is parsed in full.
+    """
+    if not filename.endswith('.csv'):
+        df = pd.read_excel(path)
+        return df.columns.tolist(), len(df), df_records(df.head(5))
+    
+    if PYARROW_AVAILABLE:
+        reader = pacsv.open_csv(path)
+        headers = reader.schema.names
+        try:
+            preview = reader.read_next_batch().slice(0, 5).to_pylist()
+        except StopIteration:
+            preview = []
+    else:
+        df = pd.read_csv(path, nrows=5)
+        headers, preview = df.columns.tolist(), df_records(df)
+    return headers, count_csv_rows(path), preview
+
+
+def stage_upload(contents: bytes, filename: str) -> Tuple[str, List[str], int, List[Dict[str, Any]]]:
+    """
+    Write an upload to a temp file and read its preview (see preview_upload).
+    
+    Returns (path, headers, row_count, first five rows); only the path and
+    headers are kept for the import.
+    """
+    fd, path = tempfile.mkstemp(suffix=os.path.splitext(filename)[1])
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(contents)
+        headers, row_count, preview = preview_upload(path, filename)
+    except Exception:
+        os.remove(path)
+        raise
+    return path, headers, row_count, preview
+
+
+def iter_upload_rows(path: str, filename: str, headers: List[str]) -> Iterator[Dict[str, Any]]:
+    """
+    Stream the rows of a staged upload, UPLOAD_CHUNK_ROWS at a time for CSV.
+    
+    pyarrow reads every column as strings: it would otherwise freeze the
+    types inferred from the first block and fail on a later cell such as
+    "1.5" in an int column. The import parses the strings itself.
+    """
+    if not filename.endswith('.csv'):
+        # Excel has no incremental reader
+        yield from df_records(pd.read_excel(path))
+    elif PYARROW_AVAILABLE:
+        convert_options = pacsv.ConvertOptions(
+            column_types={header: pa.string() for header in headers},
+            strings_can_be_null=True
+        )
+        for batch in pacsv.open_csv(path, convert_options=convert_options):
+            yield from batch.to_pylist()
+    else:
+        for chunk in pd.read_csv(path, chunksize=UPLOAD_CHUNK_ROWS):
+            yield from df_records(chunk)
+
+
+def discard_upload() -> None:
+    """Delete the staged upload file, if any, and reset upload_info"""
+    if upload_info["path"]:
+        try:
+            os.remove(upload_info["path"])
+        except OSError:
+            pass
+    upload_info["headers"] = []
+    upload_info["path"] = ""
+    upload_info["row_count"] = 0
+    upload_info["filename"] = ""
+
 
 @app.get("/")
 async def root():
@@ -96,34 +251,60 @@ async def process_application(application: CreditApplication):
             detail="No historical data loaded. Please upload a dataset first."
         )
     
-    result = process_credit_application(application)
+    # The twin search is CPU-bound; keep the event loop free meanwhile
+    result = await asyncio.to_thread(process_credit_application, application)
     return result
 
 
+@app.post("/api/process-applications", response_model=List[CreditDecisionResponse])
+async def process_applications(applications: List[CreditApplication]):
+    """
+    Process several credit applications in one request (one response each, in order).
+    """
+    if get_case_count() == 0:
+        raise HTTPException(
+            status_code=400,
+            detail="No historical data loaded. Please upload a dataset first."
+        )
+    
+    # One batched twin search for all applications
+    results = await asyncio.to_thread(process_credit_applications, applications)
+    return results
+
+
 @app.get("/api/stats", response_model=DatabaseStats)
 async def get_stats():
     """Get database statistics"""
     return get_database_stats()
 
 
-@app.get("/api/sample-cases", response_model=List[HistoricalCase])
+@app.get(
+    "/api/sample-cases",
+    response_class=ORJSONResponse,
+    responses={200: {"model": List[HistoricalCase]}}
+)
 async def get_sample(count: int = 20):
-    """Get a random sample of historical cases"""
+    """
+    Get a random sample of historical cases.
+    
+    Rows are returned as plain dicts in the HistoricalCase shape and
+    serialized by orjson, skipping a model round-trip per case.
+    """
     cases = get_sample_cases(count)
-    return [
-        HistoricalCase(
-            id=c.get('id', 'UNKNOWN'),
-            age=c.get('age', 0),
-            credit_score=c.get('credit_score', 0),
-            income=c.get('income', 0),
-            loan_amount=c.get('loan_amount', 0),
-            purpose=c.get('purpose', 'unknown'),
-            decision=c.get('decision', 'UNKNOWN'),
-            outcome=c.get('outcome', 'UNKNOWN'),
-            days_late=c.get('days_late', 0)
-        )
+    return ORJSONResponse([
+        {
+            'id': c.get('id', 'UNKNOWN'),
+            'age': c.get('age', 0),
+            'credit_score': c.get('credit_score', 0),
+            'income': float(c.get('income', 0)),
+            'loan_amount': float(c.get('loan_amount', 0)),
+            'purpose': c.get('purpose', 'unknown'),
+            'decision': c.get('decision', 'UNKNOWN'),
+            'outcome': c.get('outcome', 'UNKNOWN'),
+            'days_late': c.get('days_late', 0)
+        }
         for c in cases
-    ]
+    ])
 
 
 @app.post("/api/upload-file")
@@ -143,25 +324,23 @@ async def upload_file(file: UploadFile = File(...)):
     try:
         contents = await file.read()
         
-        if filename.endswith('.csv'):
-            df = pd.read_csv(io.BytesIO(contents))
-        else:
-            df = pd.read_excel(io.BytesIO(contents))
+        # Parse off the event loop so other requests keep being served
+        path, headers, row_count, preview = await run_file_task(stage_upload, contents, filename)
         
-        # Store for later import
-        upload_info["headers"] = df.columns.tolist()
-        upload_info["data"] = df.to_dict('records')
+        # Keep the file for later import, replacing any previous upload
+        discard_upload()
+        upload_info["headers"] = headers
+        upload_info["path"] = path
+        upload_info["row_count"] = row_count
         upload_info["filename"] = file.filename
         
         # Return preview
-        preview_data = df.head(5).to_dict('records')
-        
         return {
             "success": True,
             "filename": file.filename,
-            "headers": upload_info["headers"],
-            "row_count": len(df),
-            "preview": preview_data
+            "headers": headers,
+            "row_count": row_count,
+            "preview": preview
         }
         
     except Exception as e:
@@ -176,7 +355,7 @@ async def import_uploaded_dataset(mappings: ColumnMapping):
     """
     Import the uploaded dataset using the provided column mappings.
     """
-    if not upload_info["data"]:
+    if not upload_info["path"]:
         raise HTTPException(
             status_code=400,
             detail="No file uploaded. Please upload a file first."
@@ -206,21 +385,33 @@ async def import_uploaded_dataset(mappings: ColumnMapping):
         'days_late': mappings.days_late,
     }
     
-    # Import the data
-    imported_count, skipped_count = import_dataset(upload_info["data"], mapping_dict)
+    # Import the data, streaming it from the staged file
+    rows = iter_upload_rows(upload_info["path"], upload_info["filename"].lower(), upload_info["headers"])
+    try:
+        imported_count, skipped_count = await run_file_task(import_dataset, rows, mapping_dict)
+    except UPLOAD_PARSE_ERRORS as e:
+        # Malformed rows past the preview (e.g. a wrong column count); keep the file
+        raise HTTPException(
+            status_code=400,
+            detail=f"Could not read the uploaded file: {e}"
+        )
     
     if imported_count == 0:
+        # Keep the file so the user can retry with other mappings
         raise HTTPException(
             status_code=400,
             detail="Could not import any valid rows. Please check your column mappings."
         )
     
+    headers = upload_info["headers"]
+    discard_upload()
+    
     return UploadResponse(
         success=True,
         message=f"Successfully imported {imported_count:,} cases to Qdrant vector database.",
         imported_count=imported_count,
         skipped_rows=skipped_count,
-        headers=upload_info["headers"]
+        headers=headers
     )
 
 
@@ -228,24 +419,24 @@ async def import_uploaded_dataset(mappings: ColumnMapping):
 async def clear_data():
     """Clear all historical data"""
     clear_historical_cases()
-    upload_info["headers"] = []
-    upload_info["data"] = []
-    upload_info["filename"] = ""
+    discard_upload()
     
     return {"success": True, "message": "All data cleared."}
 
 
 @app.post("/api/reset-data")
-async def reset_data():
-    """Reset to synthetic data"""
-    from services import set_historical_cases, generate_synthetic_data
+async def reset_data(background_tasks: BackgroundTasks):
+    """
+    Reset to synthetic data.
     
-    cases = generate_synthetic_data(1000)
+    Swaps in a synthetic store prepared in the background after the
+    previous reset (the first reset builds one on a worker thread), then
+    starts preparing the next one once the response is sent.
+    """
+    cases = await asyncio.to_thread(take_synthetic_store)
     set_historical_cases(cases)
-    
-    upload_info["headers"] = []
-    upload_info["data"] = []
-    upload_info["filename"] = ""
+    discard_upload()
+    background_tasks.add_task(prepare_synthetic_store)
     
     return {
         "success": True, 
@@ -257,55 +448,50 @@ async def reset_data():
 @app.get("/api/export-data")
 async def export_data():
     """Export current dataset as CSV"""
-    cases = get_historical_cases()
+    store = get_case_store()
     
-    if not cases:
+    if len(store) == 0:
         raise HTTPException(
             status_code=400,
             detail="No data to export."
         )
     
-    df = pd.DataFrame(cases)
-    
-    # Create CSV in memory
-    output = io.StringIO()
-    df.to_csv(output, index=False)
-    output.seek(0)
-    
+    # Rows are rebuilt from the column store one chunk at a time; columns
+    # keep their first-seen order, as a DataFrame would have them
     return StreamingResponse(
-        io.BytesIO(output.getvalue().encode()),
+        iter_csv(store.iter_chunks(CSV_CHUNK_ROWS), store.fields),
         media_type="text/csv",
         headers={"Content-Disposition": "attachment; filename=credit_twin_export.csv"}
     )
 
 
+# Example rows for the import template; the CSV is encoded once, at import
+TEMPLATE_DATA = {
+    'age': [35, 42, 28],
+    'credit_score': [720, 650, 780],
+    'income': [75000, 55000, 95000],
+    'loan_amount': [25000, 15000, 40000],
+    'debt': [15000, 25000, 10000],
+    'assets': [120000, 80000, 200000],
+    'tenure': [36, 24, 48],
+    'employment': ['full-time', 'self-employed', 'full-time'],
+    'sector': ['technology', 'retail', 'healthcare'],
+    'purpose': ['home', 'personal', 'auto'],
+    'region': ['northeast', 'west', 'southeast'],
+    'outcome': ['REPAID', 'DEFAULTED', 'REPAID'],
+    'days_late': [0, 45, 0]
+}
+TEMPLATE_CSV_BYTES = b"".join(iter_csv(
+    [[dict(zip(TEMPLATE_DATA, values)) for values in zip(*TEMPLATE_DATA.values())]],
+    list(TEMPLATE_DATA)
+))
+
+
 @app.get("/api/download-template")
 async def download_template():
     """Download a CSV template with expected columns"""
-    template_data = {
-        'age': [35, 42, 28],
-        'credit_score': [720, 650, 780],
-        'income': [75000, 55000, 95000],
-        'loan_amount': [25000, 15000, 40000],
-        'debt': [15000, 25000, 10000],
-        'assets': [120000, 80000, 200000],
-        'tenure': [36, 24, 48],
-        'employment': ['full-time', 'self-employed', 'full-time'],
-        'sector': ['technology', 'retail', 'healthcare'],
-        'purpose': ['home', 'personal', 'auto'],
-        'region': ['northeast', 'west', 'southeast'],
-        'outcome': ['REPAID', 'DEFAULTED', 'REPAID'],
-        'days_late': [0, 45, 0]
-    }
-    
-    df = pd.DataFrame(template_data)
-    
-    output = io.StringIO()
-    df.to_csv(output, index=False)
-    output.seek(0)
-    
-    return StreamingResponse(
-        io.BytesIO(output.getvalue().encode()),
+    return Response(
+        content=TEMPLATE_CSV_BYTES,
         media_type="text/csv",
         headers={"Content-Disposition": "attachment; filename=credit_twin_template.csv"}
     )
@@ -73,6 +73,10 @@ class CreditApplication(BaseModel):
     sector: Sector = Field(..., description="Industry sector")
     purpose: LoanPurpose = Field(..., description="Loan purpose")
     region: Region = Field(..., description="Geographic region")
+    # Optional credit history; omitted fields fall back to the twin search defaults
+    delinquencies: Optional[int] = Field(None, ge=0, description="Recent delinquencies")
+    utilization: Optional[int] = Field(None, ge=0, le=100, description="Credit utilization (%)")
+    history_length: Optional[int] = Field(None, ge=0, description="Credit history length in years")
 
 
 class ColumnMapping(BaseModel):
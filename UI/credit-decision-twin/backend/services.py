@@ -3,96 +3,246 @@ CreditTwin Business Logic Services
 This module contains placeholder functions for the credit decision engine.
 The actual implementation will be added later.
 """
+import multiprocessing
+import os
+import random
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import chain, islice
 import numpy as np
-import pandas as pd
-from typing import List, Dict, Any, Optional, Tuple
+from typing import Iterable, Iterator, List, Dict, Any, Optional, Tuple
+from kernels import _score, default_probability, quantized_scores, similarity_scores, similarity_scores_batch
+
+# Optional: approximate nearest-neighbour index for large case stores
+try:
+    import faiss
+    FAISS_AVAILABLE = True
+except ImportError:
+    FAISS_AVAILABLE = False
 from models import (
     CreditApplication, FinancialTwin, AnomalyFlag, 
     DecisionResult, CreditDecisionResponse, DatabaseStats
 )
 
-# In-memory storage for historical cases (will be replaced by Qdrant)
-historical_cases: List[Dict[str, Any]] = []
+# Shared generators: per-case draws (random) and sampling of the store (NumPy)
+_rng = random.Random()
+_np_rng = np.random.default_rng()
 
 # Constants
 EMPLOYMENT_TYPES = ['full-time', 'part-time', 'self-employed', 'contractor', 'retired']
 SECTORS = ['technology', 'healthcare', 'finance', 'retail', 'manufacturing', 'education', 'government', 'other']
 PURPOSES = ['home', 'auto', 'personal', 'business', 'education', 'debt-consolidation']
 REGIONS = ['northeast', 'southeast', 'midwest', 'southwest', 'west']
+TENURE_OPTIONS = [12, 24, 36, 48, 60, 72]
+DECISIONS = ['APPROVED', 'DECLINED']
+OUTCOMES = ['REPAID', 'DEFAULTED']
+
+# Store codes of the known outcomes (vocabularies start with their options)
+OUTCOME_CODE = {outcome: code for code, outcome in enumerate(OUTCOMES)}
+
+# Categorical fields are stored as small integer codes into these vocabularies
+CATEGORICAL_FIELDS = {
+    'employment': EMPLOYMENT_TYPES,
+    'sector': SECTORS,
+    'purpose': PURPOSES,
+    'region': REGIONS,
+    'decision': DECISIONS,
+    'outcome': OUTCOMES,
+}
+
+# Narrow storage dtypes for small-range integer fields, used when every value
+# fits (otherwise, and for other integer fields, int64). Cast to a wider type
+# before arithmetic that can leave the range, e.g. differences of uint values.
+INT_FIELDS = {
+    'age': np.uint8,
+    'credit_score': np.uint16,
+    'tenure': np.uint16,
+    'delinquencies': np.uint8,
+    'utilization': np.uint8,
+    'history_length': np.uint8,
+    'days_late': np.uint16,
+}
+
+
+class HistoricalStore:
+    """
+    Historical cases stored column-wise: one NumPy array per field.
+    
+    Categorical fields hold codes into `vocab[field]`, which starts with the
+    known options (CATEGORICAL_FIELDS) and grows with any other value seen,
+    so rows round-trip unchanged. Integer fields use INT_FIELDS dtypes when
+    the values fit, other numeric fields int64/float64 as given, strings a str array and anything
+    else (mixed types, missing values) an object array. Rows are rebuilt as
+    dicts only when asked for, with None for keys a case did not have. A
+    store is never mutated after construction.
+    """
+    
+    def __init__(self, cases: Iterable[Dict[str, Any]] = ()):
+        cases = cases if isinstance(cases, list) else list(cases)
+        self.n = len(cases)
+        self.fields: List[str] = list(dict.fromkeys(key for case in cases for key in case))
+        self.columns: Dict[str, np.ndarray] = {}
+        self.vocab: Dict[str, List[str]] = {}
+        # Filled by get_database_stats; a new store starts without one
+        self.stats: Optional[DatabaseStats] = None
+        # (n, 14) float32 unit-length feature vectors, plus for large stores
+        # an HNSW index over them (faiss) or their uint8 codes (see index_store)
+        self.features: Optional[np.ndarray] = None
+        self.ann_index: Any = None
+        self.codes: Optional[np.ndarray] = None
+        
+        for field in self.fields:
+            values = [case.get(field) for case in cases]
+            if field in CATEGORICAL_FIELDS:
+                self.columns[field], self.vocab[field] = self._encode(values, CATEGORICAL_FIELDS[field])
+            else:
+                self.columns[field] = self._column(field, values)
+    
+    @staticmethod
+    def _encode(values: List[Any], options: List[str]) -> Tuple[np.ndarray, List[Any]]:
+        """Encode values as codes into options, extended with unseen values"""
+        vocab = list(options)
+        index = {value: code for code, value in enumerate(vocab)}
+        codes = []
+        for value in values:
+            code = index.get(value)
+            if code is None:
+                code = index[value] = len(vocab)
+                vocab.append(value)
+            codes.append(code)
+        dtype = np.int8 if len(vocab) <= 127 else np.int32
+        return np.array(codes, dtype=dtype), vocab
+    
+    @staticmethod
+    def _column(field: str, values: List[Any]) -> np.ndarray:
+        """Pick the narrowest array type that gives every value back as stored"""
+        types = {type(value) for value in values}
+        if types <= {int}:
+            column = np.array(values, dtype=np.int64)
+            dtype = INT_FIELDS.get(field)
+            if dtype is not None and len(column):
+                limits = np.iinfo(dtype)
+                if limits.min <= column.min() and column.max() <= limits.max:
+                    column = column.astype(dtype)
+            return column
+        if types <= {int, float}:
+            return np.array(values, dtype=np.float64)
+        if types <= {str}:
+            return np.array(values, dtype=str)
+        column = np.empty(len(values), dtype=object)
+        column[:] = values
+        return column
+    
+    def __len__(self) -> int:
+        return self.n
+    
+    def rows(self, index: Any = None) -> List[Dict[str, Any]]:
+        """Rebuild cases as dicts: all of them, or those selected by `index` (slice or indices)"""
+        if not self.fields:
+            selected = range(self.n) if index is None else np.arange(self.n)[index]
+            return [{} for _ in selected]
+        
+        columns = [self.values(field, index) for field in self.fields]
+        fields = self.fields
+        return [dict(zip(fields, row)) for row in zip(*columns)]
+    
+    def values(self, field: str, index: Any = None, default: Any = None) -> List[Any]:
+        """One field of all cases or of those selected by `index`, decoded; default if the store lacks it"""
+        column = self.columns.get(field)
+        if column is None:
+            return [default] * (self.n if index is None else len(np.arange(self.n)[index]))
+        values = (column if index is None else column[index]).tolist()
+        if field in self.vocab:
+            vocab = self.vocab[field]
+            values = [vocab[code] for code in values]
+        return values
+    
+    def iter_chunks(self, size: int) -> Iterable[List[Dict[str, Any]]]:
+        """Yield the cases as dicts, `size` rows at a time"""
+        for start in range(0, self.n, size):
+            yield self.rows(slice(start, start + size))
+    
+    def value_counts(self, field: str) -> Dict[Any, int]:
+        """Count each value of a categorical field (known options always present)"""
+        if field not in self.vocab:
+            return {}
+        counts = np.bincount(self.columns[field], minlength=len(self.vocab[field]))
+        return dict(zip(self.vocab[field], counts.tolist()))
+
+
+# In-memory storage for historical cases (will be replaced by Qdrant)
+store = HistoricalStore()
+
+
+def get_case_store() -> HistoricalStore:
+    """Get the current case store (replaced, never mutated, on every change)"""
+    return store
 
 
 def get_historical_cases() -> List[Dict[str, Any]]:
     """Get all historical cases"""
-    return historical_cases
+    return store.rows()
 
 
-def set_historical_cases(cases: List[Dict[str, Any]]) -> None:
-    """Set historical cases"""
-    global historical_cases
-    historical_cases = cases
+def set_historical_cases(cases: Iterable[Dict[str, Any]]) -> None:
+    """Set historical cases (a list of case dicts, or a HistoricalStore)"""
+    global store
+    store = index_store(cases if isinstance(cases, HistoricalStore) else HistoricalStore(cases))
 
 
 def clear_historical_cases() -> None:
     """Clear all historical cases"""
-    global historical_cases
-    historical_cases = []
+    global store
+    store = HistoricalStore()
 
 
 def get_case_count() -> int:
-    """Get total number of cases"""
-    return len(historical_cases)
+    """Get total number of cases (kept on the store; no case data is touched)"""
+    return store.n
 
 
 def generate_historical_case(case_id: int) -> Dict[str, Any]:
     """Generate a single synthetic historical case"""
-    import random
+    randint, uniform, choice = _rng.randint, _rng.uniform, _rng.choice
     
-    credit_score = random.randint(450, 850)
-    income = random.randint(20000, 200000)
-    age = random.randint(22, 72)
+    credit_score = randint(450, 850)
+    income = randint(20000, 200000)
+    age = randint(22, 72)
     
     # Loan amount relative to income, but with some randomness
-    loan_amount = random.randint(5000, int(income * 2))
+    loan_amount = randint(5000, int(income * 2))
     
-    debt = int(random.uniform(0, 0.5) * income)
-    assets = int(random.uniform(0, 3) * income)
+    debt = int(uniform(0, 0.5) * income)
+    assets = int(uniform(0, 3) * income)
     
-    tenure_options = [12, 24, 36, 48, 60, 72]
-    tenure = random.choice(tenure_options)
+    tenure = choice(TENURE_OPTIONS)
     
     if credit_score > 700:
-        delinquencies = random.randint(0, 1)
+        delinquencies = randint(0, 1)
     else:
-        delinquencies = random.randint(0, 4)
+        delinquencies = randint(0, 4)
         
-    utilization = random.randint(5, 85)
-    history_length = random.randint(1, 20)
+    utilization = randint(5, 85)
+    history_length = randint(1, 20)
     
     # Calculate risk factors for outcome generation
     dti = debt / income if income > 0 else 0
     lti = loan_amount / income if income > 0 else 0
     
-    # Base probability of default
-    default_prob = 0.1
-    
-    if credit_score < 600: default_prob += 0.25
-    elif credit_score < 680: default_prob += 0.1
-    
-    if dti > 0.4: default_prob += 0.15
-    if lti > 1.5: default_prob += 0.1
-    if delinquencies > 2: default_prob += 0.2
-    if utilization > 70: default_prob += 0.1
+    default_prob = _score(credit_score, dti, lti, delinquencies, utilization)
     
-    is_default = random.random() < default_prob
+    is_default = _rng.random() < default_prob
     
     # Days late based on default status
     if is_default:
-        days_late = random.randint(30, 210)
+        days_late = randint(30, 210)
         outcome = 'DEFAULTED'
     else:
         # Some repaid loans might have been late successfully cured
-        if random.random() < 0.2:
-            days_late = random.randint(1, 29)
+        if _rng.random() < 0.2:
+            days_late = randint(1, 29)
         else:
             days_late = 0
         outcome = 'REPAID'
@@ -105,7 +255,7 @@ def generate_historical_case(case_id: int) -> Dict[str, Any]:
     
     return {
         'id': f'LOAN_{str(case_id).zfill(5)}',
-        'borrower_id': f'BRW_{str(random.randint(1, 100000)).zfill(5)}',
+        'borrower_id': f'BRW_{str(randint(1, 100000)).zfill(5)}',
         'age': age,
         'credit_score': credit_score,
         'income': income,
@@ -113,10 +263,10 @@ def generate_historical_case(case_id: int) -> Dict[str, Any]:
         'assets': assets,
         'loan_amount': loan_amount,
         'tenure': tenure,
-        'employment': random.choice(EMPLOYMENT_TYPES),
-        'sector': random.choice(SECTORS),
-        'purpose': random.choice(PURPOSES),
-        'region': random.choice(REGIONS),
+        'employment': choice(EMPLOYMENT_TYPES),
+        'sector': choice(SECTORS),
+        'purpose': choice(PURPOSES),
+        'region': choice(REGIONS),
         'delinquencies': delinquencies,
         'utilization': utilization,
         'history_length': history_length,
@@ -127,27 +277,172 @@ def generate_historical_case(case_id: int) -> Dict[str, Any]:
 
 
 def generate_synthetic_data(count: int = 1000) -> List[Dict[str, Any]]:
-    """Generate a batch of synthetic data"""
-    return [generate_historical_case(i + 1) for i in range(count)]
+    """
+    Generate a batch of synthetic data.
+    
+    Same distributions as generate_historical_case, but every column is
+    drawn as one NumPy array and the rows are assembled at the end.
+    """
+    rng = np.random.default_rng()
+    
+    credit_score = rng.integers(450, 851, count)
+    income = rng.integers(20000, 200001, count)
+    age = rng.integers(22, 73, count)
+    loan_amount = rng.integers(5000, income * 2 + 1)
+    debt = (rng.uniform(0, 0.5, count) * income).astype(np.int64)
+    assets = (rng.uniform(0, 3, count) * income).astype(np.int64)
+    tenure = rng.choice(TENURE_OPTIONS, count)
+    delinquencies = np.where(credit_score > 700, rng.integers(0, 2, count), rng.integers(0, 5, count))
+    utilization = rng.integers(5, 86, count)
+    history_length = rng.integers(1, 21, count)
+    
+    # Risk factors for outcome generation (income is always > 0 here)
+    dti = debt / income
+    lti = loan_amount / income
+    
+    default_prob = default_probability(credit_score, dti, lti, delinquencies, utilization)
+    
+    is_default = rng.random(count) < default_prob
+    days_late = np.where(
+        is_default,
+        rng.integers(30, 211, count),
+        np.where(rng.random(count) < 0.2, rng.integers(1, 30, count), 0)
+    )
+    outcome = np.where(is_default, 'DEFAULTED', 'REPAID')
+    borrower = rng.integers(1, 100001, count)
+    
+    columns = zip(
+        borrower.tolist(), age.tolist(), credit_score.tolist(), income.tolist(),
+        debt.tolist(), assets.tolist(), loan_amount.tolist(), tenure.tolist(),
+        rng.choice(EMPLOYMENT_TYPES, count).tolist(), rng.choice(SECTORS, count).tolist(),
+        rng.choice(PURPOSES, count).tolist(), rng.choice(REGIONS, count).tolist(),
+        delinquencies.tolist(), utilization.tolist(), history_length.tolist(),
+        outcome.tolist(), days_late.tolist()
+    )
+    return [
+        {
+            'id': f'LOAN_{str(i + 1).zfill(5)}',
+            'borrower_id': f'BRW_{str(b).zfill(5)}',
+            'age': a,
+            'credit_score': cs,
+            'income': inc,
+            'debt': d,
+            'assets': ast,
+            'loan_amount': amt,
+            'tenure': ten,
+            'employment': emp,
+            'sector': sec,
+            'purpose': pur,
+            'region': reg,
+            'delinquencies': dl,
+            'utilization': ut,
+            'history_length': hl,
+            'decision': 'APPROVED',
+            'outcome': out,
+            'days_late': late
+        }
+        for i, (b, a, cs, inc, d, ast, amt, ten, emp, sec, pur, reg, dl, ut, hl, out, late)
+        in enumerate(columns)
+    ]
 
 
 # Initialize with synthetic data
-historical_cases: List[Dict[str, Any]] = generate_synthetic_data(1000)
+SYNTHETIC_CASE_COUNT = 1000
+
+# Stores with at least this many cases get an HNSW index (if faiss is
+# installed); smaller ones are scanned exactly, which is as fast there
+ANN_THRESHOLD = 8000
+ANN_M = 32
+ANN_EF_SEARCH = 128
+
+# Without faiss, large stores are ranked on 8-bit codes of their unit
+# vectors (features are non-negative, so code = round(value * 255)); the
+# best k * QUANTIZED_OVERSAMPLING are rescored with the float32 vectors
+QUANTIZED_SCALE = 255
+QUANTIZED_OVERSAMPLING = 4
+
+
+def index_store(case_store: HistoricalStore) -> HistoricalStore:
+    """
+    Build the feature matrix the twin search scans, once per store.
+    
+    Every case's feature vector is computed and normalized to unit length
+    here instead of on each query, so a dot product is the cosine
+    similarity; returns the same store for chaining.
+    """
+    if case_store.features is None:
+        vectors = [compute_feature_vector(case) for case in case_store.rows()]
+        features = np.array(vectors, dtype=np.float32).reshape(len(vectors), N_FEATURES)
+        case_store.features = normalize_rows(features)
+        if FAISS_AVAILABLE and len(case_store) >= ANN_THRESHOLD:
+            index = faiss.IndexHNSWFlat(N_FEATURES, ANN_M, faiss.METRIC_INNER_PRODUCT)
+            index.hnsw.efSearch = ANN_EF_SEARCH
+            index.add(case_store.features)
+            case_store.ann_index = index
+        elif len(case_store) >= ANN_THRESHOLD:
+            case_store.codes = quantize(case_store.features)
+    return case_store
+
+
+def quantize(vectors: np.ndarray) -> np.ndarray:
+    """uint8 codes of unit feature vectors (all components are in [0, 1])"""
+    return np.rint(vectors * QUANTIZED_SCALE).astype(np.uint8)
+
+
+store = HistoricalStore(generate_synthetic_data(SYNTHETIC_CASE_COUNT))
+
+# Synthetic store built ahead of the next reset (see prepare_synthetic_store)
+_synthetic_spare: Optional[HistoricalStore] = None
+_synthetic_lock = threading.Lock()
+
+
+def take_synthetic_store() -> HistoricalStore:
+    """Return a fresh synthetic store: the prepared spare if there is one, else a new build"""
+    global _synthetic_spare
+    with _synthetic_lock:
+        spare, _synthetic_spare = _synthetic_spare, None
+    if spare is not None:
+        return spare
+    return index_store(HistoricalStore(generate_synthetic_data(SYNTHETIC_CASE_COUNT)))
+
+
+def prepare_synthetic_store() -> None:
+    """Build the spare synthetic store for the next reset (meant for a background thread)"""
+    global _synthetic_spare
+    if _synthetic_spare is not None:
+        return
+    spare = index_store(HistoricalStore(generate_synthetic_data(SYNTHETIC_CASE_COUNT)))
+    with _synthetic_lock:
+        if _synthetic_spare is None:
+            _synthetic_spare = spare
 
 
 def get_sample_cases(count: int = 20) -> List[Dict[str, Any]]:
     """Get a random sample of cases for display"""
-    if len(historical_cases) == 0:
+    if len(store) == 0:
         return []
     
-    import random
-    sample_size = min(count, len(historical_cases))
-    return random.sample(historical_cases, sample_size)
+    # Draw row indices, then gather only those rows from the columns
+    sample_size = min(count, len(store))
+    return store.rows(_np_rng.choice(len(store), size=sample_size, replace=False))
 
 
 def get_database_stats() -> DatabaseStats:
-    """Calculate database statistics"""
-    if len(historical_cases) == 0:
+    """
+    Calculate database statistics.
+    
+    Computed once per store and kept on it; stores are replaced, never
+    mutated, so every import, clear or reset starts with fresh stats.
+    """
+    current = store
+    if current.stats is None:
+        current.stats = _compute_stats(current)
+    return current.stats
+
+
+def _compute_stats(case_store: HistoricalStore) -> DatabaseStats:
+    """Count outcomes and purposes of one store"""
+    if len(case_store) == 0:
         return DatabaseStats(
             total=0,
             repaid=0,
@@ -155,19 +450,18 @@ def get_database_stats() -> DatabaseStats:
             purpose_counts={p: 0 for p in PURPOSES}
         )
     
-    df = pd.DataFrame(historical_cases)
-    
-    repaid = len(df[df['outcome'] == 'REPAID']) if 'outcome' in df.columns else 0
-    defaulted = len(df[df['outcome'] == 'DEFAULTED']) if 'outcome' in df.columns else 0
-    
-    purpose_counts = {p: 0 for p in PURPOSES}
-    if 'purpose' in df.columns:
-        counts = df['purpose'].value_counts().to_dict()
-        for p in PURPOSES:
-            purpose_counts[p] = counts.get(p, 0)
+    # Counted from the code columns; no per-case work
+    outcome = case_store.columns.get('outcome')
+    if outcome is not None:
+        repaid = int(np.count_nonzero(outcome == OUTCOME_CODE['REPAID']))
+        defaulted = int(np.count_nonzero(outcome == OUTCOME_CODE['DEFAULTED']))
+    else:
+        repaid = defaulted = 0
+    counts = case_store.value_counts('purpose')
+    purpose_counts = {p: counts.get(p, 0) for p in PURPOSES}
     
     return DatabaseStats(
-        total=len(historical_cases),
+        total=len(case_store),
         repaid=repaid,
         defaulted=defaulted,
         purpose_counts=purpose_counts
@@ -178,6 +472,10 @@ def get_database_stats() -> DatabaseStats:
 # PLACEHOLDER FUNCTIONS - TO BE IMPLEMENTED WITH ACTUAL CREDIT DECISION ENGINE
 # ============================================================================
 
+# Length of create_feature_vector's output
+N_FEATURES = 14
+
+
 def normalize_feature(value: float, min_val: float, max_val: float) -> float:
     """Normalize a feature to 0-1 range"""
     if max_val == min_val:
@@ -185,37 +483,92 @@ def normalize_feature(value: float, min_val: float, max_val: float) -> float:
     return (value - min_val) / (max_val - min_val)
 
 
+# Numeric features as (applicant key, default, min, max), in vector order
+NUMERIC_FEATURES = [
+    ('age', 35, 18, 80),
+    ('credit_score', 650, 300, 850),
+    ('income', 50000, 10000, 500000),
+    ('debt', 0, 0, 300000),
+    ('assets', 0, 0, 2000000),
+    ('loan_amount', 10000, 1000, 500000),
+    ('tenure', 36, 6, 84),
+    ('delinquencies', 0, 0, 12),
+    ('utilization', 30, 0, 100),
+    ('history_length', 5, 0, 50),
+]
+FEATURE_MINS = np.array([f[2] for f in NUMERIC_FEATURES], dtype=np.float64)
+FEATURE_RANGES = np.array([f[3] - f[2] for f in NUMERIC_FEATURES], dtype=np.float64)
+
+# Position of each categorical option, looked up instead of list.index scans
+EMPLOYMENT_INDEX = {opt: i for i, opt in enumerate(EMPLOYMENT_TYPES)}
+SECTOR_INDEX = {opt: i for i, opt in enumerate(SECTORS)}
+PURPOSE_INDEX = {opt: i for i, opt in enumerate(PURPOSES)}
+REGION_INDEX = {opt: i for i, opt in enumerate(REGIONS)}
+
+
+# Applicant keys create_feature_vector reads; their values determine the vector
+FEATURE_KEYS = tuple(f[0] for f in NUMERIC_FEATURES) + ('employment', 'sector', 'purpose', 'region')
+
+
 def create_feature_vector(applicant: Dict[str, Any]) -> np.ndarray:
     """
     Create a feature vector from applicant data.
+    
+    Memoized on the values of FEATURE_KEYS, as the same applicant is often
+    re-evaluated; the returned array is shared, so it is read-only.
+    """
+    values = tuple(applicant.get(key) for key in FEATURE_KEYS)
+    try:
+        return _cached_feature_vector(values)
+    except TypeError:
+        # Unhashable values cannot be cached
+        return compute_feature_vector(applicant)
+
+
+@lru_cache(maxsize=1024)
+def _cached_feature_vector(values: Tuple[Any, ...]) -> np.ndarray:
+    vector = compute_feature_vector(dict(zip(FEATURE_KEYS, values)))
+    vector.setflags(write=False)
+    return vector
+
+
+def compute_feature_vector(applicant: Dict[str, Any]) -> np.ndarray:
+    """
+    create_feature_vector without the cache (index_store uses it for every case).
+    
+    Numeric fields are min/max scaled in one array operation against
+    FEATURE_MINS / FEATURE_RANGES (same values as normalize_feature). The
+    vector is float32, like the store's feature matrix; each value is
+    computed in float64 and rounded once.
     """
     # Helper to safely get numeric values
     def get_num(key, default=0):
         val = applicant.get(key, default)
         try:
             return float(val)
-        except:
+        except (TypeError, ValueError, OverflowError):
             return float(default)
 
-    vector = [
-        normalize_feature(get_num('age', 35), 18, 80),
-        normalize_feature(get_num('credit_score', 650), 300, 850),
-        normalize_feature(get_num('income', 50000), 10000, 500000),
-        normalize_feature(get_num('debt', 0), 0, 300000),
-        normalize_feature(get_num('assets', 0), 0, 2000000),
-        normalize_feature(get_num('loan_amount', 10000), 1000, 500000),
-        normalize_feature(get_num('tenure', 36), 6, 84),
-        normalize_feature(get_num('delinquencies', 0), 0, 12),
-        normalize_feature(get_num('utilization', 30), 0, 100),
-        normalize_feature(get_num('history_length', 5), 0, 50),
-        
-        # Categorical encodings
-        EMPLOYMENT_TYPES.index(map_categorical(applicant.get('employment'), EMPLOYMENT_TYPES)) / len(EMPLOYMENT_TYPES),
-        SECTORS.index(map_categorical(applicant.get('sector'), SECTORS)) / len(SECTORS),
-        PURPOSES.index(map_categorical(applicant.get('purpose'), PURPOSES)) / len(PURPOSES),
-        REGIONS.index(map_categorical(applicant.get('region'), REGIONS)) / len(REGIONS),
-    ]
-    return np.array(vector)
+    vector = np.empty(N_FEATURES, dtype=np.float32)
+    numeric = np.fromiter(
+        (get_num(key, default) for key, default, _, _ in NUMERIC_FEATURES),
+        dtype=np.float64,
+        count=len(NUMERIC_FEATURES)
+    )
+    np.divide(numeric - FEATURE_MINS, FEATURE_RANGES, out=vector[:len(NUMERIC_FEATURES)])
+
+    # Categorical encodings
+    vector[10] = EMPLOYMENT_INDEX[map_categorical(applicant.get('employment'), EMPLOYMENT_TYPES)] / len(EMPLOYMENT_TYPES)
+    vector[11] = SECTOR_INDEX[map_categorical(applicant.get('sector'), SECTORS)] / len(SECTORS)
+    vector[12] = PURPOSE_INDEX[map_categorical(applicant.get('purpose'), PURPOSES)] / len(PURPOSES)
+    vector[13] = REGION_INDEX[map_categorical(applicant.get('region'), REGIONS)] / len(REGIONS)
+    return vector
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """Scale a vector, or each row of a matrix, to unit length (zero vectors stay zero)"""
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms).astype(vectors.dtype)
 
 
 def cosine_similarity(vec_a: np.ndarray, vec_b: np.ndarray) -> float:
@@ -228,6 +581,57 @@ def cosine_similarity(vec_a: np.ndarray, vec_b: np.ndarray) -> float:
     return float(dot_product / (norm_a * norm_b))
 
 
+def search_store(case_store: HistoricalStore, query: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Row indices and cosine similarities of the k cases closest to a unit query, best first (see search_store_batch)"""
+    return search_store_batch(case_store, query.reshape(1, -1), k)[0]
+
+
+def search_store_batch(case_store: HistoricalStore, queries: np.ndarray, k: int) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """
+    search_store for each row of a (m, 14) matrix of unit queries.
+    
+    Uses the store's HNSW index when it has one (approximate), with the
+    whole batch in one call. Stores with uint8 codes are shortlisted per
+    query on integer scores and the shortlist is rescored exactly;
+    otherwise every case vector is scored against all the queries in one
+    matrix product (kernels.similarity_scores_batch). Ties are in store
+    order. search_store goes through here with a one-row matrix, so single
+    and batched searches return the same twins and scores.
+    """
+    if case_store.ann_index is not None:
+        scores, ids = case_store.ann_index.search(queries, k)
+        return [(row_ids[row_ids >= 0], row_scores[row_ids >= 0]) for row_ids, row_scores in zip(ids, scores)]
+    
+    results = []
+    if case_store.codes is not None:
+        for query in queries:
+            coarse = quantized_scores(case_store.codes, quantize(query))
+            shortlist = np.sort(top_k(coarse, k * QUANTIZED_OVERSAMPLING))
+            scores = similarity_scores(case_store.features[shortlist], query)
+            top = top_k(scores, k)
+            results.append((shortlist[top], scores[top]))
+        return results
+    
+    for scores in similarity_scores_batch(case_store.features, queries):
+        top = top_k(scores, k)
+        results.append((top, scores[top]))
+    return results
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Indices of the k highest scores, best first, ties in index order.
+    
+    Same result as a stable argsort sliced to k, but only sorts the cases
+    at or above the k-th score (np.argpartition finds it in linear time).
+    """
+    if not 0 < k < len(scores):
+        return np.argsort(-scores, kind='stable')[:k]
+    kth = scores[np.argpartition(-scores, k - 1)[k - 1]]
+    candidates = np.flatnonzero(scores >= kth)
+    return candidates[np.argsort(-scores[candidates], kind='stable')[:k]]
+
+
 def find_financial_twins(applicant: Dict[str, Any], k: int = 50) -> List[FinancialTwin]:
     """
     Find the k most similar historical cases.
@@ -235,59 +639,67 @@ def find_financial_twins(applicant: Dict[str, Any], k: int = 50) -> List[Financi
     PLACEHOLDER: This will be replaced with actual Qdrant vector search.
     Currently uses simple cosine similarity on feature vectors.
     """
-    if len(historical_cases) == 0:
-        return []
-    
-    applicant_vector = create_feature_vector(applicant)
-    
-    similarities = []
-    for case in historical_cases:
-        case_vector = create_feature_vector(case)
-        similarity = cosine_similarity(applicant_vector, case_vector)
-        similarities.append((case, similarity))
-    
-    # Sort by similarity descending
-    similarities.sort(key=lambda x: x[1], reverse=True)
-    
-    # Return top k as FinancialTwin objects
-    twins = []
-    for case, similarity in similarities[:k]:
-        twins.append(FinancialTwin(
-            id=case.get('id', 'UNKNOWN'),
-            borrower_id=case.get('borrower_id', 'UNKNOWN'),
-            age=case.get('age', 0),
-            credit_score=case.get('credit_score', 0),
-            income=case.get('income', 0),
-            debt=case.get('debt', 0),
-            assets=case.get('assets', 0),
-            loan_amount=case.get('loan_amount', 0),
-            tenure=case.get('tenure', 0),
-            employment=case.get('employment', 'unknown'),
-            sector=case.get('sector', 'unknown'),
-            purpose=case.get('purpose', 'unknown'),
-            region=case.get('region', 'unknown'),
-            decision=case.get('decision', 'UNKNOWN'),
-            outcome=case.get('outcome', 'UNKNOWN'),
-            days_late=case.get('days_late', 0),
-            similarity=similarity
-        ))
+    return build_twins(*search_twins(applicant, k))
+
+
+def search_twins(applicant: Dict[str, Any], k: int = 50) -> Tuple[HistoricalStore, np.ndarray, np.ndarray]:
+    """The searched store, and row indices and similarities of its k cases closest to applicant"""
+    current = index_store(store)
+    if len(current) == 0:
+        return current, np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
     
-    return twins
+    query = normalize_rows(create_feature_vector(applicant))
+    top, similarities = search_store(current, query, k)
+    return current, top, similarities
 
 
-def calculate_anomaly_score(twins: List[FinancialTwin]) -> float:
+# FinancialTwin fields taken from the case, with the value used if the store lacks one
+TWIN_FIELDS = {
+    'id': 'UNKNOWN',
+    'borrower_id': 'UNKNOWN',
+    'age': 0,
+    'credit_score': 0,
+    'income': 0,
+    'debt': 0,
+    'assets': 0,
+    'loan_amount': 0,
+    'tenure': 0,
+    'employment': 'unknown',
+    'sector': 'unknown',
+    'purpose': 'unknown',
+    'region': 'unknown',
+    'decision': 'UNKNOWN',
+    'outcome': 'UNKNOWN',
+    'days_late': 0,
+}
+
+
+def build_twins(case_store: HistoricalStore, top: np.ndarray, similarities: np.ndarray) -> List[FinancialTwin]:
+    """FinancialTwin objects for the given rows of a store, gathered a column at a time"""
+    columns = [case_store.values(field, top, default) for field, default in TWIN_FIELDS.items()]
+    fields = list(TWIN_FIELDS)
+    return [
+        FinancialTwin(similarity=similarity, **dict(zip(fields, row)))
+        for similarity, *row in zip(similarities.tolist(), *columns)
+    ]
+
+
+def calculate_anomaly_score(similarities: np.ndarray) -> float:
     """
     Calculate anomaly score based on similarity distribution.
+    
+    similarities are the twins' scores, best first (see search_twins).
     """
-    if len(twins) == 0:
+    if len(similarities) == 0:
         return 1.0
     
-    max_sim = twins[0].similarity
-    avg_sim = sum(t.similarity for t in twins) / len(twins)
+    similarities = similarities.tolist()
+    max_sim = similarities[0]
+    avg_sim = sum(similarities) / len(similarities)
     
     # Calculate decay rate
-    if len(twins) >= 10 and max_sim > 0:
-        decay_rate = (twins[0].similarity - twins[min(9, len(twins)-1)].similarity) / max_sim
+    if len(similarities) >= 10 and max_sim > 0:
+        decay_rate = (similarities[0] - similarities[min(9, len(similarities)-1)]) / max_sim
     else:
         decay_rate = 0.0
     
@@ -319,7 +731,8 @@ def detect_anomaly_flags(applicant: Dict[str, Any]) -> List[AnomalyFlag]:
     assets = float(applicant.get('assets', 0))
     utilization = float(applicant.get('utilization', 0))
     delinquencies = float(applicant.get('delinquencies', 0))
-    history_length = float(applicant.get('history_length', 0))
+    # Unknown unless given; a missing history is not a thin file
+    history_length = applicant.get('history_length')
     
     # High income with low credit score
     if income > 150000 and credit_score < 600:
@@ -329,7 +742,7 @@ def detect_anomaly_flags(applicant: Dict[str, Any]) -> List[AnomalyFlag]:
         ))
     
     # High loan amount for thin file
-    if loan_amount > income * 2 and history_length < 3:
+    if history_length is not None and loan_amount > income * 2 and float(history_length) < 3:
         flags.append(AnomalyFlag(
             type='warning',
             text='Large loan request with thin credit history'
@@ -360,16 +773,32 @@ def detect_anomaly_flags(applicant: Dict[str, Any]) -> List[AnomalyFlag]:
     return flags
 
 
+def cohort_statistics(case_store: HistoricalStore, top: np.ndarray) -> Tuple[int, float]:
+    """Defaulted count and mean days late of the given rows, from the store's columns"""
+    outcome = case_store.columns.get('outcome')
+    default_count = 0
+    if outcome is not None:
+        default_count = int(np.count_nonzero(outcome[top] == OUTCOME_CODE['DEFAULTED']))
+    
+    days_late = case_store.columns.get('days_late')
+    total_days_late = int(days_late[top].sum()) if days_late is not None else 0
+    return default_count, total_days_late / len(top)
+
+
 def make_decision(
-    twins: List[FinancialTwin], 
+    case_store: HistoricalStore,
+    top: np.ndarray,
     anomaly_score: float, 
     applicant: Dict[str, Any]
 ) -> DecisionResult:
     """
     Make credit decision based on twins and anomaly analysis.
+    
+    The twins are rows `top` of case_store (see search_twins); their
+    statistics are reduced straight from its columns.
     """
     # Calculate cohort statistics
-    if not twins:
+    if len(top) == 0:
          return DecisionResult(
             decision="DECLINE",
             confidence=0.5,
@@ -381,12 +810,9 @@ def make_decision(
             default_count=0
         )
 
-    default_count = sum(1 for t in twins if t.outcome == 'DEFAULTED')
-    repaid_count = len(twins) - default_count
-    default_rate = default_count / len(twins)
-    
-    total_days_late = sum(t.days_late for t in twins)
-    avg_days_late = total_days_late / len(twins)
+    default_count, avg_days_late = cohort_statistics(case_store, top)
+    repaid_count = len(top) - default_count
+    default_rate = default_count / len(top)
     
     # Decision logic
     decision = "CONDITIONAL"
@@ -430,13 +856,12 @@ def make_decision(
     )
 
 
-def process_credit_application(application: CreditApplication) -> CreditDecisionResponse:
-    """
-    Process a credit application and return full decision response.
-    
-    This is the main entry point for credit decisions.
-    """
-    # Convert application to dict for processing
+# Optional CreditApplication fields, copied into the applicant only when given
+CREDIT_HISTORY_FIELDS = ('delinquencies', 'utilization', 'history_length')
+
+
+def application_to_applicant(application: CreditApplication) -> Dict[str, Any]:
+    """Applicant dict of a credit application, as the feature and flag code reads it"""
     applicant = {
         'age': application.age,
         'credit_score': application.credit_score,
@@ -450,18 +875,68 @@ def process_credit_application(application: CreditApplication) -> CreditDecision
         'purpose': application.purpose.value,
         'region': application.region.value,
     }
+    for field in CREDIT_HISTORY_FIELDS:
+        value = getattr(application, field)
+        if value is not None:
+            applicant[field] = value
+    return applicant
+
+
+def process_credit_application(application: CreditApplication) -> CreditDecisionResponse:
+    """
+    Process a credit application and return full decision response.
+    
+    This is the main entry point for credit decisions.
+    """
+    # Convert application to dict for processing
+    applicant = application_to_applicant(application)
     
     # Find financial twins
-    twins = find_financial_twins(applicant, k=50)
+    current, top, similarities = search_twins(applicant, k=50)
+    return _decision_response(current, applicant, top, similarities)
+
+
+def process_credit_applications(applications: List[CreditApplication]) -> List[CreditDecisionResponse]:
+    """
+    Process several credit applications against the same store.
     
+    Same responses as process_credit_application for each, but the twin
+    searches run as one batch (see search_store_batch).
+    """
+    current = index_store(store)
+    applicants = [application_to_applicant(application) for application in applications]
+    if len(current) == 0 or not applicants:
+        empty = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32))
+        matches = [empty] * len(applicants)
+    else:
+        # Normalized one by one, exactly as search_twins does
+        queries = np.stack([normalize_rows(create_feature_vector(applicant)) for applicant in applicants])
+        matches = search_store_batch(current, queries, k=50)
+    
+    return [
+        _decision_response(current, applicant, top, similarities)
+        for applicant, (top, similarities) in zip(applicants, matches)
+    ]
+
+
+def _decision_response(
+    case_store: HistoricalStore,
+    applicant: Dict[str, Any],
+    top: np.ndarray,
+    similarities: np.ndarray
+) -> CreditDecisionResponse:
+    """Anomaly score, flags, decision and twins of one applicant's search result"""
     # Calculate anomaly score
-    anomaly_score = calculate_anomaly_score(twins)
+    anomaly_score = calculate_anomaly_score(similarities)
     
     # Detect anomaly flags
     flags = detect_anomaly_flags(applicant)
     
     # Make decision
-    decision = make_decision(twins, anomaly_score, applicant)
+    decision = make_decision(case_store, top, anomaly_score, applicant)
+    
+    # The UI charts the whole cohort, so every twin is returned
+    twins = build_twins(case_store, top, similarities)
     
     return CreditDecisionResponse(
         twins=twins,
@@ -475,38 +950,68 @@ def map_categorical(value: Any, valid_options: List[str]) -> str:
     """Map a value to valid categorical option"""
     if not value:
         return valid_options[-1]  # Default to last option (usually 'other')
+    return _match_option(str(value), tuple(valid_options))
+
+
+# Characters map_categorical ignores when comparing labels
+_SEPARATORS = str.maketrans('', '', '-_ ')
+
+
+@lru_cache(maxsize=4096)
+def _match_option(value: str, valid_options: Tuple[str, ...]) -> str:
+    """map_categorical for a non-empty string; memoized, as imports repeat a few labels"""
+    lower_val = value.lower().translate(_SEPARATORS)
     
-    lower_val = str(value).lower().replace('-', '').replace('_', '').replace(' ', '')
-    
-    for opt in valid_options:
-        opt_clean = opt.lower().replace('-', '').replace('_', '').replace(' ', '')
+    for opt, opt_clean in _clean_options(valid_options):
         if lower_val == opt_clean or opt_clean in lower_val or lower_val in opt_clean:
             return opt
     
     return valid_options[-1]
 
 
-def convert_row_to_case(row: Dict[str, Any], mappings: Dict[str, str], idx: int) -> Dict[str, Any]:
-    """Convert a data row to a historical case using column mappings"""
-    
-    def safe_int(val, default=0):
-        try:
-            return int(float(val)) if val is not None and str(val).strip() else default
-        except:
-            return default
-    
-    def safe_float(val, default=0.0):
+@lru_cache(maxsize=None)
+def _clean_options(valid_options: Tuple[str, ...]) -> List[Tuple[str, str]]:
+    """(option, option as compared) pairs, cleaned once per option list"""
+    return [(opt, opt.lower().translate(_SEPARATORS)) for opt in valid_options]
+
+
+def safe_int(val, default=0):
+    # Numbers skip the blank check (their str is never empty)
+    try:
+        if isinstance(val, (int, float)) or (val is not None and str(val).strip()):
+            return int(float(val))
+        return default
+    except (TypeError, ValueError, OverflowError):
+        return default
+
+
+def safe_float(val, default=0.0):
+    if isinstance(val, (int, float)):
         try:
-            return float(val) if val is not None and str(val).strip() else default
-        except:
+            return float(val)
+        except OverflowError:
             return default
+    try:
+        return float(val) if val is not None and str(val).strip() else default
+    except (TypeError, ValueError, OverflowError):
+        return default
+
+
+def parse_outcome(val: Any) -> str:
+    """REPAID or DEFAULTED from an outcome cell"""
+    outcome_val = str(val).lower()
+    if any(x in outcome_val for x in ['default', 'charged', 'late', 'bad', '1', 'true']):
+        return 'DEFAULTED'
+    return 'REPAID'
+
+
+def convert_row_to_case(row: Dict[str, Any], mappings: Dict[str, str], idx: int) -> Dict[str, Any]:
+    """Convert a data row to a historical case using column mappings"""
     
     # Parse outcome
     outcome = 'REPAID'
     if mappings.get('outcome'):
-        outcome_val = str(row.get(mappings['outcome'], '')).lower()
-        if any(x in outcome_val for x in ['default', 'charged', 'late', 'bad', '1', 'true']):
-            outcome = 'DEFAULTED'
+        outcome = parse_outcome(row.get(mappings['outcome'], ''))
     
     return {
         'id': f'IMPORT_{str(idx + 1).zfill(6)}',
@@ -528,22 +1033,210 @@ def convert_row_to_case(row: Dict[str, Any], mappings: Dict[str, str], idx: int)
     }
 
 
-def import_dataset(data: List[Dict[str, Any]], mappings: Dict[str, str]) -> Tuple[int, int]:
+# Converted per column in chunks of this many rows by import_dataset
+IMPORT_CHUNK_ROWS = 10_000
+
+# Imports of more than one chunk convert chunks on this many worker
+# processes (the conversion is pure Python, so threads would not help)
+IMPORT_WORKERS = min(4, os.cpu_count() or 1)
+
+_import_pool: Optional[ProcessPoolExecutor] = None
+_import_pool_lock = threading.Lock()
+
+
+def _get_import_pool() -> ProcessPoolExecutor:
+    """The import worker pool, started on first use and kept for later imports"""
+    global _import_pool
+    with _import_pool_lock:
+        if _import_pool is None:
+            # spawn, not fork: the server process runs other threads
+            _import_pool = ProcessPoolExecutor(IMPORT_WORKERS, mp_context=multiprocessing.get_context('spawn'))
+        return _import_pool
+
+
+def _parse_numbers(values: List[Any], default: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    safe_float of every value as a float64 array, plus a mask of the values
+    that fell back to the default; one conversion when all of them parse.
+    """
+    cells = np.empty(len(values), dtype=object)
+    cells[:] = values
+    try:
+        numbers = cells.astype(np.float64)
+    except (TypeError, ValueError, OverflowError):
+        parsed = [safe_float(val, None) for val in values]
+        missing = np.array([number is None for number in parsed], dtype=bool)
+        numbers = np.array([default if number is None else number for number in parsed], dtype=np.float64)
+        return numbers, missing
+    missing = np.equal(cells, None)
+    numbers[missing] = default
+    return numbers, missing
+
+
+def _int_column(values: List[Any], default: int, low: Optional[int] = None, high: Optional[int] = None) -> List[int]:
+    """safe_int of every value (NaN and infinity give the default), then clamped"""
+    numbers = np.trunc(_parse_numbers(values, default)[0])
+    numbers[~np.isfinite(numbers)] = default
+    if low is not None:
+        numbers = np.clip(numbers, low, high)
+    # astype wraps values beyond int64; those become Python ints, as in safe_int
+    in_range = (numbers >= -2.0 ** 63) & (numbers < 2.0 ** 63)
+    ints = np.where(in_range, numbers, 0).astype(np.int64).tolist()
+    for i in np.flatnonzero(~in_range).tolist():
+        ints[i] = int(numbers[i])
+    return ints
+
+
+def _amount_column(values: List[Any], default: float) -> List[Any]:
+    """max(0, safe_float(value)) of every value (NaN gives 0, the default keeps its type)"""
+    numbers, missing = _parse_numbers(values, default)
+    default = max(0, default)
+    return [
+        default if is_missing else (number if number > 0 else 0)
+        for number, is_missing in zip(numbers.tolist(), missing.tolist())
+    ]
+
+
+def _map_values(func, values: List[Any]) -> List[Any]:
+    """func of every value, computed once per distinct value"""
+    results = {}
+    mapped = []
+    for val in values:
+        try:
+            result = results[val]
+        except KeyError:
+            result = results[val] = func(val)
+        except TypeError:
+            result = func(val)
+        mapped.append(result)
+    return mapped
+
+
+def convert_rows_to_cases(rows: List[Dict[str, Any]], mappings: Dict[str, str], start: int) -> List[Dict[str, Any]]:
+    """
+    convert_row_to_case for a list of rows numbered from start, column by column.
+    
+    Numeric columns are parsed in one NumPy conversion, and outcomes and
+    categoricals are mapped once per distinct value; the cases are the same.
+    """
+    n = len(rows)
+    
+    def column(field: str, default: Any) -> List[Any]:
+        key = mappings.get(field, '')
+        return [row.get(key, default) for row in rows]
+    
+    def categorical(field: str, options: List[str], default: str) -> List[str]:
+        if not mappings.get(field):
+            return [default] * n
+        return _map_values(lambda val: map_categorical(val, options), column(field, ''))
+    
+    if mappings.get('outcome'):
+        outcomes = _map_values(parse_outcome, column('outcome', ''))
+    else:
+        outcomes = ['REPAID'] * n
+    defaulted = np.array([outcome == 'DEFAULTED' for outcome in outcomes], dtype=bool)
+    
+    if mappings.get('days_late'):
+        days_late = _int_column(column('days_late', 0), 0)
+    else:
+        days_late = np.where(defaulted, 60, 0).tolist()
+    
+    numbers = [str(idx + 1).zfill(6) for idx in range(start, start + n)]
+    columns = {
+        'id': [f'IMPORT_{number}' for number in numbers],
+        'borrower_id': [f'BRW_{number}' for number in numbers],
+        'age': _int_column(column('age', 35), 35, 18, 100),
+        'credit_score': _int_column(column('credit_score', 650), 650, 300, 850),
+        'income': _amount_column(column('income', 50000), 50000),
+        'debt': _amount_column(column('debt', 0), 0) if mappings.get('debt') else [0] * n,
+        'assets': _amount_column(column('assets', 0), 0) if mappings.get('assets') else [0] * n,
+        'loan_amount': _amount_column(column('loan_amount', 10000), 10000),
+        'tenure': _int_column(column('tenure', 36), 36) if mappings.get('tenure') else [36] * n,
+        'employment': categorical('employment', EMPLOYMENT_TYPES, 'full-time'),
+        'sector': categorical('sector', SECTORS, 'other'),
+        'purpose': categorical('purpose', PURPOSES, 'personal'),
+        'region': categorical('region', REGIONS, 'northeast'),
+        'decision': np.where(defaulted, 'DECLINED', 'APPROVED').tolist(),
+        'outcome': outcomes,
+        'days_late': days_late,
+    }
+    fields = list(columns)
+    return [dict(zip(fields, case)) for case in zip(*columns.values())]
+
+
+def _convert_chunks(data: Iterable[Dict[str, Any]], mappings: Dict[str, str]) -> Iterator[Tuple[int, List[Dict[str, Any]], Optional[List[Dict[str, Any]]]]]:
+    """
+    Yield (start, rows, cases) per chunk of IMPORT_CHUNK_ROWS rows, in order.
+    
+    cases is None when the chunk failed to convert. Imports of more than
+    one chunk are converted on the worker pool (if IMPORT_WORKERS > 1), at
+    most 2 * IMPORT_WORKERS chunks ahead of the consumer so memory stays
+    bounded; others convert here.
+    """
+    rows = iter(data)
+    chunks = iter(lambda: list(islice(rows, IMPORT_CHUNK_ROWS)), [])
+    head = list(islice(chunks, 2))
+    chunks = chain(head, chunks)
+    
+    start = 0
+    if len(head) < 2 or IMPORT_WORKERS < 2:
+        for chunk in chunks:
+            yield start, chunk, _try_convert(chunk, mappings, start)
+            start += len(chunk)
+        return
+    
+    pool = _get_import_pool()
+    pending = deque()
+    for chunk in chunks:
+        if len(pending) >= 2 * IMPORT_WORKERS:
+            yield _chunk_result(*pending.popleft())
+        pending.append((start, chunk, pool.submit(convert_rows_to_cases, chunk, mappings, start)))
+        start += len(chunk)
+    while pending:
+        yield _chunk_result(*pending.popleft())
+
+
+def _try_convert(rows: List[Dict[str, Any]], mappings: Dict[str, str], start: int) -> Optional[List[Dict[str, Any]]]:
+    """convert_rows_to_cases, or None if the chunk fails"""
+    try:
+        return convert_rows_to_cases(rows, mappings, start)
+    except Exception:
+        return None
+
+
+def _chunk_result(start: int, rows: List[Dict[str, Any]], future) -> Tuple[int, List[Dict[str, Any]], Optional[List[Dict[str, Any]]]]:
+    """A pooled chunk's (start, rows, cases), cases None if its conversion failed"""
+    try:
+        return start, rows, future.result()
+    except Exception:
+        return start, rows, None
+
+
+def import_dataset(data: Iterable[Dict[str, Any]], mappings: Dict[str, str]) -> Tuple[int, int]:
     """
     Import a dataset into historical cases.
+    Rows may be streamed (any iterable); they are converted IMPORT_CHUNK_ROWS
+    at a time (see convert_rows_to_cases), in parallel for long imports.
     Returns (imported_count, skipped_count)
     """
     imported_cases = []
     skipped = 0
     
-    for idx, row in enumerate(data):
-        try:
-            case = convert_row_to_case(row, mappings, idx)
-            imported_cases.append(case)
-        except Exception as e:
-            skipped += 1
+    for start, chunk, cases in _convert_chunks(data, mappings):
+        if cases is not None:
+            imported_cases.extend(cases)
             continue
+        # Convert this chunk row by row so only the bad rows are skipped
+        for idx, row in enumerate(chunk, start):
+            try:
+                imported_cases.append(convert_row_to_case(row, mappings, idx))
+            except Exception:
+                skipped += 1
     
     set_historical_cases(imported_cases)
     
     return len(imported_cases), skipped
+
+
+# Index the startup data now that compute_feature_vector is defined
+index_store(store)